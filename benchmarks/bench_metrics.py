@@ -0,0 +1,128 @@
+"""
+Time and peak memory of the public validation functions.
+
+Run with pytest-benchmark, e.g.
+
+    python -m pytest benchmarks/bench_metrics.py --rows 1e4,1e6 \
+        --benchmark-autosave
+
+See benchmarks/README.rst for comparing runs across commits.
+"""
+import tracemalloc
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from meliora.Accuracy_Ratio import accuracy_ratio  # noqa: E402
+from meliora.Bayesian_Error_Rate import bayesian_error_rate  # noqa: E402
+from meliora.Binomial_test import binomial_test  # noqa: E402
+from meliora.Bootstrap import bootstrap, bootstrap_curve  # noqa: E402
+from meliora.CIER import cier  # noqa: E402
+from meliora.CLAR import clar  # noqa: E402
+from meliora.ELBE_t_test import elbe_t_test  # noqa: E402
+from meliora.Grade_Summary import grade_summary  # noqa: E402
+from meliora.Hoshmer_Lemeshow_Test import hosmer_lemeshow  # noqa: E402
+from meliora.Information_Value import calc_iv, calc_woe_iv  # noqa: E402
+from meliora.Jeffreys_Test import jeffreys_test  # noqa: E402
+from meliora.Kendall_tau import kendall_tau  # noqa: E402
+from meliora.Kolmogorov_Smirnov_test import ks_default  # noqa: E402
+from meliora.LGD_t_test import grouped_t_test, lgd_t_test  # noqa: E402
+from meliora.Loss_Capture_Ratio import loss_capture_ratio  # noqa: E402
+from meliora.Loss_Shortfall import loss_shortfall  # noqa: E402
+from meliora.Mean_Absolute_Deviation import migration_matrix_stability  # noqa: E402
+from meliora.Population_Stability_Index import population_stability_index  # noqa: E402
+from meliora.Score_Curve import ScoreCurve  # noqa: E402
+from meliora.Score_Histogram import ScoreHistogram  # noqa: E402
+from meliora.Somers_D import somersd  # noqa: E402
+from meliora.Spearman_Rank_Correlation import spearman  # noqa: E402
+from meliora.Traffic_Lights_Approach import _THRESHOLDS, traffic_lights  # noqa: E402
+from meliora.Validation_Suite import ValidationSuite  # noqa: E402
+
+
+def _half(df):
+    return df.iloc[:len(df) // 2], df.iloc[len(df) // 2:]
+
+
+def _traffic_lights_uncached(df):
+    # correlated thresholds without the cache, i.e. the quadrature path
+    _THRESHOLDS.clear()
+    return traffic_lights(df.ratings, df.default_flag, df.prob_default,
+                          correlation='basel')
+
+
+# benchmark name -> function of the portfolio
+CASES = {
+    'grade_summary': lambda df: grade_summary(df.ratings, df.default_flag,
+                                              df.prob_default),
+    'binomial_test': lambda df: binomial_test(df.ratings, df.default_flag,
+                                              df.prob_default),
+    'jeffreys_test': lambda df: jeffreys_test(df.ratings, df.default_flag,
+                                              df.prob_default),
+    'hosmer_lemeshow': lambda df: hosmer_lemeshow(df.ratings, df.default_flag,
+                                                  df.prob_default),
+    'hosmer_lemeshow_deciles': lambda df: hosmer_lemeshow(
+        default_flag=df.default_flag, prob_default=df.prob_default,
+        groups='deciles', by=df.segment),
+    'traffic_lights': lambda df: traffic_lights(df.ratings, df.default_flag,
+                                                df.prob_default),
+    'traffic_lights_basel': _traffic_lights_uncached,
+    'cier': lambda df: cier(df.ratings, df.default_flag),
+    'score_curve': lambda df: ScoreCurve(df.default_flag, df.prob_default),
+    'score_histogram': lambda df: ScoreHistogram().update(df.default_flag,
+                                                          df.prob_default),
+    'accuracy_ratio': lambda df: accuracy_ratio(df.default_flag,
+                                                df.prob_default),
+    'bayesian_error_rate': lambda df: bayesian_error_rate(df.default_flag,
+                                                          df.prob_default),
+    'ks_default': lambda df: ks_default(df.default_flag, df.prob_default,
+                                        segment=df.segment),
+    'bootstrap_curve': lambda df: bootstrap_curve(df.default_flag,
+                                                  df.prob_default, n_boot=200,
+                                                  random_state=0),
+    'somersd': lambda df: somersd(df.ratings, df.default_flag),
+    'kendall_tau': lambda df: kendall_tau(df.ratings, df.default_flag),
+    'spearman': lambda df: spearman(df.PRED_LGD, df.LGD),
+    'calc_iv': lambda df: calc_iv(df, 'ratings', 'default_flag'),
+    'calc_woe_iv': lambda df: calc_woe_iv(df, ['ratings', 'prob_default'],
+                                          'default_flag', bins=20),
+    'migration_matrix_stability': lambda df: migration_matrix_stability(
+        df, 'ratings', 'ratings2'),
+    'population_stability_index': lambda df: population_stability_index(
+        *_half(df), variables=['prob_default', 'ratings', 'PRED_LGD']),
+    'loss_capture_ratio': lambda df: loss_capture_ratio(df.EAD, df.PRED_LGD,
+                                                        df.LGD),
+    'clar': lambda df: clar(df.PRED_LGD, df.LGD),
+    'bootstrap_clar': lambda df: bootstrap(clar, df.PRED_LGD, df.LGD,
+                                           n_boot=20, random_state=0),
+    'lgd_t_test': lambda df: lgd_t_test(df, 'LGD', 'PRED_LGD'),
+    'grouped_t_test': lambda df: grouped_t_test(df.LGD, df.PRED_LGD,
+                                                by=df.segment,
+                                                sample_weight=df.EAD),
+    'elbe_t_test': lambda df: elbe_t_test(df.LGD, df.ELBE),
+    'loss_shortfall': lambda df: loss_shortfall(df.LGD, df.ELBE),
+    'validation_suite': lambda df: ValidationSuite(
+        df, ['Binomial test', "Jeffrey's test", 'Hoshmer-Lemeshow test',
+             'Accuracy Ratio', 'Kolmogorov-Smirnov test']).run(),
+}
+
+
+def _peak_memory(func, df):
+    # peak of the allocations made during one call, in MB
+    tracemalloc.start()
+    try:
+        func(df)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('name', list(CASES))
+def test_metric(benchmark, request, portfolio, name):
+    func = CASES[name]
+    benchmark.group = name
+    benchmark.extra_info['rows'] = len(portfolio)
+    benchmark.extra_info['peak_memory_mb'] = _peak_memory(func, portfolio)
+
+    benchmark.pedantic(func, args=(portfolio,), iterations=1,
+                       rounds=request.config.getoption('rounds'))
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from portfolio import synthetic_portfolio  # noqa: E402
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('meliora benchmarks')
+    group.addoption('--rows', default='1e4,1e5',
+                    help='comma separated portfolio sizes, e.g. 1e4,1e6,1e8')
+    group.addoption('--grades', type=int, default=14,
+                    help='number of rating grades')
+    group.addoption('--default-rate', type=float, default=0.02,
+                    help='portfolio default rate')
+    group.addoption('--rounds', type=int, default=3,
+                    help='timed rounds per benchmark')
+
+
+def pytest_generate_tests(metafunc):
+    if 'rows' in metafunc.fixturenames:
+        sizes = [int(float(size))
+                 for size in metafunc.config.getoption('rows').split(',')]
+        metafunc.parametrize('rows', sizes, scope='session',
+                             ids=['{:.0e}'.format(size) for size in sizes])
+
+
+_PORTFOLIOS = {}
+
+
+@pytest.fixture(scope='session')
+def portfolio(request, rows):
+    # keep only the current size in memory
+    key = (rows, request.config.getoption('grades'),
+           request.config.getoption('default_rate'))
+    if key not in _PORTFOLIOS:
+        _PORTFOLIOS.clear()
+        _PORTFOLIOS[key] = synthetic_portfolio(rows, n_grades=key[1],
+                                               default_rate=key[2])
+    return _PORTFOLIOS[key]
@@ -0,0 +1,46 @@
+"""
+Startup benchmark: wall time of a fresh interpreter for typical cold-start
+paths of the package, e.g. ``python benchmarks/import_time.py``.
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'python': 'pass',
+    'import meliora': 'import meliora',
+    'list tests': 'import meliora; meliora.list_tests()',
+    'load t-test': "import meliora; meliora.get_test("
+                   "'ELBE back-test using t-test').load()",
+    'run t-test': "import meliora; meliora.elbe_t_test("
+                  "[0.5, 0.4, 0.7, 0.2], [0.4, 0.4, 0.6, 0.3])",
+    'import all': 'import meliora; '
+                  '[t.load() for t in meliora.list_tests(available=True)]',
+}
+
+
+def measure(code, repeat=5):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, env=env)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(repeat=5):
+    results = {name: measure(code, repeat) for name, code in SCENARIOS.items()}
+    baseline = results['python']
+    print('{:<16}{:>12}{:>16}'.format('scenario', 'wall [ms]', 'over python'))
+    for name, seconds in results.items():
+        print('{:<16}{:>12.1f}{:>16.1f}'.format(
+            name, 1000 * seconds, 1000 * (seconds - baseline)))
+    return results
+
+
+if __name__ == '__main__':
+    main()
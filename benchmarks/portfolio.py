@@ -0,0 +1,71 @@
+"""
+Synthetic PD/LGD portfolios with the columns of tests/synthetic_pd.xlsx.
+"""
+import numpy as np
+import pandas as pd
+
+
+def synthetic_portfolio(n, n_grades=14, default_rate=0.02, n_segments=20,
+                        seed=0):
+    """
+    Synthetic portfolio of ``n`` facilities.
+
+    Parameters
+    ----------
+    n : int
+        Number of rows
+    n_grades : int
+        Number of rating grades; grade 1 is the best
+    default_rate : float
+        Expected portfolio default rate
+    n_segments : int
+        Number of segments for the grouped tests
+    seed : int
+        Random seed
+
+    Returns
+    -------
+    df : pandas dataframe
+        Columns default_flag, predicted_flag, prob_default, ratings,
+        ratings2, LGD, ELBE and PRED_LGD as in tests/synthetic_pd.xlsx,
+        plus EAD and segment. Flags and ratings use small integer dtypes
+        so that 1e8 rows fit in memory.
+    """
+
+    rng = np.random.default_rng(seed)
+    n = int(n)
+
+    # bell-shaped grade distribution, PDs growing exponentially by grade
+    grades = np.arange(1, n_grades + 1)
+    weights = np.exp(-0.5 * ((grades - (n_grades + 1) / 2) / (n_grades / 4))**2)
+    weights /= weights.sum()
+    grade_pd = np.exp(np.linspace(np.log(0.0005), np.log(0.3), n_grades))
+    grade_pd *= default_rate / np.sum(weights * grade_pd)
+    grade_pd = np.minimum(grade_pd, 0.99)
+
+    ratings = rng.choice(grades, size=n, p=weights).astype(np.int8)
+    prob_default = np.clip(grade_pd[ratings - 1]
+                           * rng.lognormal(0, 0.2, n), 1e-5, 0.9999)
+    default_flag = (rng.random(n) < prob_default).astype(np.int8)
+
+    # one-notch migrations in either direction for a quarter of the book
+    step = rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=n,
+                      p=[0.125, 0.75, 0.125])
+    ratings2 = np.clip(ratings + step, 1, n_grades).astype(np.int8)
+
+    pred_lgd = rng.uniform(1000, 11000, n)
+    lgd = pred_lgd + rng.normal(0, 500, n)
+    elbe = lgd + rng.normal(0, 300, n)
+
+    return pd.DataFrame({
+        'default_flag': default_flag,
+        'predicted_flag': (prob_default > default_rate).astype(np.int8),
+        'prob_default': prob_default,
+        'ratings': ratings,
+        'ratings2': ratings2,
+        'LGD': lgd,
+        'ELBE': elbe,
+        'PRED_LGD': pred_lgd,
+        'EAD': rng.lognormal(10, 1, n),
+        'segment': rng.integers(0, n_segments, n).astype(np.int16),
+    })
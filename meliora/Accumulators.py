@@ -0,0 +1,312 @@
+import numpy as np
+import pandas as pd
+
+from meliora.Binomial_test import binomial_test
+from meliora.Columnar_Input import as_array, column
+from meliora.Grade_Summary import grade_summary
+from meliora.Hoshmer_Lemeshow_Test import hosmer_lemeshow
+from meliora.Information_Value import _woe_table
+from meliora.Jeffreys_Test import jeffreys_test
+from meliora.LGD_t_test import _merge_moments, _t_moments, _t_statistics
+from meliora.Population_Stability_Index import (_bin_index, _psi_terms,
+                                                _quantile_edges)
+
+
+class GradeAccumulator:
+    """
+    Mergeable per-grade counts for incremental calibration monitoring.
+
+    Every batch of data (e.g. one month of observations) is reduced to its
+    ``grade_summary`` once and added to the running totals, so a growing
+    observation window never has to be scanned again. Accumulators built
+    on different partitions of the data can be merged.
+
+    Parameters
+    ----------
+    ratings, default_flag, prob_default : string
+        Column names in the batches passed to ``update``
+    by : string or list of strings, optional
+        Grouping columns, e.g. segment or reporting date
+
+    Examples
+    --------
+    >>> acc = GradeAccumulator()
+    >>> for month in months:
+    ...     acc.update(month)
+    >>> acc.binomial_test(alpha=0.05)
+    >>> acc.merge(other_region).jeffreys_test()
+    """
+
+    def __init__(self, ratings='ratings', default_flag='default_flag',
+                 prob_default='prob_default', by=None):
+        if isinstance(by, str):
+            by = [by]
+
+        self.ratings = ratings
+        self.default_flag = default_flag
+        self.prob_default = prob_default
+        self.by = list(by or [])
+        self.summary = None
+
+    def _add(self, summary):
+        if self.summary is None:
+            self.summary = summary[['N', 'D', 'PD Sum']].copy()
+            return self
+
+        totals = self.summary.add(summary[['N', 'D', 'PD Sum']],
+                                  fill_value=0).sort_index()
+        self.summary = totals.astype({'N': np.int64, 'D': np.int64})
+        return self
+
+    def update(self, batch):
+        """Add a batch of observations (DataFrame, Table or mapping)."""
+        by = [pd.Series(column(batch, key), name=key) for key in self.by]
+        summary = grade_summary(column(batch, self.ratings),
+                                column(batch, self.default_flag),
+                                column(batch, self.prob_default),
+                                by=by or None)
+        return self._add(summary)
+
+    def merge(self, other):
+        """Add the totals of another accumulator."""
+        if other.summary is not None:
+            self._add(other.summary)
+        return self
+
+    def result(self):
+        """Accumulated ``grade_summary``."""
+        if self.summary is None:
+            raise ValueError('no data has been added to the accumulator')
+        summary = self.summary.copy()
+        summary['PD'] = summary['PD Sum'] / summary['N']
+        return summary
+
+    def binomial_test(self, alpha=0.05):
+        return binomial_test(summary=self.result(), alpha=alpha)
+
+    def jeffreys_test(self, alpha=0.05):
+        return jeffreys_test(summary=self.result(), alpha=alpha)
+
+    def hosmer_lemeshow(self, alpha=0.05):
+        return hosmer_lemeshow(summary=self.result(), alpha=alpha)
+
+
+class DistributionAccumulator:
+    """
+    Mergeable binned distribution of a variable, the input of the PSI.
+
+    The bin edges are fixed up front (usually on the reference sample) and
+    every batch only adds its bin counts, found with ``np.searchsorted`` and
+    ``np.bincount``. Values outside the edges are counted in the first or
+    last bin; missing values get a bin of their own.
+
+    Parameters
+    ----------
+    edges : sequence of scalars
+        Strictly increasing bin edges
+
+    Examples
+    --------
+    >>> reference = DistributionAccumulator.from_sample(dev.prob_default)
+    >>> current = DistributionAccumulator(reference.edges)
+    >>> for month in months:
+    ...     current.update(month.prob_default)
+    >>> current.psi(reference)
+    """
+
+    def __init__(self, edges):
+        edges = np.asarray(edges, dtype=np.float64)
+        if len(edges) < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError('bin edges must be strictly increasing')
+
+        self.edges = edges
+        # last entry counts missing values
+        self.counts = np.zeros(len(edges), dtype=np.int64)
+
+    @classmethod
+    def from_sample(cls, values, bins=10):
+        """Accumulator with quantile edges of ``values``, filled with them."""
+        values = as_array(values, np.float64)
+        return cls(_quantile_edges(values, bins)).update(values)
+
+    def update(self, values):
+        """Add a batch of values."""
+        idx = _bin_index(self.edges, as_array(values, np.float64))
+        self.counts += np.bincount(idx, minlength=len(self.edges))
+        return self
+
+    def merge(self, other):
+        """Add the counts of an accumulator with identical edges."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError('accumulators have different bin edges')
+        self.counts += other.counts
+        return self
+
+    def result(self):
+        """Share of the observations per bin, missing values last."""
+        return self.counts / self.counts.sum()
+
+    def psi(self, reference, epsilon=1e-4):
+        """
+        Population Stability Index of this distribution against
+        ``reference``; empty bins are floored at ``epsilon``.
+        """
+        if not np.array_equal(self.edges, reference.edges):
+            raise ValueError('accumulators have different bin edges')
+        return float(np.sum(_psi_terms(self.result(), reference.result(),
+                                       epsilon)))
+
+
+class MomentAccumulator:
+    """
+    Mergeable per-group error moments for the LGD and ELBE t-tests.
+
+    Every batch is reduced to the weight sums, the mean error and the sum
+    of squared deviations per group; batches are combined with the
+    pairwise update of Chan et al., which stays accurate over many chunks.
+
+    Parameters
+    ----------
+    observed, expected : string
+        Column names of realised and estimated values, e.g. 'LGD' and
+        'PRED_LGD' or 'ELBE'
+    by : string or list of strings, optional
+        Grouping columns
+    weight : string, optional
+        Weight column, e.g. 'EAD'
+
+    Examples
+    --------
+    >>> acc = MomentAccumulator('LGD', 'PRED_LGD', by='segment', weight='EAD')
+    >>> for chunk in read_chunks('lgd.parquet'):
+    ...     acc.update(chunk)
+    >>> acc.result(alternative='greater')
+    """
+
+    def __init__(self, observed='LGD', expected='PRED_LGD', by=None,
+                 weight=None):
+        if isinstance(by, str):
+            by = [by]
+
+        self.observed = observed
+        self.expected = expected
+        self.by = list(by or [])
+        self.weight = weight
+        self.moments = None
+
+    def _add(self, moments):
+        self.moments = moments if self.moments is None \
+            else _merge_moments(self.moments, moments)
+        return self
+
+    def update(self, batch):
+        """Add a batch of observations (DataFrame, Table or mapping)."""
+        by = [pd.Series(column(batch, key), name=key) for key in self.by]
+        weight = None if self.weight is None else column(batch, self.weight)
+        return self._add(_t_moments(column(batch, self.observed),
+                                    column(batch, self.expected),
+                                    by=by or None, sample_weight=weight))
+
+    def merge(self, other):
+        """Add the moments of another accumulator."""
+        if other.moments is not None:
+            self._add(other.moments)
+        return self
+
+    def result(self, alternative='two-sided'):
+        """t-test results as returned by ``grouped_t_test``."""
+        if self.moments is None:
+            raise ValueError('no data has been added to the accumulator')
+        return _t_statistics(self.moments, alternative)
+
+
+class WoEAccumulator:
+    """
+    Mergeable per-category counts of all and bad observations, the input
+    of weight of evidence and information value.
+
+    Categories are counted as they appear. Numeric features can be binned
+    with ``bins`` quantile bins, whose edges are fixed on the first batch
+    so that all batches share the same bins. Accumulators filled in
+    parallel can only be merged if their edges agree: give every shard the
+    ``edges`` of a reference accumulator before its first batch.
+
+    Parameters
+    ----------
+    features : list of strings
+        Independent variables
+    target : string
+        Dependent variable, 1 for bad
+    bins : int, optional
+        Number of quantile bins for numeric features
+
+    Examples
+    --------
+    >>> acc = WoEAccumulator(['age', 'region'], 'default_flag', bins=10)
+    >>> for chunk in read_chunks('applications.csv'):
+    ...     acc.update(chunk)
+    >>> acc.result()
+    """
+
+    def __init__(self, features, target, bins=None):
+        self.features = list(features)
+        self.target = target
+        self.bins = bins
+        self.edges = {}
+        self.counts = {}
+
+    def _feature_counts(self, feature, values, bad):
+        if self.bins is not None and np.issubdtype(values.dtype, np.number):
+            values = values.astype(np.float64, copy=False)
+            if feature not in self.edges:
+                self.edges[feature] = _quantile_edges(values, self.bins)
+            edges = self.edges[feature]
+            codes = _bin_index(edges, values)
+            # missing values are left out, as in calc_woe_iv
+            codes[codes == len(edges) - 1] = -1
+            labels = pd.IntervalIndex.from_breaks(edges, closed='left')
+        else:
+            codes, labels = pd.factorize(values)
+
+        valid = codes >= 0
+        K = len(labels)
+        return pd.DataFrame({'All': np.bincount(codes[valid], minlength=K),
+                             'Bad': np.bincount(codes[valid & bad],
+                                                minlength=K)},
+                            index=labels)
+
+    def _add(self, feature, counts):
+        if feature in self.counts:
+            counts = self.counts[feature].add(counts, fill_value=0) \
+                .astype(np.int64)
+        self.counts[feature] = counts
+
+    def update(self, batch):
+        """Add a batch of observations (DataFrame, Table or mapping)."""
+        bad = column(batch, self.target) == 1
+        for feature in self.features:
+            self._add(feature, self._feature_counts(
+                feature, column(batch, feature), bad))
+        return self
+
+    def merge(self, other):
+        """Add the counts of an accumulator with identical bin edges."""
+        for feature, edges in other.edges.items():
+            if feature not in self.edges:
+                self.edges[feature] = edges
+            elif not np.array_equal(self.edges[feature], edges):
+                raise ValueError('accumulators have different bin edges '
+                                 'for {!r}'.format(feature))
+        for feature, counts in other.counts.items():
+            self._add(feature, counts)
+        return self
+
+    def result(self):
+        """WoE and IV table in the layout of ``calc_woe_iv``."""
+        tables = []
+        for feature in self.features:
+            counts = self.counts[feature].sort_index()
+            tables.append(_woe_table(feature, counts.index,
+                                     counts['All'].to_numpy(),
+                                     counts['Bad'].to_numpy()))
+        return pd.concat(tables, ignore_index=True)
@@ -1,59 +1,50 @@
-from sklearn.metrics import accuracy_score
+from meliora.Instrumentation import instrument
+from meliora.Score_Curve import ScoreCurve
 
 
-def accuracy_ratio(y_test, pred):
-    """Accuracy classification score.
+@instrument
+def accuracy_ratio(y_test=None, pred=None, sample_weight=None, curve=None):
+    """Accuracy Ratio of a rating model.
 
-    In multilabel classification, this function computes subset accuracy:
-    the set of labels predicted for a sample must *exactly* match the
-    corresponding set of labels in y_true.
+    The Accuracy Ratio (AR) is the ratio of the area between the Cumulative
+    Accuracy Profile (CAP) of the model and the CAP of a random model to the
+    same area for the perfect model. It is equal to the Gini coefficient
+    and is linked to the area under the ROC curve by AR = 2 * AUC - 1.
 
-    This a wrapper of scikit-learn function.
+    An AR of one indicates a perfect ranking of defaulters ahead of
+    non-defaulters, an AR of zero a model without discriminatory power.
 
     Parameters
     ----------
-    y_true : 1d array-like, or label indicator array / sparse matrix
-        Ground truth (correct) labels.
-    y_pred : 1d array-like, or label indicator array / sparse matrix
-        Predicted labels, as returned by a classifier.
-    normalize : bool, default=True
-        If ``False``, return the number of correctly classified samples.
-        Otherwise, return the fraction of correctly classified samples.
+    y_test : 1d array-like
+        Ground truth default flags.
+    pred : 1d array-like
+        Predicted default probabilities or scores; higher means riskier.
     sample_weight : array-like of shape (n_samples,), default=None
         Sample weights.
+    curve : ScoreCurve, optional
+        Presorted score curve, or ``ScoreHistogram.curve()`` for data that
+        does not fit in memory. When given, the other arguments are ignored,
+        so several metrics can share one sort of the scores.
 
     Returns
     -------
     score : float
-        If ``normalize == True``, return the fraction of correctly
-        classified samples (float), else returns the number of correctly
-        classified samples (int).
-        The best performance is 1 with ``normalize == True`` and the number
-        of samples with ``normalize == False``.
+        Accuracy Ratio.
 
     See Also
     --------
-    balanced_accuracy_score : Compute the balanced accuracy to deal with
-        imbalanced datasets.
-
-    Notes
-    -----
-    In binary classification, this function is equal to the `jaccard_score`
-    function.
+    ScoreCurve : sorted-score curve with ROC, CAP, AUC, Gini and BER.
 
     Examples
     --------
-    >>> from sklearn.metrics import accuracy_score
-    >>> y_pred = [0, 2, 1, 3]
-    >>> y_true = [0, 1, 2, 3]
-    >>> accuracy_score(y_true, y_pred)
-    0.5
-    >>> accuracy_score(y_true, y_pred, normalize=False)
-    2
-    In the multilabel case with binary label indicators:
-    >>> import numpy as np
-    >>> accuracy_score(np.array([[0, 1], [1, 1]]), np.ones((2, 2)))
+    >>> y_test = [0, 0, 1, 1]
+    >>> pred = [0.1, 0.4, 0.35, 0.8]
+    >>> accuracy_ratio(y_test, pred)
     0.5
     """
 
-    return accuracy_score(y_test, pred)
+    if curve is None:
+        curve = ScoreCurve(y_test, pred, sample_weight)
+
+    return curve.accuracy_ratio()
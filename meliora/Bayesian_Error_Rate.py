@@ -1,8 +1,10 @@
-import pandas as pd
-from sklearn import metrics
+from meliora.Instrumentation import instrument
+from meliora.Score_Curve import ScoreCurve
 
 
-def bayesian_error_rate(default_flag, prob_default):
+@instrument
+def bayesian_error_rate(default_flag=None, prob_default=None,
+                        sample_weight=None, curve=None):
     """
     BER is the proportion of the whole sample that is misclassified
     when the rating system is in optimal use. For a perfect rating model,
@@ -34,6 +36,12 @@ def bayesian_error_rate(default_flag, prob_default):
         Boolean flag indicating whether the borrower has actually defaulted
     prob_default : pandas series
         Predicted default probability, as returned by a classifier.
+    sample_weight : pandas series, optional
+        Weight of each observation.
+    curve : ScoreCurve, optional
+        Presorted score curve, or ``ScoreHistogram.curve()`` for data that
+        does not fit in memory. When given, the other arguments are ignored,
+        so several metrics can share one sort of the scores.
 
     Returns
     ---------
@@ -50,21 +58,7 @@ def bayesian_error_rate(default_flag, prob_default):
     -0.47140452079103173
     """
 
-    frame = {'default_flag': default_flag,
-             'prob_default': prob_default
-             }
+    if curve is None:
+        curve = ScoreCurve(default_flag, prob_default, sample_weight)
 
-    df = pd.DataFrame(frame)
-
-    fpr, tpr, thresholds = metrics.roc_curve(
-        df['default_flag'], df['prob_default'])
-    roc_curve_df = pd.DataFrame({'c': thresholds,
-                                'hit_rate': tpr,
-                                 'false_alarm_rate': fpr})
-
-    p_d = df.default_flag.sum()/len(df)
-
-    roc_curve_df['ber'] = p_d*(1 - roc_curve_df.hit_rate) + \
-        (1 - p_d) * roc_curve_df.false_alarm_rate
-
-    return round(min(roc_curve_df['ber']), 3)
+    return round(curve.ber(), 3)
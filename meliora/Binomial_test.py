@@ -2,8 +2,13 @@ from scipy.stats import binom
 import pandas as pd
 import numpy as np
 
+from meliora.Grade_Summary import grade_summary
+from meliora.Instrumentation import instrument, stage
 
-def binomial_test(ratings, default_flag, prob_default, alpha):
+
+@instrument
+def binomial_test(ratings=None, default_flag=None, prob_default=None,
+                  alpha=0.05, summary=None, by=None):
     """
     The Binomial Test evaluates whether the PD of a pool is correctly estimated.
 
@@ -32,11 +37,22 @@ def binomial_test(ratings, default_flag, prob_default, alpha):
         predicted defaults for a given class
     alpha : scalar
         Confidence level
+    summary : pandas dataframe, optional
+        Output of ``grade_summary``. When given, ``ratings``,
+        ``default_flag`` and ``prob_default`` are ignored and the per-grade
+        counts are taken from the summary instead of the raw data. Summaries
+        grouped by segment or period are tested in the same vectorized call.
+    by : pandas series or list of pandas series, optional
+        Grouping keys passed to ``grade_summary`` when ``summary`` is not
+        given, e.g. segment and reporting date.
 
     Returns
     -------
     dataframe : pandas dataframe
-        
+        One row per grade (and per grouping key of ``summary``) with the
+        columns ``Number of Obs`` and ``Number of Defaults`` (int64),
+        ``Average PD`` and the two-sided ``P-Value`` (float64) and the
+        outcome ``Binomial Test`` (categorical, 'Accept' or 'reject').
 
     See Also
     --------
@@ -44,32 +60,31 @@ def binomial_test(ratings, default_flag, prob_default, alpha):
 
     """
 
-    df = pd.DataFrame(columns=['Rating',
-                               'Number of Obs',
-                               'Number of Defaults',
-                               'Average PD',
-                               'Binomial Test'])
-
-    for rating in list(set(df.ratings)):
-        # Calculation of binomial factors
-        rating_df = df[df['ratings'] == rating]
-        n_g = len(rating_df)
-        n_1g = sum(rating_df['default_flag'])
-        p_g = np.mean(rating_df['prob_default'])
-        binom_factor1 = binom.cdf(n_1g, n_g, p_g)
-        binom_factor2 = binom.cdf(n_1g-1, n_g, p_g)
+    if summary is None:
+        summary = grade_summary(ratings, default_flag, prob_default, by=by)
 
-        # Binomial test
-        flag = (binom_factor1 <= alpha/2) | (1 - binom_factor2 <= alpha/2)
-        outcome = 'reject' if flag else 'Accept'
+    n_g = summary['N'].to_numpy(dtype=np.int64)
+    n_1g = summary['D'].to_numpy(dtype=np.int64)
+    p_g = summary['PD'].to_numpy(dtype=np.float64)
+
+    # Calculation of binomial factors for all grades at once
+    with stage('distribution', rows=len(n_g)):
+        binom_factor1 = binom.cdf(n_1g, n_g, p_g)
+        binom_factor2 = binom.sf(n_1g-1, n_g, p_g)
+    p_value = np.minimum(1, 2*np.minimum(binom_factor1, binom_factor2))
 
-        # Store results in a dataframe
-        results = {'Rating': rating,
-                   'Number of Obs': n_g,
-                   'Number of Defaults': n_1g,
-                   'Average PD': p_g,
-                   'Binomial Test': outcome}
+    # Binomial test
+    flag = (binom_factor1 <= alpha/2) | (binom_factor2 <= alpha/2)
+    outcome = pd.Categorical.from_codes(flag.astype(np.int8),
+                                        categories=['Accept', 'reject'])
 
-        results = results.append(results, ignore_index=True)
+    # Store results in a dataframe, one row per grade (and segment)
+    with stage('dataframe'):
+        results = summary.index.to_frame(index=False)
+        results['Number of Obs'] = n_g
+        results['Number of Defaults'] = n_1g
+        results['Average PD'] = p_g
+        results['P-Value'] = p_value
+        results['Binomial Test'] = outcome
 
     return results
@@ -1,47 +1,49 @@
-from scipy.stats import binom
-import pandas as pd
 import numpy as np
 
+from meliora.Grade_Summary import grade_summary
+from meliora.Instrumentation import instrument
 
-def cier(ratings, default_flag, prob_default, alpha):
-    """
-    The Binomial Test evaluates whether the PD of a pool is correctly estimated.
 
-    It does not take into account correlated defaults, and it generally yields
-    an overestimate of the significance of deviations in the realized default
-    rate from the forecast rate.
+def _entropy(p):
+    # binary entropy, with 0 * log(0) taken as 0
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = -(p * np.log(p) + (1 - p) * np.log(1 - p))
+    return np.nan_to_num(h)
+
 
-    If the number of default accounts per pool exceeds either the low limit
-    (binomial test at 0.95 confidence) or high limit (binomial test at 0.99
-    confidence), the test suggests that the model is poorly calibrated.
+@instrument
+def cier(ratings=None, default_flag=None, summary=None):
+    """
+    The Conditional Information Entropy Ratio measures the information
+    about default events that is contained in the rating grades.
 
-    The Confidence Interval indicates the confidence interval band of the actual
-    PD or LGD for a pool. The Probability of Default (PD) report provides the PD
-    that is estimated from the model and the actual PD with its confidence
-    interval limits. If the PD that is estimated from the model is within the
-    confidence interval limits of the actual PD, then the model outcomes are
-    consistent with the actual outcomes.
+    The unconditional entropy H0 is the binary entropy of the portfolio
+    default rate, i.e. the uncertainty about default when nothing is known
+    about the borrower. The conditional entropy H1 is the average entropy
+    of the default rates within the rating grades, weighted by the number
+    of observations in each grade. CIER is the relative reduction of
+    uncertainty achieved by the rating system:
 
+        CIER = (H0 - H1) / H0
+
+    A rating system without discriminatory power has a CIER of zero,
+    while a perfect rating system has a CIER of one.
 
     Parameters
     ----------
     ratings : pandas series
-        Series with PD ratings 
+        Series with PD ratings
     default_flag : boolean flag
         Actual defaults in the dataset
-    prob_default : pandas series
-        predicted defaults for a given class
-    alpha : scalar
-        Confidence level
+    summary : pandas dataframe, optional
+        Output of ``grade_summary``. When given, ``ratings`` and
+        ``default_flag`` are ignored.
 
     Returns
     -------
-    dataframe : pandas dataframe
- 
-
-    See Also
-    ----------
-    Adjusted binomial test: Compute the binomial test assuming correlated defaults
+    cier : float
+        Conditional Information Entropy Ratio
 
 
     References
@@ -51,32 +53,14 @@ def cier(ratings, default_flag, prob_default, alpha):
 
     """
 
-    df = pd.DataFrame(columns=['Rating',
-                               'Number of Obs',
-                               'Number of Defaults',
-                               'Average PD',
-                               'Binomial Test'])
-
-    for rating in list(set(df.ratings)):
-        # Calculation of binomial factors
-        rating_df = df[df['ratings'] == rating]
-        n_g = len(rating_df)
-        n_1g = sum(rating_df['default_flag'])
-        p_g = np.mean(rating_df['prob_default'])
-        binom_factor1 = binom.cdf(n_1g, n_g, p_g)
-        binom_factor2 = binom.cdf(n_1g-1, n_g, p_g)
-
-        # Binomial test
-        flag = (binom_factor1 <= alpha/2) | (1 - binom_factor2 <= alpha/2)
-        outcome = 'reject' if flag else 'Accept'
-
-        # Store results in a dataframe
-        results = {'Rating': rating,
-                   'Number of Obs': n_g,
-                   'Number of Defaults': n_1g,
-                   'Average PD': p_g,
-                   'Binomial Test': outcome}
-
-        results = results.append(results, ignore_index=True)
-
-    return results
+    if summary is None:
+        summary = grade_summary(ratings, default_flag)
+
+    n_g = summary['N'].values
+    d_g = summary['D'].values
+    n = n_g.sum()
+
+    h0 = _entropy(d_g.sum() / n)
+    h1 = (n_g / n * _entropy(d_g / n_g)).sum()
+
+    return (h0 - h1) / h0
@@ -1,8 +1,53 @@
 import pandas as pd
 import numpy as np
-from sklearn.metrics import auc
 
+from meliora.Bootstrap import BootstrapResult
+from meliora.Columnar_Input import as_array
+from meliora.Instrumentation import instrument, stage
 
+
+def _bands(predicted_ratings, realised_outcomes):
+    # observations with a missing predicted or realised LGD are dropped
+    predicted = as_array(predicted_ratings)
+    realised = as_array(realised_outcomes, np.float64)
+    valid = ~(pd.isna(predicted) | np.isnan(realised))
+    if not valid.all():
+        predicted, realised = predicted[valid], realised[valid]
+    band, K = _band_codes(predicted)
+    return band, K, realised
+
+
+def _band_codes(predicted):
+    # band 0 holds the highest predicted LGD
+    if np.issubdtype(predicted.dtype, np.integer):
+        top = predicted.max()
+        codes = top - predicted
+        return codes, int(top - predicted.min()) + 1
+    codes, bands = pd.factorize(predicted, sort=True)
+    return len(bands) - 1 - codes, len(bands)
+
+
+def _clar(band, realised, K):
+    n = len(band)
+    # cumulative number of observations in the top bands: the x-axis
+    k = np.cumsum(np.bincount(band, minlength=K))
+
+    # single sort of the realised outcomes, highest first
+    order = np.argsort(-realised, kind='stable')
+    # an observation is correctly assigned from the first band j on where
+    # it is both in the top j predicted bands and among the top k_j realised
+    first_band = np.searchsorted(k, np.arange(n), side='right')
+    correct = np.maximum(band[order], first_band)
+    hits = np.cumsum(np.bincount(correct, minlength=K))
+
+    x_values = np.r_[0, k] / n
+    y_values = np.r_[0, hits] / n
+
+    model_auc = np.sum(np.diff(x_values) * (y_values[1:] + y_values[:-1])) / 2
+    return float(2*model_auc)
+
+
+@instrument
 def clar(predicted_ratings, realised_outcomes):
     """
     CLAR serves as a measure of ranking ability against LGD risk
@@ -24,6 +69,16 @@ def clar(predicted_ratings, realised_outcomes):
     clar: scalar
         Cumulative LGD Accuracy Ratio
 
+    Notes
+    -----
+    The predicted ratings define bands, ordered from the highest predicted
+    LGD. For the top j bands, holding k_j observations, the curve plots
+    k_j / n against the share of observations that are both in the top j
+    bands and among the k_j highest realised outcomes. The outcomes are
+    sorted once and all bands are evaluated from cumulative counts.
+    Integer-coded ratings skip the factorization step. Observations with a
+    missing predicted or realised LGD are left out.
+
     References
     --------------
     [1] Ozdemir, B., Miu, P., 2009. Basel II Implementation.
@@ -39,31 +94,59 @@ def clar(predicted_ratings, realised_outcomes):
 
     """
 
-    # Create a dataframe
-    frame = {
-             'predicted_ratings': predicted_ratings,
-             'realised_outcomes': realised_outcomes
-             }
-    df = pd.DataFrame(frame)
+    band, K, realised = _bands(predicted_ratings, realised_outcomes)
 
     # Calculate CLAR
-    x_s = [0]
-    x_values = [0]
-    y_values = [0]
+    with stage('sorting', rows=len(band)):
+        clar = _clar(band, realised, K)
 
-    for i, j in enumerate(list(set(df.bucket))[::-1]):
-        x = (df.predicted_ratings == j).sum()
-        x_bucket = df.sort_values(by='realised_outcomes', ascending=False)[x_s[i]:x_s[i]+x]
-        x_value = x/len(df)
-        y_value = (x_bucket.bucket == j).sum()/len((x_bucket.bucket == j))
-        x_values.append(x_value)
-        y_values.append(y_value)
-        x_s.append(x+1)
+    return clar
 
-    new_xvalues = list(np.cumsum(x_values))
-    new_yvalues = list(np.cumsum(y_values))
 
-    model_auc = auc(new_xvalues, new_yvalues)
-    clar = 2*model_auc
+@instrument
+def clar_ci(predicted_ratings, realised_outcomes, n_boot=1000, alpha=0.05,
+            random_state=None):
+    """
+    CLAR with a bootstrap percentile confidence interval
 
-    return clar
+    Parameters
+    ----------
+    predicted_ratings: pandas Series
+        predicted LGD, can be ordinal or continuous
+    realised_outcomes: pandas Series
+        realised LGD, can be ordinal or continuous
+    n_boot: int, optional
+        number of bootstrap samples
+    alpha: float, optional
+        significance level of the percentile interval
+    random_state: int or numpy Generator, optional
+        seed for the bootstrap samples
+
+    Returns
+    -------
+    result: BootstrapResult
+        ``estimate`` (as returned by ``clar``), ``ci_lower``, ``ci_upper``
+        and the bootstrap ``replicates``
+
+    Examples
+    --------
+        >>> res = clar_ci(predicted_ratings, realised_outcomes, n_boot=1000)
+        >>> print(res.ci_lower, res.ci_upper)
+
+    """
+
+    band, K, realised = _bands(predicted_ratings, realised_outcomes)
+
+    with stage('sorting', rows=len(band)):
+        clar = _clar(band, realised, K)
+
+    rng = np.random.default_rng(random_state)
+    n = len(band)
+    boot = np.empty(n_boot)
+    with stage('bootstrap', rows=n * n_boot):
+        for b in range(n_boot):
+            idx = rng.integers(0, n, n)
+            boot[b] = _clar(band[idx], realised[idx], K)
+    ci_lower, ci_upper = np.quantile(boot, [alpha/2, 1 - alpha/2])
+
+    return BootstrapResult(clar, ci_lower, ci_upper, boot)
@@ -0,0 +1,147 @@
+import os
+
+import pandas as pd
+
+from meliora.Columnar_Input import as_array
+
+
+def _file_format(path):
+    name = os.fspath(path).lower()
+    for suffix in ('.gz', '.bz2', '.zip', '.xz', '.zst'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    if name.endswith(('.parquet', '.pq')):
+        return 'parquet'
+    if name.endswith(('.csv', '.txt')):
+        return 'csv'
+    raise ValueError('cannot infer the format of {}, pass file_format'.format(
+        path))
+
+
+def read_chunks(path, columns=None, dtypes=None, chunksize=1000000,
+                file_format=None):
+    """
+    Read a Parquet or CSV file as a stream of column chunks.
+
+    Parquet files are read batch by batch from their row groups with
+    PyArrow, CSV files block by block with ``pandas.read_csv``; at most
+    ``chunksize`` rows are held in memory at a time. Every chunk is a dict
+    of NumPy arrays with a fixed dtype per column, which all table inputs
+    of ``meliora`` accept, so the chunks can be fed directly to the
+    ``update`` methods of the accumulators.
+
+    Parameters
+    ----------
+    path : string or path-like
+        Parquet or CSV file
+    columns : list of strings, optional
+        Columns to read, defaults to all columns
+    dtypes : dict, optional
+        Column name -> NumPy dtype, applied to every chunk so that the
+        chunks share one schema, e.g. ``{'ratings': np.int16}``. CSV
+        columns not listed keep the dtype inferred on the first chunk; a
+        later chunk that does not fit it (e.g. a missing value in an
+        integer column) raises ValueError.
+    chunksize : int
+        Maximum number of rows per chunk
+    file_format : {'parquet', 'csv'}, optional
+        Defaults to the file extension
+
+    Yields
+    ------
+    chunk : dict
+        Column name -> NumPy array
+
+    Examples
+    --------
+    >>> acc = GradeAccumulator()
+    >>> for chunk in read_chunks('portfolio.parquet',
+    ...                          columns=['ratings', 'default_flag',
+    ...                                   'prob_default']):
+    ...     acc.update(chunk)
+    >>> acc.jeffreys_test()
+    """
+
+    dtypes = dict(dtypes or {})
+    file_format = file_format or _file_format(path)
+
+    if file_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('reading Parquet files requires pyarrow')
+
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunksize,
+                                          columns=columns):
+            yield {name: as_array(batch.column(i), dtypes.get(name))
+                   for i, name in enumerate(batch.schema.names)}
+
+    elif file_format == 'csv':
+        def chunk(frame):
+            return {name: as_array(frame[name], dtypes.get(name))
+                    for name in frame.columns}
+
+        reader = pd.read_csv(path, usecols=columns, dtype=dtypes or None,
+                             chunksize=chunksize)
+        with reader:
+            first = next(reader, None)
+            if first is None:
+                return
+            yield chunk(first)
+            if len(first) < chunksize:
+                return
+
+        # pandas infers the dtypes of every block on its own; the later
+        # blocks are parsed with those inferred on the first one
+        schema = {name: first[name].dtype for name in first.columns}
+        schema.update(dtypes)
+        reader = pd.read_csv(path, usecols=columns, dtype=schema,
+                             skiprows=range(1, len(first) + 1),
+                             chunksize=chunksize)
+        with reader:
+            try:
+                for frame in reader:
+                    yield chunk(frame)
+            except ValueError as error:
+                raise ValueError('a chunk does not fit the dtypes of the '
+                                 'first chunk, pass dtypes: {}'.format(error))
+
+    else:
+        raise ValueError("file_format must be 'parquet' or 'csv'")
+
+
+def run_chunks(chunks, *accumulators):
+    """
+    Feed a stream of chunks to one or more accumulators in a single pass.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Chunks, e.g. from ``read_chunks``
+    *accumulators
+        Objects with an ``update(chunk)`` method: ``GradeAccumulator``,
+        ``MomentAccumulator``, ``WoEAccumulator``, or callables taking the
+        chunk, e.g. ``functools.partial(psi.update, period_col='month')``
+        for a ``PopulationStabilityIndex``
+
+    Returns
+    -------
+    accumulators : tuple
+        The accumulators, updated with all chunks
+
+    Examples
+    --------
+    >>> grades, lgd = run_chunks(read_chunks('portfolio.csv'),
+    ...                          GradeAccumulator(),
+    ...                          MomentAccumulator('LGD', 'PRED_LGD'))
+    >>> grades.binomial_test(), lgd.result()
+    """
+
+    updates = [acc.update if hasattr(acc, 'update') else acc
+               for acc in accumulators]
+    for chunk in chunks:
+        for update in updates:
+            update(chunk)
+
+    return accumulators
@@ -0,0 +1,77 @@
+import numpy as np
+
+
+def _library(obj):
+    # detect pyarrow / polars objects without importing those packages
+    return type(obj).__module__.split('.')[0]
+
+
+def as_array(values, dtype=None):
+    """
+    Contiguous NumPy view of a column, copying only when unavoidable.
+
+    Accepts NumPy arrays, pandas Series and Index objects, PyArrow Arrays
+    and ChunkedArrays, Polars Series and plain sequences. Data that is
+    already contiguous in the requested dtype is returned without a copy;
+    a copy is made for multi-chunk Arrow columns, columns with missing
+    values in Arrow/Polars, and dtype conversions.
+
+    Parameters
+    ----------
+    values : array-like
+        Column data
+    dtype : numpy dtype, optional
+        Requested dtype. If omitted, the dtype of the data is kept.
+
+    Returns
+    -------
+    array : numpy ndarray
+        One-dimensional, C-contiguous array
+
+    Examples
+    --------
+    >>> as_array(table.column('prob_default'), np.float64)
+    """
+
+    library = _library(values)
+
+    if library == 'pyarrow':
+        if hasattr(values, 'num_chunks'):
+            values = values.chunk(0) if values.num_chunks == 1 \
+                else values.combine_chunks()
+        values = values.to_numpy(zero_copy_only=False)
+    elif library in ('polars', 'pandas'):
+        values = values.to_numpy()
+
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def column(data, name, dtype=None):
+    """
+    Contiguous NumPy view of the column ``name`` of a table.
+
+    Parameters
+    ----------
+    data : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+        Table holding the column
+    name : string
+        Column name
+    dtype : numpy dtype, optional
+        Requested dtype
+
+    Returns
+    -------
+    array : numpy ndarray
+        See ``as_array``
+    """
+
+    library = _library(data)
+
+    if library == 'pyarrow':
+        values = data.column(name)
+    elif library == 'polars':
+        values = data.get_column(name)
+    else:
+        values = data[name]
+
+    return as_array(values, dtype)
@@ -1,7 +1,10 @@
-import numpy as np
+from meliora.Instrumentation import instrument
+from meliora.LGD_t_test import grouped_t_test
 
 
-def elbe_t_test(observed_lgd, elbe):
+@instrument
+def elbe_t_test(observed_lgd, elbe, by=None, sample_weight=None,
+                alternative='two-sided'):
     """
     The objective of this validation tool (ELBE back-testing using 1
     a one-sample t-test for paired observations) is to assess the 
@@ -21,6 +24,13 @@ def elbe_t_test(observed_lgd, elbe):
         realised LGD, float
     elbe: pandas Series
         ELBE for each facility, float
+    by: pandas Series or list of pandas Series, optional
+        grouping keys (grade, pool, segment, reference point in default);
+        all groups are tested in one pass
+    sample_weight: pandas Series, optional
+        weights, e.g. EAD
+    alternative: {'two-sided', 'greater', 'less'}
+        alternative hypothesis on realised LGD minus ELBE
 
     Returns
     -------
@@ -28,6 +38,8 @@ def elbe_t_test(observed_lgd, elbe):
         t-statistics
     p_value: scalar
         p-value
+    results: pandas dataframe
+        if ``by`` is given, the output of ``grouped_t_test`` instead
 
     References
     --------------
@@ -41,12 +53,10 @@ def elbe_t_test(observed_lgd, elbe):
 
     """
 
-    N = len(observed_lgd)
-    error = observed_lgd - elbe
-    mean_error = error.mean()
-    num = np.sqrt(N)*mean_error
-    s2 = (((observed_lgd - elbe) - mean_error)**2).sum()/(N-1)
-    t_stat = num/np.sqrt(s2)
-    p_value = 2*(1 - t.cdf(abs(t_stat), df=N-1))
+    results = grouped_t_test(observed_lgd, elbe, by=by,
+                             sample_weight=sample_weight,
+                             alternative=alternative)
+    if by is not None:
+        return results
 
-    return t_stat, p_value 
+    return results['T-Stat'].iloc[0], results['P-Value'].iloc[0]
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from meliora.Columnar_Input import as_array
+from meliora.Instrumentation import count, instrument, stage
+
+
+def _group_codes(keys, names, mask=None):
+    # factorize every key once and combine them into a single group code;
+    # rows with a missing key, or False in ``mask``, are left out
+    level_codes = []
+    level_values = []
+    for key in keys:
+        values = as_array(key)
+        if mask is not None:
+            values = values[mask]
+        codes, uniques = pd.factorize(values, sort=True)
+        level_codes.append(codes)
+        level_values.append(uniques)
+
+    valid = np.logical_and.reduce([c >= 0 for c in level_codes])
+    if not valid.all():
+        level_codes = [c[valid] for c in level_codes]
+    if mask is not None:
+        valid = _expand(mask, valid)
+
+    if len(keys) == 1:
+        return level_codes[0], pd.Index(level_values[0], name=names[0]), valid
+
+    dims = tuple(len(v) for v in level_values)
+    flat = np.ravel_multi_index(level_codes, dims)
+    codes, cells = pd.factorize(flat, sort=True)
+    cell_codes = np.unravel_index(cells, dims)
+    index = pd.MultiIndex.from_arrays(
+        [v.take(c) for v, c in zip(level_values, cell_codes)], names=names)
+
+    return codes, index, valid
+
+
+def _expand(mask, valid):
+    # validity of all rows from the validity of the rows kept by ``mask``
+    expanded = np.zeros(len(mask), dtype=bool)
+    expanded[mask] = valid
+    return expanded
+
+
+@instrument
+def grade_summary(ratings, default_flag, prob_default=None, by=None):
+    """
+    Per-grade aggregation shared by the calibration tests.
+
+    The number of observations, the number of defaults, the sum of the
+    predicted PDs and the average predicted PD are computed for every
+    rating grade in a single pass over the data: the ratings are factorized
+    once and all per-grade totals are obtained with ``np.bincount``.
+
+    The resulting table can be passed to ``binomial_test``, ``cier``,
+    ``hosmer_lemeshow`` and ``jeffreys_test`` via their ``summary``
+    argument, so that a full calibration run only scans the portfolio once.
+
+    Parameters
+    ----------
+    ratings : pandas series
+        Series with PD ratings
+    default_flag : pandas series
+        Boolean flag indicating whether the borrower has actually defaulted
+    prob_default : pandas series, optional
+        Predicted default probabilities. If omitted, the PD columns are NaN.
+    by : pandas series or list of pandas series, optional
+        Additional grouping keys (e.g. segment, reporting date). Every
+        combination of keys and rating that occurs in the data becomes one
+        row of the summary.
+
+    Returns
+    -------
+    summary : pandas dataframe
+        Indexed by rating (sorted), with columns ``N``, ``D``, ``PD Sum``
+        and ``PD``. If ``by`` is given, the index is a MultiIndex with the
+        grouping keys followed by ``Rating``. Observations with a missing
+        rating, grouping key or default flag are dropped.
+
+    Examples
+    --------
+    >>> summary = grade_summary(df.ratings, df.default_flag, df.prob_default)
+    >>> binomial_test(summary=summary, alpha=0.05)
+    """
+
+    if by is None:
+        by = []
+    elif not isinstance(by, (list, tuple)):
+        by = [by]
+
+    keys = list(by) + [ratings]
+    names = [getattr(key, 'name', None) for key in by] + ['Rating']
+
+    with stage('grouping'):
+        flags = as_array(default_flag)
+        # unknown outcomes are neither defaults nor non-defaults
+        known = None
+        if flags.dtype.kind in 'fcO':
+            known = ~pd.isna(flags)
+            if known.all():
+                known = None
+        codes, index, valid = _group_codes(keys, names, known)
+        has_missing = not valid.all()
+
+        if has_missing:
+            flags = flags[valid]
+        defaults = flags.astype(bool, copy=False)
+
+        K = len(index)
+        n = np.bincount(codes, minlength=K)
+        d = np.bincount(codes[defaults], minlength=K)
+
+        if prob_default is None:
+            pd_sum = np.full(K, np.nan)
+        else:
+            pds = as_array(prob_default, np.float64)
+            if has_missing:
+                pds = pds[valid]
+            pd_sum = np.bincount(codes, weights=pds, minlength=K)
+        count('groups', K)
+
+    with stage('dataframe'):
+        summary = pd.DataFrame({'N': n,
+                                'D': d,
+                                'PD Sum': pd_sum,
+                                'PD': pd_sum / n},
+                               index=index)
+
+    return summary
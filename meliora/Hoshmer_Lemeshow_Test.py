@@ -1,9 +1,39 @@
-from scipy.stats import chi2
-import pandas as pd
+import warnings
+
 import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+
+from meliora.Columnar_Input import as_array
+from meliora.Grade_Summary import _group_codes, grade_summary
+from meliora.Instrumentation import count, instrument, stage
+
+
+def _decile_groups(prob_default, segment_codes, n_segments, bins):
+    # equal-sized PD groups per segment, with np.partition at the quantile
+    # positions instead of a full sort; tied PDs stay in the same group
+    groups = np.empty(len(prob_default), dtype=np.int64)
+
+    if n_segments == 1:
+        slices = [np.arange(len(prob_default))]
+    else:
+        order = np.argsort(segment_codes, kind='stable')
+        bounds = np.cumsum(np.bincount(segment_codes, minlength=n_segments))
+        slices = np.split(order, bounds[:-1])
+
+    for idx in slices:
+        values = prob_default[idx]
+        kth = np.arange(1, bins) * len(values) // bins
+        edges = np.partition(values, kth)[kth]
+        groups[idx] = np.searchsorted(edges, values, side='right')
+
+    return groups
 
 
-def hosmer_lemeshow(ratings, default_flag, prob_default, alpha, chi_stat):
+@instrument
+def hosmer_lemeshow(ratings=None, default_flag=None, prob_default=None,
+                    alpha=0.05, chi_stat=None, *, summary=None,
+                    groups='ratings', bins=10, by=None, ddof=0):
     """
     A statistical test for goodness-of-fit for classification models.
 
@@ -20,6 +50,16 @@ def hosmer_lemeshow(ratings, default_flag, prob_default, alpha, chi_stat):
     confidence interval limits of the actual PD, then the model outcomes are
     consistent with the actual outcomes.
 
+    The observations are aggregated once into per-group counts with
+    ``grade_summary`` and the statistic
+
+        chi = sum_g (D_g - N_g * PD_g)**2 / (N_g * PD_g * (1 - PD_g))
+
+    of all groups, segments and significance levels is evaluated on these
+    arrays. It is compared with a chi-square distribution with G - ``ddof``
+    degrees of freedom, G being the number of groups. For PDs that were not
+    estimated on the tested sample (backtesting) ``ddof`` is 0; use 2 for
+    the in-sample test of a fitted logistic model.
 
     Parameters
     ----------
@@ -29,12 +69,44 @@ def hosmer_lemeshow(ratings, default_flag, prob_default, alpha, chi_stat):
         Actual defaults in the dataset
     prob_default : pandas series
         predicted defaults for a given class
-    alpha : scalar
-        Confidence level
+    alpha : scalar or list of scalars
+        Significance level(s)
+    chi_stat : scalar, optional
+        Deprecated starting value of the statistic, kept for calls of the
+        former signature ``(ratings, default_flag, prob_default, alpha,
+        chi_stat)``; added to the statistic of every segment
+    summary : pandas dataframe, optional
+        Output of ``grade_summary``. When given, the raw series are ignored;
+        leading index levels are treated as segments.
+    groups : {'ratings', 'deciles'} or sequence of scalars
+        Pools of the test: the rating grades, ``bins`` equal-sized groups
+        of predicted PD per segment, or custom PD bin edges
+    bins : int
+        Number of PD groups for ``groups='deciles'``
+    by : pandas series or list of pandas series, optional
+        Segments tested in the same call, e.g. model or portfolio
+    ddof : int
+        Reduction of the degrees of freedom. Segments with no more groups
+        than ``ddof``, or with a group whose average PD is 0, 1 or missing,
+        cannot be tested: their p-value is NaN and their outcome
+        'Undetermined', with a RuntimeWarning.
 
     Returns
     -------
+    p_value, outcome : float, string
+        For a single segment and a scalar ``alpha``: the p-value and
+        'Pass', 'Fail' or 'Undetermined'.
     dataframe : pandas dataframe
+        Otherwise one row per segment with ``Chi-Square``, ``DoF``,
+        ``P-Value`` and a ``Pass/Fail`` column (one per level, labelled
+        ``Pass/Fail (alpha=...)``, if ``alpha`` is a list).
+
+    Examples
+    --------
+    >>> hosmer_lemeshow(df.ratings, df.default_flag, df.prob_default)
+    >>> hosmer_lemeshow(default_flag=df.default_flag,
+    ...                 prob_default=df.prob_default, groups='deciles',
+    ...                 by=df.model, alpha=[0.01, 0.05])
 
     See Also
     --------
@@ -42,24 +114,100 @@ def hosmer_lemeshow(ratings, default_flag, prob_default, alpha, chi_stat):
 
     """
 
-    frame = {'ratings': ratings,
-             'default_flag': default_flag,
-             'prob_default': prob_default
-             }
+    if chi_stat is not None:
+        warnings.warn('chi_stat is deprecated and will be removed; the '
+                      'statistic no longer needs a starting value',
+                      DeprecationWarning, stacklevel=3)
+
+    if by is None:
+        by = []
+    elif not isinstance(by, (list, tuple)):
+        by = [by]
+
+    if summary is None:
+        if isinstance(groups, str) and groups == 'ratings':
+            keys = ratings
+        else:
+            pds = as_array(prob_default, np.float64)
+            # observations with a missing PD or segment get a missing key
+            # and are dropped by grade_summary
+            known = ~np.isnan(pds)
+            keys = np.full(len(pds), np.nan)
+            with stage('sorting', rows=len(pds)):
+                if isinstance(groups, str):
+                    if by:
+                        codes, index, valid = _group_codes(
+                            by, [getattr(key, 'name', None) for key in by],
+                            known)
+                        keys[valid] = _decile_groups(pds[valid], codes,
+                                                     len(index), bins)
+                    else:
+                        keys[known] = _decile_groups(pds[known], None, 1,
+                                                     bins)
+                else:
+                    keys[known] = np.digitize(pds[known], groups)
+        summary = grade_summary(keys, default_flag, prob_default, by=by)
+
+    n_g = summary['N'].to_numpy(dtype=np.float64)
+    d_g = summary['D'].to_numpy(dtype=np.float64)
+    p_g = summary['PD'].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = (d_g - n_g * p_g)**2 / (n_g * p_g * (1 - p_g))
+
+    # sum the terms of every segment
+    if summary.index.nlevels > 1:
+        segments = summary.index.droplevel(-1)
+        seg_codes, seg_index = pd.factorize(segments)
+        seg_index.names = segments.names
+    else:
+        seg_codes = np.zeros(len(summary), dtype=np.int64)
+        seg_index = None
+
+    n_segments = seg_codes.max() + 1 if len(seg_codes) else 0
+    chi_stat = np.bincount(seg_codes, weights=terms, minlength=n_segments) \
+        + (chi_stat or 0)
+    dof = np.bincount(seg_codes, minlength=n_segments) - ddof
+    count('segments', n_segments)
+
+    # segments that cannot be tested: no degrees of freedom left, or a
+    # group with a PD of 0, 1 or missing (no finite chi-square term)
+    no_dof = dof <= 0
+    degenerate = np.bincount(seg_codes, weights=~np.isfinite(terms),
+                             minlength=n_segments) > 0
+    undetermined = no_dof | degenerate
+    if no_dof.any():
+        warnings.warn('{} segment(s) have no more groups than ddof={}; '
+                      'their p-value is NaN'.format(
+                          np.count_nonzero(no_dof), ddof),
+                      RuntimeWarning, stacklevel=3)
+    if degenerate.any():
+        warnings.warn('{} segment(s) have a group with a PD of 0, 1 or '
+                      'missing; their p-value is NaN'.format(
+                          np.count_nonzero(degenerate)),
+                      RuntimeWarning, stacklevel=3)
 
-    df = pd.DataFrame(frame)
+    with stage('distribution', rows=n_segments):
+        p_value = np.full(n_segments, np.nan)
+        p_value[~undetermined] = chi2.sf(chi_stat[~undetermined],
+                                         dof[~undetermined])
 
-    for rating in list(set(df.ratings)):
-        rating_df = df[df['ratings'] == rating]
-        n_g = len(rating_df)
-        n_1g = sum(rating_df['default_flag'])
-        p_g = np.mean(rating_df['prob_default'])
-        e_g = n_g * p_g
+    alphas = np.atleast_1d(alpha)
+    outcomes = [np.select([undetermined, p_value >= a],
+                          ['Undetermined', 'Pass'], 'Fail') for a in alphas]
 
-        chi_stat += (n_1g-e_g)**2/(n_g*p_g*(1-p_g))
+    if seg_index is None and np.ndim(alpha) == 0:
+        return float(p_value[0]), str(outcomes[0][0])
 
-    # Outcomes
-    p_value = 1 - chi2.cdf(chi_stat, df=len(df.ratings)-2)
-    outcome = 'Pass' if p_value < alpha else 'Fail'
+    with stage('dataframe'):
+        results = pd.DataFrame({'Chi-Square': chi_stat,
+                                'DoF': dof,
+                                'P-Value': p_value},
+                               index=seg_index)
+        if np.ndim(alpha) == 0:
+            results['Pass/Fail'] = outcomes[0]
+        else:
+            for a, outcome in zip(alphas, outcomes):
+                results['Pass/Fail (alpha={})'.format(a)] = outcome
 
-    return p_value, outcome
+    return results
@@ -1,6 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+from meliora.Columnar_Input import as_array, column
+from meliora.Instrumentation import instrument, stage
+
+
+def _feature_counts(values, bad, bins=None):
+    # one pass over the column: category codes, then bincount of all and bad
+    values = as_array(values)
+    if bins is not None and np.issubdtype(values.dtype, np.number):
+        edges = np.unique(np.nanquantile(values, np.linspace(0, 1, bins + 1)))
+        codes = np.clip(np.searchsorted(edges, values, side='right') - 1,
+                        0, max(len(edges) - 2, 0))
+        codes[np.isnan(values)] = -1
+        labels = pd.IntervalIndex.from_breaks(edges, closed='left') \
+            if len(edges) > 1 else pd.Index(edges)
+    else:
+        codes, labels = pd.factorize(values, sort=True)
+
+    valid = codes >= 0
+    K = len(labels)
+    with stage('grouping', rows=len(codes)):
+        all_count = np.bincount(codes[valid], minlength=K)
+        bad_count = np.bincount(codes[valid & bad], minlength=K)
+
+    return labels, all_count, bad_count
+
+
+def _woe_table(feature, labels, all_count, bad_count):
+    data = pd.DataFrame({'Variable': feature,
+                         'Value': labels,
+                         'All': all_count,
+                         'Bad': bad_count})
+    data = data[data['Bad'] > 0].reset_index(drop=True)
+
+    data['Share'] = data['All'] / data['All'].sum()
+    data['Bad Rate'] = data['Bad'] / data['All']
+    data['Distribution Good'] = (data['All'] - data['Bad']) / (data['All'].sum() - data['Bad'].sum())
+    data['Distribution Bad'] = data['Bad'] / data['Bad'].sum()
+    data['WoE'] = np.log(data['Distribution Good'] / data['Distribution Bad'])
+    data['IV'] = (data['WoE'] * (data['Distribution Good'] - data['Distribution Bad'])).sum()
+
+    return data
+
+
+def _woe_tables(columns, bad, bins):
+    return [_woe_table(feature, *_feature_counts(values, bad, bins))
+            for feature, values in columns]
+
+
+@instrument
+def calc_woe_iv(df, features, target, bins=None, n_jobs=1):
+    """
+    Weight of evidence and information value for many features at once.
+
+    For every feature the number of all and bad observations per category
+    is obtained from a single pass over the column (categorical codes and
+    ``np.bincount``), and WoE and IV are derived from these counts in the
+    same way as in ``calc_iv``.
+
+    Parameters
+    ----------
+    df : Pandas dataframe
+        Contains information on the features and the target variable
+    features : list of strings
+        independent variables
+    target : string
+        dependent variable, 1 for bad
+    bins : int, optional
+        If given, numeric features are cut into (at most) this many
+        quantile bins before counting. Other features are used as is.
+    n_jobs : int
+        Number of worker processes. Features are split into ``n_jobs``
+        chunks that are processed in parallel.
+
+    Returns
+    -------
+    data : Pandas dataframe
+        One row per feature and category with the columns Variable, Value,
+        All, Bad, Share, Bad Rate, Distribution Good, Distribution Bad, WoE
+        and IV (the information value of the feature). Categories without
+        bad observations are left out, as in ``calc_iv``.
+
+    Examples
+    --------
+    >>> table = calc_woe_iv(df, ['age', 'region'], 'default_flag', bins=10)
+    >>> table.groupby('Variable')['IV'].first()
+
+    """
+
+    bad = column(df, target) == 1
+    columns = [(feature, column(df, feature)) for feature in features]
+
+    if n_jobs == 1 or len(columns) < 2:
+        tables = _woe_tables(columns, bad, bins)
+    else:
+        chunks = [columns[i::n_jobs] for i in range(n_jobs)]
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_woe_tables, chunks,
+                                        [bad] * n_jobs, [bins] * n_jobs))
+        # restore the order of the features
+        tables = [None] * len(columns)
+        for i, chunk_tables in enumerate(results):
+            tables[i::n_jobs] = chunk_tables
+
+    return pd.concat(tables, ignore_index=True)
 
+
+@instrument
 def calc_iv(df, feature, target, pr=0):
     """
     A numerical value that quantifies the predictive power of an independent 
@@ -26,7 +135,7 @@ def calc_iv(df, feature, target, pr=0):
         Contains information on the the feature and target variable
     feature : string
         independent variable
-    feature : string
+    target : string
         dependent variable
 
     Returns
@@ -48,22 +157,9 @@ def calc_iv(df, feature, target, pr=0):
     
     """
 
-    lst = []
-
-    for i in range(df[feature].nunique()):
-        val = list(df[feature].unique())[i]
-        lst.append([feature, val, df[df[feature] == val].count()[feature], df[(df[feature] == val) & (df[target] == 1)].count()[feature]])
-
-    data = pd.DataFrame(lst, columns=['Variable', 'Value', 'All', 'Bad'])
-    data = data[data['Bad'] > 0]
-
-    data['Share'] = data['All'] / data['All'].sum()
-    data['Bad Rate'] = data['Bad'] / data['All']
-    data['Distribution Good'] = (data['All'] - data['Bad']) / (data['All'].sum() - data['Bad'].sum())
-    data['Distribution Bad'] = data['Bad'] / data['Bad'].sum()
-    data['WoE'] = np.log(data['Distribution Good'] / data['Distribution Bad'])
-    data['IV'] = (data['WoE'] * (data['Distribution Good'] - data['Distribution Bad'])).sum()
-
-    data = data.sort_values(by=['Variable', 'Value'], ascending=True)
+    labels, all_count, bad_count = _feature_counts(column(df, feature),
+                                                   column(df, target) == 1)
+    with stage('dataframe'):
+        data = _woe_table(feature, labels, all_count, bad_count)
 
-    return data['IV'].values[0]
\ No newline at end of file
+    return data['IV'].values[0]
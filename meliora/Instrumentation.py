@@ -0,0 +1,455 @@
+import os
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import wraps
+
+
+class StageRecord(namedtuple('StageRecord', ['test', 'stage', 'elapsed',
+                                             'rows', 'peak_memory',
+                                             'counters'])):
+    """
+    Measurement of one instrumented call or stage, passed to the exporters.
+
+    Attributes
+    ----------
+    test : string
+        Name of the outermost stage, usually the validation test called
+    stage : string
+        Path of the stage within the test, e.g.
+        'grade_summary/grouping'; 'total' for the test itself
+    elapsed : float
+        Wall time in seconds
+    rows : int or None
+        Number of rows processed, if known
+    peak_memory : int or None
+        Peak traced allocation above the level at the start of the stage,
+        in bytes; only measured with ``memory=True``
+    counters : dict
+        Values added with ``count`` within the stage (not its sub-stages)
+    """
+
+    __slots__ = ()
+
+
+class _Config:
+    enabled = False
+    memory = False
+    exporters = ()
+
+
+_CONFIG = _Config()
+# open stages of the current thread, outermost first
+_LOCAL = threading.local()
+
+
+def _stack():
+    try:
+        return _LOCAL.stack
+    except AttributeError:
+        _LOCAL.stack = []
+        return _LOCAL.stack
+
+
+class _NullStage:
+    # shared no-op stage while instrumentation is disabled
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('name', 'rows', 'counters', 'start', 'base', 'peak')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = None if rows is None else int(rows)
+        self.counters = {}
+
+    def __enter__(self):
+        stack = _stack()
+        if _CONFIG.memory and tracemalloc.is_tracing():
+            # hand the peak so far to the enclosing stage, then measure
+            # this stage from its own starting level
+            current, peak = tracemalloc.get_traced_memory()
+            if stack and stack[-1].base is not None:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.base = self.peak = current
+        else:
+            self.base = None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+
+        peak_memory = None
+        if self.base is not None and tracemalloc.is_tracing():
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak_memory = self.peak - self.base
+            if stack and stack[-1].base is not None:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+
+        path = [frame.name for frame in stack] + [self.name]
+        record = StageRecord(path[0], '/'.join(path[1:]) or 'total',
+                             elapsed, self.rows, peak_memory, self.counters)
+        for exporter in _CONFIG.exporters:
+            exporter(record)
+        return False
+
+
+def _rows(args, kwargs):
+    # length of the first data argument: array, series, table or mapping
+    # of columns
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, Mapping):
+            value = next(iter(value.values()), None)
+        if value is None or isinstance(value, (str, bytes)):
+            continue
+        try:
+            return len(value)
+        except TypeError:
+            continue
+    return None
+
+
+def stage(name, rows=None):
+    """
+    Context manager timing a stage of a validation test.
+
+    Stages nest: a stage opened inside another one is reported under the
+    path of its enclosing stages. While instrumentation is disabled a
+    shared no-op context is returned.
+
+    Parameters
+    ----------
+    name : string
+        Stage name, e.g. 'grouping', 'sorting', 'distribution' or
+        'dataframe'; the outermost stage names the test
+    rows : int, optional
+        Number of rows processed in the stage
+
+    Examples
+    --------
+    >>> with instrumented(recorder):
+    ...     with stage('model 17'):
+    ...         binomial_test(df.ratings, df.default_flag, df.prob_default)
+    """
+
+    if not _CONFIG.enabled:
+        return _NULL_STAGE
+    return _Stage(name, rows)
+
+
+def count(name, value=1):
+    """Add ``value`` to the counter ``name`` of the innermost open stage."""
+    if _CONFIG.enabled:
+        stack = _stack()
+        if stack:
+            counters = stack[-1].counters
+            counters[name] = counters.get(name, 0) + value
+
+
+def instrument(func=None, name=None):
+    """
+    Decorator running a function as a stage named after it.
+
+    The number of rows is taken from the first argument with a length.
+    While instrumentation is disabled the wrapper only checks a flag.
+    """
+
+    if func is None:
+        return lambda func: instrument(func, name)
+
+    stage_name = name or func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _CONFIG.enabled:
+            return func(*args, **kwargs)
+        with _Stage(stage_name, _rows(args, kwargs)):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def enable(*exporters, memory=False):
+    """
+    Switch instrumentation on.
+
+    The public tests then report their stages (grouping, sorting,
+    distribution calls, DataFrame construction) with wall time, rows and
+    optionally peak allocation to the exporters. Stages are tracked per
+    thread; work done in worker processes (``n_jobs`` > 1) is not recorded.
+
+    Parameters
+    ----------
+    *exporters
+        Callables receiving every ``StageRecord``, e.g. a ``Recorder``,
+        a ``PrometheusExporter`` or any function
+    memory : bool
+        Also measure the peak allocation of every stage with
+        ``tracemalloc``. Tracing slows down allocation-heavy code
+        considerably, so it is off by default.
+    """
+
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _CONFIG.exporters = tuple(exporters)
+    _CONFIG.memory = memory
+    _CONFIG.enabled = True
+
+
+def disable():
+    """Switch instrumentation off; tracemalloc is left as it is."""
+    _CONFIG.enabled = False
+    _CONFIG.memory = False
+    _CONFIG.exporters = ()
+
+
+def is_enabled():
+    return _CONFIG.enabled
+
+
+@contextmanager
+def instrumented(*exporters, memory=False):
+    """
+    Enable instrumentation within a ``with`` block.
+
+    The previous settings are restored on exit, and ``tracemalloc`` is
+    stopped again if the block started it.
+
+    Examples
+    --------
+    >>> recorder = Recorder()
+    >>> with instrumented(recorder, memory=True):
+    ...     hosmer_lemeshow(df.ratings, df.default_flag, df.prob_default)
+    >>> recorder.summary()
+    """
+
+    previous = (_CONFIG.enabled, _CONFIG.memory, _CONFIG.exporters)
+    started = memory and not tracemalloc.is_tracing()
+    enable(*exporters, memory=memory)
+    try:
+        yield
+    finally:
+        _CONFIG.enabled, _CONFIG.memory, _CONFIG.exporters = previous
+        if started:
+            tracemalloc.stop()
+
+
+class Recorder:
+    """
+    Exporter keeping all records in memory.
+
+    Attributes
+    ----------
+    records : list of StageRecord
+        Records in the order the stages finished
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def clear(self):
+        self.records = []
+
+    def summary(self):
+        """
+        Totals per test and stage.
+
+        Returns
+        -------
+        summary : pandas dataframe
+            Indexed by (Test, Stage) with the columns ``Calls``,
+            ``Seconds``, ``Rows`` and ``Peak Memory`` (largest peak in
+            bytes, NaN if memory was not measured)
+        """
+        import pandas as pd
+
+        frame = pd.DataFrame(self.records, columns=StageRecord._fields)
+        grouped = frame.groupby(['test', 'stage'], sort=False)
+        summary = pd.DataFrame({
+            'Calls': grouped.size(),
+            'Seconds': grouped['elapsed'].sum(),
+            'Rows': grouped['rows'].apply(
+                lambda rows: pd.to_numeric(rows).sum(min_count=1)),
+            'Peak Memory': grouped['peak_memory'].apply(
+                lambda peaks: pd.to_numeric(peaks).max()),
+        })
+        summary.index.names = ['Test', 'Stage']
+        return summary
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def _number(value):
+    # NumPy scalars as plain Python numbers
+    return repr(value.item() if hasattr(value, 'item') else value)
+
+
+class PrometheusExporter:
+    """
+    Exporter aggregating the records into Prometheus metrics.
+
+    The metrics are kept in memory and rendered in the Prometheus text
+    exposition format, e.g. for the textfile collector of node_exporter
+    after a batch run. No Prometheus client library is needed.
+
+    Parameters
+    ----------
+    path : string, optional
+        Default file for ``write``
+    prefix : string
+        Prefix of the metric names
+
+    Examples
+    --------
+    >>> exporter = PrometheusExporter('/var/lib/node_exporter/meliora.prom')
+    >>> with instrumented(exporter):
+    ...     suite.run()
+    >>> exporter.write()
+    """
+
+    # metric, type, help text, position in the aggregate
+    METRICS = [
+        ('stage_calls_total', 'counter', 'Number of runs of the stage', 0),
+        ('stage_seconds_total', 'counter', 'Wall time of the stage', 1),
+        ('stage_rows_total', 'counter', 'Rows processed by the stage', 2),
+        ('stage_peak_memory_bytes', 'gauge',
+         'Largest peak traced allocation of the stage', 3),
+    ]
+
+    def __init__(self, path=None, prefix='meliora'):
+        self.path = path
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # (test, stage) -> [calls, seconds, rows, peak memory]
+        self._stages = {}
+        # (test, stage, counter) -> total
+        self._counters = {}
+
+    def __call__(self, record):
+        key = (record.test, record.stage)
+        with self._lock:
+            totals = self._stages.setdefault(key, [0, 0.0, 0, None])
+            totals[0] += 1
+            totals[1] += record.elapsed
+            totals[2] += record.rows or 0
+            if record.peak_memory is not None:
+                totals[3] = max(totals[3] or 0, record.peak_memory)
+            for name, value in record.counters.items():
+                counter = key + (name,)
+                self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def render(self):
+        """Metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for metric, kind, help_text, i in self.METRICS:
+                name = '{}_{}'.format(self.prefix, metric)
+                samples = [(key, totals[i])
+                           for key, totals in sorted(self._stages.items())
+                           if totals[i] is not None]
+                if not samples:
+                    continue
+                lines.append('# HELP {} {}'.format(name, help_text))
+                lines.append('# TYPE {} {}'.format(name, kind))
+                for (test, stage_name), value in samples:
+                    lines.append('{}{{test="{}",stage="{}"}} {}'.format(
+                        name, _label(test), _label(stage_name),
+                        _number(value)))
+
+            if self._counters:
+                name = '{}_counter_total'.format(self.prefix)
+                lines.append('# HELP {} Values added with count()'.format(name))
+                lines.append('# TYPE {} counter'.format(name))
+                for (test, stage_name, counter), value in sorted(
+                        self._counters.items()):
+                    lines.append(
+                        '{}{{test="{}",stage="{}",counter="{}"}} {}'.format(
+                            name, _label(test), _label(stage_name),
+                            _label(counter), _number(value)))
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path=None):
+        """Write the metrics to ``path`` (default: ``self.path``) atomically."""
+        path = os.fspath(path or self.path)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+class OpenTelemetryExporter:
+    """
+    Exporter recording the stages as OpenTelemetry metrics.
+
+    Durations and peak allocations are recorded as histograms, rows and
+    ``count`` values as counters, all with the attributes ``test`` and
+    ``stage``. Export itself is left to the meter provider configured by
+    the application (e.g. an OTLP or Prometheus reader).
+
+    Parameters
+    ----------
+    meter : opentelemetry.metrics.Meter, optional
+        Defaults to ``opentelemetry.metrics.get_meter('meliora')``
+    prefix : string
+        Prefix of the instrument names
+    """
+
+    def __init__(self, meter=None, prefix='meliora'):
+        if meter is None:
+            try:
+                from opentelemetry import metrics
+            except ImportError:
+                raise ImportError(
+                    'OpenTelemetryExporter requires opentelemetry-api')
+            meter = metrics.get_meter('meliora')
+
+        self.meter = meter
+        self.prefix = prefix
+        self._duration = meter.create_histogram(
+            prefix + '.stage.duration', unit='s',
+            description='Wall time of the stage')
+        self._rows = meter.create_counter(
+            prefix + '.stage.rows', unit='{row}',
+            description='Rows processed by the stage')
+        self._memory = meter.create_histogram(
+            prefix + '.stage.peak_memory', unit='By',
+            description='Peak traced allocation of the stage')
+        self._counters = {}
+
+    def __call__(self, record):
+        attributes = {'test': record.test, 'stage': record.stage}
+        self._duration.record(record.elapsed, attributes)
+        if record.rows is not None:
+            self._rows.add(record.rows, attributes)
+        if record.peak_memory is not None:
+            self._memory.record(record.peak_memory, attributes)
+        for name, value in record.counters.items():
+            if name not in self._counters:
+                self._counters[name] = self.meter.create_counter(
+                    '{}.{}'.format(self.prefix, name))
+            self._counters[name].add(value, attributes)
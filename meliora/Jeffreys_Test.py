@@ -1,8 +1,14 @@
+import numpy as np
 import pandas as pd
-from scipy.stats import t, beta, norm, binom, chisquare, chi2
+from scipy.stats import beta
 
+from meliora.Grade_Summary import grade_summary
+from meliora.Instrumentation import instrument, stage
 
-def jeffreys_test(ratings, default_flag, alpha):
+
+@instrument
+def jeffreys_test(ratings=None, default_flag=None, prob_default=None,
+                  alpha=0.05, summary=None, by=None):
     """
     The Jeffreys test assesses whether the bucket PD (i.e., the PD of the
     bucket to which a given exposure is assigned) is in line with the
@@ -29,11 +35,22 @@ def jeffreys_test(ratings, default_flag, alpha):
         Boolean flag indicating whether the borrower has actually defaulted
     ratings : pandas series
         PD ratings of a counterparty
+    prob_default : pandas series
+        Predicted default probabilities
+    alpha : scalar
+        Significance level of the one-sided test
+    summary : pandas dataframe, optional
+        Output of ``grade_summary``. When given, the raw series are ignored.
+    by : pandas series or list of pandas series, optional
+        Grouping keys (e.g. portfolio, reporting date). The test is run for
+        every (keys, rating) cell and an 'Overall' row is added per group.
 
     Returns
     -------
-    score : float
-        Return Bayesian Error Rate
+    dataframe : pandas dataframe
+        Indexed by rating (preceded by the grouping keys, if any), with the
+        columns PD, N, D, Default Rate, P-Value and Pass/Fail. All beta
+        quantiles are evaluated in a single vectorized call.
 
     Notes
     -----------
@@ -41,54 +58,45 @@ def jeffreys_test(ratings, default_flag, alpha):
     
     """
 
-    df3 = pd.DataFrame({'Rating': [],
-                        'PD': [],
-                        'N': [],
-                        'D': [],
-                        'Default Rate': [],
-                        'P-Value': [],
-                        'Pass/Fail': []})
-
-    for rating in set(df.ratings):
-        # select rating group
-        df2 = df[df['ratings'] == rating]
-        # the mean is calculated here and used as the pd for the rating bucket
-        m = df2.prob_default.mean()
-        # calculate parameters for beta distribution Beta(a,b)
-        d = df2['default_flag'].sum()
-        n = len(df2)
-        a = d + 0.5
-        b = n - d + 0.5
-        # use the culmulative distribution function to calculate the std-multiplier that corresponds to the 5% interval
-        p = beta.ppf(0.05, a, b)
-        # results: if the rating pd is above the calculated p value, then the rating bucket passes the test
-        if p <= m:
-            result = 'Pass'
+    if summary is None:
+        summary = grade_summary(ratings, default_flag, prob_default, by=by)
+
+    with stage('grouping'):
+        cells = summary[['N', 'D', 'PD Sum']]
+        levels = summary.index.names[:-1]
+
+        # overall rows: the portfolio as a whole, or every group as a whole
+        if levels:
+            totals = cells.groupby(level=levels, sort=True).sum()
+            group = totals.index.get_indexer(summary.index.droplevel(-1))
+            totals.index = pd.MultiIndex.from_frame(
+                totals.index.to_frame(index=False).assign(Rating='Overall'))
+            group = np.concatenate([group, np.arange(len(totals))])
         else:
-            result = 'Fail'
-
-        # append the data to the created dataframe
-        temp = pd.DataFrame({'Rating': [rating], 'PD': [m], 'N': [n], 'D': [
-                            d], 'Default Rate': d/n, 'P-Value': [p], 'Pass/Fail': [result]})
-
-        df3 = df3.append(temp)
-
-    # overall
-    d = df['default_flag'].sum()
-    n = len(df)
-    a = d + 0.5
-    b = n - d + 0.5
-    p = beta.ppf(0.05, a, b)
-    m = df.prob_default.mean()
-    # results
-    if p <= m:
-        result = 'Pass'
-    else:
-        result = 'Fail'
-
-    overall = pd.DataFrame({'Rating': ['Overall'], 'PD': [m], 'N': [n], 'D': [
-                           d], 'Default Rate': d/n, 'P-Value': [p], 'Pass/Fail': [result]})
-
-    df3 = df3.append(overall).set_index('Rating')
+            totals = pd.DataFrame({col: [cells[col].sum()] for col in cells},
+                                  index=pd.Index(['Overall'], name='Rating'))
+            group = np.zeros(len(cells) + 1, dtype=np.int64)
+
+        # grade rows followed by the overall row of their group
+        df3 = pd.concat([cells, totals])
+        df3 = df3.iloc[np.argsort(group, kind='stable')]
+
+    n = df3['N'].to_numpy(dtype=np.float64)
+    d = df3['D'].to_numpy(dtype=np.float64)
+    # the mean is used as the pd for the rating bucket
+    m = df3['PD Sum'].to_numpy() / n
+    # parameters for beta distribution Beta(a,b), quantiles for all cells at once
+    with stage('distribution', rows=len(n)):
+        p = beta.ppf(alpha, d + 0.5, n - d + 0.5)
+
+    # results: if the rating pd is above the calculated p value, then the rating bucket passes the test
+    with stage('dataframe'):
+        df3 = pd.DataFrame({'PD': m,
+                            'N': df3['N'].to_numpy(),
+                            'D': df3['D'].to_numpy(),
+                            'Default Rate': d/n,
+                            'P-Value': p,
+                            'Pass/Fail': np.where(p <= m, 'Pass', 'Fail')},
+                           index=df3.index)
 
     return df3
@@ -1,12 +1,14 @@
-from scipy import stats
+import numpy as np
 
+from meliora.Instrumentation import instrument
+from meliora.Somers_D import _association_cells, _pvalue, _result
 
-def kendall_tau(x, y, variant='b'):
+
+@instrument
+def kendall_tau(x, y, variant='b', alternative='two-sided'):
     """
     Calculate Kendall's tau, a correlation measure for ordinal data.
 
-    This is a wrapper around SciPy kendalltau function.
-
     Kendall's tau is a measure of the correspondence between two rankings.
     Values close to 1 indicate strong agreement, and values close to -1
     indicate strong disagreement. This implements two variants of Kendall's
@@ -16,6 +18,14 @@ def kendall_tau(x, y, variant='b'):
     tau-a is not implemented separately because both tau-b and tau-c reduce
     to tau-a in the absence of ties.
 
+    The pair counts are computed like in ``somersd``: from the contingency
+    table in O(K·L) for tied (rating) data. For continuous inputs whose
+    table would be too large, the pairs are counted per observation: one
+    sort by (x, y), then the ranks of y are split bit by bit with one
+    linear stable partition per bit, O(n log n) in total. The p-value uses
+    the tie-corrected normal approximation of the null distribution, as in
+    SciPy.
+
     Parameters
     ----------
     x, y : array_like
@@ -23,15 +33,16 @@ def kendall_tau(x, y, variant='b'):
         will be flattened to 1-D.
     variant: {'b', 'c'}, optional
         Defines which variant of Kendall's tau is returned. Default is 'b'.
+    alternative : {'two-sided', 'less', 'greater'}, optional
+        Defines the alternative hypothesis. Default is 'two-sided'.
 
 
     Returns
     -------
-    correlation : float
-       The tau statistic.
-    pvalue : float
-       The p-value for a hypothesis test whose null hypothesis is
-       an absence of association, tau = 0.
+    res : AssociationResult
+        Unpacks as ``(correlation, pvalue)``; ``res.ase`` holds the
+        asymptotic standard error of the statistic and
+        ``res.confidence_interval(alpha)`` the matching interval.
 
     References
     --------------
@@ -41,16 +52,11 @@ def kendall_tau(x, y, variant='b'):
            Biometrika Vol. 33, No. 3, pp. 239-251. 1945.
     [3] Gottfried E. Noether, "Elements of Nonparametric Statistics",
         John Wiley & Sons, 1967.
-    [4] Peter M. Fenwick, "A new data structure for cumulative frequency tables",
-        Software: Practice and Experience, Vol. 24, No. 3, pp. 327-336, 1994.
-    [5] Maurice G. Kendall, "Rank Correlation Methods" (4th Edition),
+    [4] Maurice G. Kendall, "Rank Correlation Methods" (4th Edition),
            Charles Griffin & Co., 1970.
 
-    Scipy: https://github.com/scipy/scipy/blob/v1.8.1/scipy/stats/_stats_py.py#L4666-L4875
-
     Examples
     --------
-    >>> from scipy import stats
     >>> x1 = [12, 2, 1, 12, 2]
     >>> x2 = [1, 4, 7, 1, 0]
     >>> tau, p_value = kendall_tau(x1, x2)
@@ -61,6 +67,42 @@ def kendall_tau(x, y, variant='b'):
 
     """
 
-    tau, pvalue = stats.kendalltau(x, y, initial_lexsort=None, variant='b')
+    if variant not in ('b', 'c'):
+        raise ValueError("variant must be 'b' or 'c'")
+
+    (w, d, rows, cols), table, (t, u) = _association_cells(np.ravel(x),
+                                                            np.ravel(y))
+    m = min(len(t), len(u))
+
+    n = w.sum()
+    S = np.sum(w * d)
+    w_r = n**2 - np.sum(w * rows)
+    w_c = n**2 - np.sum(w * cols)
+    spread = np.sqrt(max(np.sum(w * d**2) - S**2 / n, 0))
+
+    if variant == 'b':
+        wt = np.sqrt(w_r * w_c)
+        statistic = S / wt
+        v = rows * w_c + cols * w_r
+        ase = np.sqrt(max(np.sum(w * (2 * wt * d + statistic * v)**2)
+                          - n**3 * statistic**2 * (w_r + w_c)**2, 0)) / wt**2
+        ase0 = 2 / wt * spread
+    else:
+        statistic = m * S / (n**2 * (m - 1))
+        ase = ase0 = 2 * m / ((m - 1) * n**2) * spread
+
+    # null variance of the number of concordant minus discordant pairs,
+    # corrected for ties in x and y
+    t, u = t.astype(np.float64), u.astype(np.float64)
+    v0 = n * (n - 1) * (2 * n + 5)
+    vt = np.sum(t * (t - 1) * (2 * t + 5))
+    vu = np.sum(u * (u - 1) * (2 * u + 5))
+    v1 = np.sum(t * (t - 1)) * np.sum(u * (u - 1)) / (2 * n * (n - 1))
+    v2 = (np.sum(t * (t - 1) * (t - 2)) * np.sum(u * (u - 1) * (u - 2))
+          / (9 * n * (n - 1) * (n - 2))) if n > 2 else 0
+    var = (v0 - vt - vu) / 18 + v1 + v2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pvalue = _pvalue(S / 2 / np.sqrt(var), alternative)
 
-    return tau, pvalue
+    return _result(statistic, pvalue, ase, ase0, table)
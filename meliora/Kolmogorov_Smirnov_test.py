@@ -1,5 +1,19 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
 from scipy import stats
 
+from meliora.Columnar_Input import as_array
+from meliora.Grade_Summary import _group_codes
+from meliora.Instrumentation import instrument, stage
+
+
+KSResult = namedtuple('KSResult', ['statistic', 'pvalue', 'cutoff'])
+
+# largest n_defaults * n_non_defaults for which the exact p-value is used
+_EXACT_PAIRS = 10000
+
 
 def ks(rvs, cdf, args=(), N=20, alternative='two-sided', mode='auto'):
     """
@@ -34,7 +48,8 @@ def ks(rvs, cdf, args=(), N=20, alternative='two-sided', mode='auto'):
         Sample size if 'rvs' is string or callable.  Default is 20.
     alternative : {'two-sided', 'less', 'greater'}, optional
         Defines the null and alternative hypotheses. Default is 'two-sided'.
-
+    mode : {'auto', 'exact', 'approx', 'asymp'}, optional
+        Method used to calculate the p-value, see ``scipy.stats.kstest``.
 
     Returns
     -------
@@ -44,6 +59,10 @@ def ks(rvs, cdf, args=(), N=20, alternative='two-sided', mode='auto'):
                 One-tailed or two-tailed p-value.
 
 
+    See Also
+    --------
+    ks_default : KS separation of defaulters and non-defaulters
+
     Examples
     --------
     >>> from scipy import stats
@@ -54,4 +73,153 @@ def ks(rvs, cdf, args=(), N=20, alternative='two-sided', mode='auto'):
 
     """
 
-    return stats.kstest(rvs, cdf, args=(), N=20, alternative='two-sided', mode='auto')
+    # positional, the keyword was renamed from mode to method in SciPy 1.8
+    return stats.kstest(rvs, cdf, args, N, alternative, mode)
+
+
+def _ks_pvalues(statistic, n_pos, n_neg, alternative):
+    # asymptotic p-values, as in scipy.stats.ks_2samp
+    with np.errstate(divide='ignore', invalid='ignore'):
+        en = n_pos * n_neg / (n_pos + n_neg)
+        if alternative == 'two-sided':
+            return stats.kstwo.sf(statistic, np.round(en))
+        # the correction term uses the larger (m) and smaller (n) sample
+        m = np.maximum(n_pos, n_neg)
+        n = np.minimum(n_pos, n_neg)
+        z = np.sqrt(en) * statistic
+        expt = -2 * z**2 - 2 * z * (m + 2 * n) / np.sqrt(m * n * (m + n)) / 3.0
+        return np.exp(expt)
+
+
+@instrument
+def ks_default(default_flag, prob_default, sample_weight=None, segment=None,
+               alternative='two-sided', method='auto'):
+    """
+    Two-sample KS statistic between the scores of defaulters and
+    non-defaulters.
+
+    The scores are sorted once (together with the segment, if given), the
+    empirical distribution functions of both populations follow from
+    cumulative sums of the (weighted) default and non-default counts, and
+    the maximum distance of every segment is taken with ``reduceat``. The
+    distributions are only compared at the last observation of each run of
+    tied scores. The exact p-value is computed only for small unweighted
+    samples, the asymptotic one otherwise.
+
+    Parameters
+    ----------
+    default_flag : array-like
+        Boolean flag indicating whether the borrower has actually defaulted
+    prob_default : array-like
+        Predicted default probabilities or scores
+    sample_weight : array-like, optional
+        Observation weights, e.g. exposures
+    segment : array-like, optional
+        Segment of every observation
+    alternative : {'two-sided', 'less', 'greater'}, optional
+        As in ``scipy.stats.ks_2samp`` with the non-defaulters' scores as
+        the first sample: 'greater' uses max(F_ND - F_D), which is positive
+        when defaulters have higher scores, 'less' uses max(F_D - F_ND).
+    method : {'auto', 'exact', 'asymp'}, optional
+        P-value method. 'auto' uses the exact distribution when the sample
+        is unweighted and n_D * n_ND <= 10000. With weights the asymptotic
+        p-value uses Kish's effective sample sizes.
+
+    Returns
+    -------
+    result : KSResult or pandas dataframe
+        Without ``segment`` a named tuple (statistic, pvalue, cutoff), where
+        ``cutoff`` is the score at which the distance is attained. With
+        ``segment`` a dataframe indexed by segment with the columns
+        ``Number of Obs``, ``Number of Defaults``, ``KS``, ``Cutoff`` and
+        ``P-Value``.
+
+    Examples
+    --------
+    >>> ks_default(df.default_flag, df.prob_default)
+    >>> ks_default(df.default_flag, df.prob_default, segment=df.segment)
+    """
+
+    y = as_array(default_flag).astype(bool, copy=False)
+    scores = as_array(prob_default, np.float64)
+    w = None if sample_weight is None else as_array(sample_weight, np.float64)
+
+    if segment is None:
+        codes = np.zeros(len(y), dtype=np.int64)
+        index = None
+    else:
+        codes, index, valid = _group_codes(
+            [segment], [getattr(segment, 'name', None) or 'Segment'])
+        if not valid.all():
+            y, scores = y[valid], scores[valid]
+            w = None if w is None else w[valid]
+
+    # one sort by segment and score
+    with stage('sorting', rows=len(scores)):
+        order = np.lexsort((scores, codes))
+        y, scores, codes = y[order], scores[order], codes[order]
+    w_pos = y.astype(np.float64) if w is None else np.where(y, w[order], 0)
+    w_neg = (~y).astype(np.float64) if w is None else w[order] - w_pos
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    tot_pos = np.add.reduceat(w_pos, starts)
+    tot_neg = np.add.reduceat(w_neg, starts)
+    cum_pos = np.cumsum(w_pos)
+    cum_neg = np.cumsum(w_neg)
+    base_pos = (cum_pos - w_pos)[starts]
+    base_neg = (cum_neg - w_neg)[starts]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diff = ((cum_neg - base_neg[codes]) / tot_neg[codes]
+                - (cum_pos - base_pos[codes]) / tot_pos[codes])
+
+    if alternative == 'two-sided':
+        distance = np.abs(diff)
+    elif alternative == 'greater':
+        distance = diff
+    elif alternative == 'less':
+        distance = -diff
+    else:
+        raise ValueError("alternative must be 'two-sided', 'less' or 'greater'")
+
+    last = np.r_[(scores[1:] != scores[:-1]) | (codes[1:] != codes[:-1]), True]
+    distance = np.where(last, np.nan_to_num(distance, nan=0.0), 0.0)
+    statistic = np.maximum(np.maximum.reduceat(distance, starts), 0)
+
+    # first position of the maximum within every segment
+    pos = np.arange(len(distance))
+    at_max = np.minimum.reduceat(
+        np.where(distance == statistic[codes], pos, len(pos)), starts)
+    cutoff = scores[np.minimum(at_max, len(pos) - 1)]
+
+    n_obs = np.diff(np.r_[starts, len(y)])
+    n_pos = np.add.reduceat(y.astype(np.int64), starts)
+    n_neg = n_obs - n_pos
+    if w is None:
+        eff_pos, eff_neg = n_pos, n_neg
+    else:
+        eff_pos = tot_pos**2 / np.add.reduceat(w_pos**2, starts)
+        eff_neg = tot_neg**2 / np.add.reduceat(w_neg**2, starts)
+
+    with stage('distribution', rows=len(starts)):
+        pvalue = _ks_pvalues(statistic, eff_pos, eff_neg, alternative)
+
+        if w is None and method != 'asymp':
+            exact = np.flatnonzero((n_pos > 0) & (n_neg > 0) & (
+                (method == 'exact') | (n_pos * n_neg <= _EXACT_PAIRS)))
+            ends = np.r_[starts[1:], len(y)]
+            for g in exact:
+                seg = slice(starts[g], ends[g])
+                pvalue[g] = stats.ks_2samp(scores[seg][~y[seg]], scores[seg][y[seg]],
+                                           alternative=alternative,
+                                           method='exact').pvalue
+
+    if index is None:
+        return KSResult(float(statistic[0]), float(pvalue[0]), float(cutoff[0]))
+
+    return pd.DataFrame({'Number of Obs': n_obs,
+                         'Number of Defaults': n_pos,
+                         'KS': statistic,
+                         'Cutoff': cutoff,
+                         'P-Value': pvalue},
+                        index=index)
@@ -2,7 +2,161 @@ import numpy as np
 import pandas as pd
 from scipy.stats import t
 
-def lgd_t_test(df, observed_LGD_col, expected_LGD_col, verbose=False):
+from meliora.Columnar_Input import as_array
+from meliora.Grade_Summary import _group_codes
+from meliora.Instrumentation import instrument, stage
+
+
+def _t_moments(observed, expected, by=None, sample_weight=None):
+    # per-group weight sums, mean error and sum of squared deviations (M2)
+    obs = as_array(observed, np.float64)
+    exp = as_array(expected, np.float64)
+    w = None if sample_weight is None else as_array(sample_weight, np.float64)
+
+    if by is None:
+        codes = np.zeros(len(obs), dtype=np.int64)
+        index = pd.Index(['All'])
+    else:
+        if not isinstance(by, (list, tuple)):
+            by = [by]
+        codes, index, valid = _group_codes(
+            by, [getattr(key, 'name', None) for key in by])
+        if not valid.all():
+            obs, exp = obs[valid], exp[valid]
+            w = None if w is None else w[valid]
+
+    K = len(index)
+    error = obs - exp
+    # centre on the overall mean to limit cancellation in the sum of squares
+    shift = error.mean() if len(error) else 0.0
+    centred = error - shift
+
+    with stage('grouping', rows=len(obs)):
+        n = np.bincount(codes, minlength=K)
+        if w is None:
+            w_sum = n.astype(np.float64)
+            w2_sum = w_sum
+            w_err = np.bincount(codes, weights=centred, minlength=K)
+            w_err2 = np.bincount(codes, weights=centred**2, minlength=K)
+            w_obs = np.bincount(codes, weights=obs, minlength=K)
+        else:
+            w_sum = np.bincount(codes, weights=w, minlength=K)
+            w2_sum = np.bincount(codes, weights=w**2, minlength=K)
+            w_err = np.bincount(codes, weights=w * centred, minlength=K)
+            w_err2 = np.bincount(codes, weights=w * centred**2, minlength=K)
+            w_obs = np.bincount(codes, weights=w * obs, minlength=K)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_centred = w_err / w_sum
+
+    return pd.DataFrame({'N': n,
+                         'W': w_sum,
+                         'W2': w2_sum,
+                         'Observed Sum': w_obs,
+                         'Mean Error': mean_centred + shift,
+                         'M2': w_err2 - w_sum * mean_centred**2},
+                        index=index)
+
+
+def _merge_moments(left, right):
+    # pairwise combination of means and M2 (Chan et al.), aligned by group
+    left, right = left.align(right, fill_value=0)
+    W = left['W'] + right['W']
+    delta = right['Mean Error'] - left['Mean Error']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = (right['W'] / W).fillna(0)
+
+    merged = left + right
+    merged['Mean Error'] = left['Mean Error'] + delta * share
+    merged['M2'] = left['M2'] + right['M2'] + delta**2 * left['W'] * share
+    return merged.astype({'N': np.int64}).sort_index()
+
+
+def _t_statistics(moments, alternative):
+    n = moments['N'].to_numpy()
+    w_sum = moments['W'].to_numpy()
+    w2_sum = moments['W2'].to_numpy()
+    mean_error = moments['Mean Error'].to_numpy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n_eff = w_sum**2 / w2_sum
+        # unbiased variance with reliability weights
+        s2 = moments['M2'].to_numpy() / (w_sum - w2_sum / w_sum)
+        dof = n_eff - 1
+        t_stat = np.sqrt(n_eff) * mean_error / np.sqrt(s2)
+
+        with stage('distribution', rows=len(n)):
+            if alternative == 'two-sided':
+                p_value = 2 * t.sf(np.abs(t_stat), dof)
+            elif alternative == 'greater':
+                p_value = t.sf(t_stat, dof)
+            elif alternative == 'less':
+                p_value = t.cdf(t_stat, dof)
+            else:
+                raise ValueError(
+                    "alternative must be 'two-sided', 'greater' or 'less'")
+
+        observed_mean = moments['Observed Sum'].to_numpy() / w_sum
+
+    return pd.DataFrame({'N': n,
+                         'Observed': observed_mean,
+                         'Expected': observed_mean - mean_error,
+                         'Mean Error': mean_error,
+                         'S2': s2,
+                         'DoF': dof,
+                         'T-Stat': t_stat,
+                         'P-Value': p_value},
+                        index=moments.index)
+
+
+@instrument
+def grouped_t_test(observed, expected, by=None, sample_weight=None,
+                   alternative='two-sided'):
+    """
+    Paired one-sample t-tests of observed minus expected values per group.
+
+    Count, sum and sum of squares of the errors of all groups are obtained
+    in one pass with ``np.bincount`` over the group codes, and the t
+    statistics and p-values of all groups follow from these moments at
+    once. With weights (e.g. EAD for exposure-weighted LGD) the mean and
+    the variance are weighted and Kish's effective sample size
+    (sum w)**2 / sum w**2 replaces N in the standard error and the degrees
+    of freedom.
+
+    Parameters
+    ----------
+    observed : array-like
+        Realised values, e.g. LGD
+    expected : array-like
+        Estimates, e.g. predicted LGD or ELBE
+    by : array-like or list of array-like, optional
+        Grouping keys, e.g. segment, vintage and collateral type
+    sample_weight : array-like, optional
+        Observation weights
+    alternative : {'two-sided', 'greater', 'less'}
+        'greater': the mean error (observed - expected) is positive, i.e.
+        the estimates are too low; 'less': it is negative.
+
+    Returns
+    -------
+    results : pandas dataframe
+        One row per group with ``N``, ``Observed``, ``Expected`` (weighted
+        means), ``Mean Error``, ``S2`` (error variance), ``DoF``, ``T-Stat``
+        and ``P-Value``. Without ``by`` the single row is labelled 'All'.
+
+    Examples
+    --------
+    >>> grouped_t_test(df.LGD, df.PRED_LGD, by=[df.segment, df.vintage],
+    ...                sample_weight=df.EAD, alternative='greater')
+    """
+
+    return _t_statistics(_t_moments(observed, expected, by, sample_weight),
+                         alternative)
+
+
+@instrument
+def lgd_t_test(df, observed_LGD_col, expected_LGD_col, verbose=False,
+               by=None, weight_col=None, alternative='greater'):
     """t-test for the Null hypothesis that estimated LGD is greater than true LGD
 
 
@@ -16,6 +170,12 @@ def lgd_t_test(df, observed_LGD_col, expected_LGD_col, verbose=False):
         name of column with expected LGD values
     verbose: boolean
         if true, results and interpretation are printed
+    by: string or list of strings, optional
+        grouping columns; every group is tested in the same pass
+    weight_col: string, optional
+        name of a weight column, e.g. EAD for exposure-weighted LGD
+    alternative: {'greater', 'two-sided', 'less'}
+        alternative hypothesis on observed minus expected LGD
 
 
     Returns
@@ -32,6 +192,8 @@ def lgd_t_test(df, observed_LGD_col, expected_LGD_col, verbose=False):
         denominator of test statistic
     p_value: float
         p-value of the test
+    results: pandas dataframe
+        if ``by`` is given, the output of ``grouped_t_test`` instead
 
 
     Notes
@@ -73,19 +235,24 @@ def lgd_t_test(df, observed_LGD_col, expected_LGD_col, verbose=False):
     if df[expected_LGD_col].hasnans:
         raise ValueError('Missing values in {}'.format(expected_LGD_col))
 
-    N = len(df)
-    LGD = df[observed_LGD_col]
-    pred_LGD = df[expected_LGD_col]
-    error = LGD - pred_LGD
-    mean_error = error.mean()
-    num = np.sqrt(N)*mean_error
-    lgd_s2 = ((error - mean_error)**2).sum()/(N-1)
-    t_stat = num/np.sqrt(lgd_s2)
-    p_value = 1 - t.cdf(t_stat, df=N-1)
+    if isinstance(by, str):
+        by = [by]
+    weights = None if weight_col is None else df[weight_col]
+    keys = None if by is None else [df[col] for col in by]
+
+    results = grouped_t_test(df[observed_LGD_col], df[expected_LGD_col],
+                             by=keys, sample_weight=weights,
+                             alternative=alternative)
+    if by is not None:
+        return results
+
+    N, LGD_mean, pred_LGD_mean, lgd_s2, t_stat, p_value = results.iloc[0][
+        ['N', 'Observed', 'Expected', 'S2', 'T-Stat', 'P-Value']]
+    N = int(N)
 
     if verbose is True:
         # print the results
-        print("t_stat=%.3f, LGD.mean=%.3f,pred_LGD.mean=%.3f,N=%d, s2=%.3f, p=%.3f" % (t_stat, pred_LGD.mean(), LGD.mean(), N, lgd_s2, p_value))
+        print("t_stat=%.3f, LGD.mean=%.3f,pred_LGD.mean=%.3f,N=%d, s2=%.3f, p=%.3f" % (t_stat, LGD_mean, pred_LGD_mean, N, lgd_s2, p_value))
         if p_value <= 0.05:
             print(
                 "P-value <= 5%, therefore, H0 is rejected.")
@@ -93,4 +260,4 @@ def lgd_t_test(df, observed_LGD_col, expected_LGD_col, verbose=False):
             print(
                 "P-value > 5%, therefore, H0 fails to be rejected.")
 
-    return N, LGD.mean(), pred_LGD.mean(), t_stat, lgd_s2, p_value
+    return N, LGD_mean, pred_LGD_mean, t_stat, lgd_s2, p_value
@@ -1,8 +1,37 @@
+import numpy as np
 import pandas as pd
-from sklearn.metrics import auc
 
+from meliora.Columnar_Input import as_array
+from meliora.Instrumentation import instrument, stage
 
-def loss_capture_ratio(ead, predicted_ratings, realised_outcomes):
+
+def _capture_area(loss, key, seg_codes):
+    # area under the loss capture curve of every segment, x-axis = rank
+    if seg_codes is None:
+        order = np.argsort(-key, kind='stable')
+        starts = np.array([0])
+    else:
+        order = np.lexsort((-key, seg_codes))
+        seg_sorted = seg_codes[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(seg_sorted)) + 1]
+
+    cumulative_loss = np.cumsum(loss[order])
+    ends = np.r_[starts[1:], len(order)] - 1
+    n_g = ends - starts + 1
+
+    # cumulative loss within each segment as a share of the segment loss
+    offset = np.r_[0, cumulative_loss[ends[:-1]]]
+    total = cumulative_loss[ends] - offset
+    capture = (cumulative_loss - np.repeat(offset, n_g)) / np.repeat(total, n_g)
+
+    # trapezoid rule with unit spacing
+    area = np.add.reduceat(capture, starts) - (capture[starts] + capture[ends]) / 2
+
+    return area, n_g
+
+
+@instrument
+def loss_capture_ratio(ead, predicted_ratings, realised_outcomes, segment=None):
     """
     The loss_capture_ratio measures how well a model is able to
     rank LGDs when compared to the observed losses.
@@ -20,6 +49,8 @@ def loss_capture_ratio(ead, predicted_ratings, realised_outcomes):
     The results between the two approaches can differ  if the portfolio
     is not-well balanced.
 
+    Facilities with a missing EAD, LGD, prediction or segment are left out.
+
     Parameters
     ----------
     ead: pandas Series
@@ -28,11 +59,14 @@ def loss_capture_ratio(ead, predicted_ratings, realised_outcomes):
         predicted LGD, can be ordinal or continuous
     realised_outcomes: pandas Series
         realised LGD, can be ordinal or continuous
+    segment: pandas Series, optional
+        segment of each facility; if given, the LCR is computed for every
+        segment in the same call
 
     Returns
     -------
-    LCR: scalar
-        Loss Capture Ratio
+    LCR: scalar or pandas Series
+        Loss Capture Ratio, per segment if ``segment`` is given
 
     References
     ----------------
@@ -48,30 +82,38 @@ def loss_capture_ratio(ead, predicted_ratings, realised_outcomes):
         >>> print(res)
     """
 
-    # Create a dataframe
-    frame = {'ead': ead,
-             'predicted_ratings': predicted_ratings,
-             'realised_outcomes': realised_outcomes
-             }
-    df = pd.DataFrame(frame)
-
-    # Prepare data
-    df['loss'] = df['ead'] * df['realised_outcomes']
-
-    # Model loss capture curve
-    df2 = df.sort_values(by='predicted_ratings', ascending=False)
-    df2['cumulative_loss'] = df2.cumsum()['loss']
-    df2['cumulative_loss_capture_percentage'] = df2.cumsum()['loss']/df2.loss.sum()
-    auc_curve1 = auc([i for i in range(len(df2))], df2.cumulative_loss_capture_percentage)
-    random_auc1 = 0.5 * len(df2) * 1
-
-    # Ideal loss capture curve
-    df3 = df.sort_values(by='realised_outcomes', ascending=False)
-    df3['cumulative_loss'] = df3.cumsum()['loss']
-    df3['cumulative_loss_capture_percentage'] = df3.cumsum()['loss']/df3.loss.sum()
-    auc_curve2 = auc([i for i in range(len(df3))], df3.cumulative_loss_capture_percentage)
-    random_auc2 = 0.5 * len(df3) * 1
-
-    loss_capture_ratio = (auc_curve1 - random_auc1)/(auc_curve2 - random_auc2)
-
-    return loss_capture_ratio
+    predicted = as_array(predicted_ratings, np.float64)
+    realised = as_array(realised_outcomes, np.float64)
+    loss = as_array(ead, np.float64) * realised
+
+    # facilities with a missing EAD, LGD, prediction or segment are left out
+    valid = ~(np.isnan(predicted) | np.isnan(loss))
+    name = getattr(segment, 'name', None)
+    if segment is not None:
+        segment = as_array(segment)
+        valid &= ~pd.isna(segment)
+    if not valid.all():
+        predicted, realised, loss = (predicted[valid], realised[valid],
+                                     loss[valid])
+        if segment is not None:
+            segment = segment[valid]
+
+    if segment is None:
+        seg_codes = None
+    else:
+        seg_codes, segments = pd.factorize(segment, sort=True)
+
+    with stage('sorting', rows=len(loss)):
+        # Model loss capture curve
+        auc_curve1, n_g = _capture_area(loss, predicted, seg_codes)
+        # Ideal loss capture curve
+        auc_curve2, _ = _capture_area(loss, realised, seg_codes)
+    random_auc = 0.5 * n_g * 1
+
+    loss_capture_ratio = (auc_curve1 - random_auc)/(auc_curve2 - random_auc)
+
+    if segment is None:
+        return loss_capture_ratio[0]
+
+    return pd.Series(loss_capture_ratio, index=pd.Index(segments, name=name),
+                     name='LCR')
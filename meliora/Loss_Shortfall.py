@@ -2,7 +2,10 @@ import numpy as np
 import pandas as pd
 from scipy.stats import norm
 
+from meliora.Instrumentation import instrument
 
+
+@instrument
 def loss_shortfall(observed_lgd, elbe):
 
     """ Difference between observed and estimated LGDs divided by observed LGDs weighted by EAD
@@ -2,8 +2,64 @@ import numpy as np
 import pandas as pd
 from scipy.stats import norm
 
+from meliora.Columnar_Input import column
+from meliora.Instrumentation import instrument, stage
 
-def migration_matrix_stability(df, initial_ratings_col, final_ratings_col):
+
+def migration_z_tests(counts):
+    """z-tests for a stack of migration count matrices
+
+    Parameters
+    ----------
+    counts: array-like, shape (..., K, K)
+        number of migrations from initial rating i (rows) to final
+        rating j (columns); leading axes (e.g. segment) are optional
+
+    Returns
+    -------
+    z: ndarray, shape (..., K, K)
+        z statistic for each ratings pair, NaN on the main diagonal
+    phi: ndarray, shape (..., K, K)
+        p-values for each ratings pair
+
+    Notes
+    -----------
+    Below the main diagonal p_ij is compared with p_ij+1, above the main
+    diagonal with p_ij-1. All statistics are built from shifted copies of
+    the migration probability matrix and the p-values come from a single
+    norm.cdf call.
+    """
+    N_ij = np.asarray(counts, dtype=np.float64)
+    K = N_ij.shape[-1]
+    Ni = N_ij.sum(axis=-1, keepdims=True)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_ij = N_ij / Ni
+
+        # neighbouring column: j+1 below the diagonal, j-1 above it
+        nan_col = np.full(p_ij.shape[:-1] + (1,), np.nan)
+        p_right = np.concatenate([p_ij[..., 1:], nan_col], axis=-1)
+        p_left = np.concatenate([nan_col, p_ij[..., :-1]], axis=-1)
+        i, j = np.indices((K, K))
+        p_nb = np.where(i > j, p_right, p_left)
+
+        num = p_nb - p_ij
+        den_a = p_ij*(1-p_ij)/Ni
+        den_b = p_nb*(1-p_nb)/Ni
+        den_c = 2*p_ij*p_nb/Ni
+
+        z = num/np.sqrt(den_a + den_b + den_c)
+
+    z[..., i == j] = np.nan
+    with stage('distribution', rows=z.size):
+        phi = norm.cdf(z)
+
+    return z, phi
+
+
+@instrument
+def migration_matrix_stability(df, initial_ratings_col, final_ratings_col,
+                               segment_col=None):
     """z-tests to verify stability of transition matrices
 
     Parameters
@@ -14,6 +70,10 @@ def migration_matrix_stability(df, initial_ratings_col, final_ratings_col):
         name of column with initial ratings values
     final_ratings_col: string
         name of column with final ratings values
+    segment_col: string, optional
+        name of column with segments; if given, a matrix is tested for
+        every segment in one call and the results are indexed by
+        (segment, initial rating)
 
     Returns
     -------
@@ -36,42 +96,36 @@ def migration_matrix_stability(df, initial_ratings_col, final_ratings_col):
         >>> res = migration_matrix_stability(df=df, initial_ratings_col='ratings', final_ratings_col='ratings2')
         >>> print(res)
     """
-    a = df[initial_ratings_col]
-    b = df[final_ratings_col]
-    N_ij = pd.crosstab(a, b)
-    p_ij = pd.crosstab(a, b, normalize='index')
-    K = len(set(a))
-    z_df = p_ij.copy()
-    for i in range(1, K+1):
-        for j in range(1, K+1):
-            if i == j:
-
-                z_ij = np.nan
-
-            if i > j:
-                Ni = N_ij.sum(axis=1).values[i-1]
-
-                num = p_ij.iloc[i-1, j-1+1] - p_ij.iloc[i-1, j-1]
-                den_a = p_ij.iloc[i-1, j-1]*(1-p_ij.iloc[i-1, j-1])/Ni
-                den_b = p_ij.iloc[i-1, j-1+1]*(1-p_ij.iloc[i-1, j-1+1])/Ni
-                den_c = 2*p_ij.iloc[i-1, j-1]*p_ij.iloc[i-1, j-1+1]/Ni
-
-                z_ij = num/np.sqrt(den_a + den_b + den_c)
-
-            elif i < j:
-                Ni = N_ij.sum(axis=1).values[i-1]
-
-                num = p_ij.iloc[i-1, j-1-1] - p_ij.iloc[i-1, j-1]
-                den_a = p_ij.iloc[i-1, j-1]*(1-p_ij.iloc[i-1, j-1])/Ni
-                den_b = p_ij.iloc[i-1, j-1-1]*(1-p_ij.iloc[i-1, j-1-1])/Ni
-                den_c = 2*p_ij.iloc[i-1, j-1]*p_ij.iloc[i-1, j-1-1]/Ni
-
-                z_ij = num/np.sqrt(den_a + den_b + den_c)
-
-            else:
-
-                z_ij = np.nan
-
-            z_df.iloc[i-1, j-1] = z_ij
-    phi_df = z_df.apply(lambda x: x.apply(lambda y: norm.cdf(y)))
+    with stage('grouping'):
+        initial = column(df, initial_ratings_col)
+        final = column(df, final_ratings_col)
+        # transitions with a missing rating or segment are left out
+        valid = ~(pd.isna(initial) | pd.isna(final))
+        if segment_col is not None:
+            segment = column(df, segment_col)
+            valid &= ~pd.isna(segment)
+        n = np.count_nonzero(valid)
+
+        rating_codes, ratings = pd.factorize(
+            np.concatenate([initial[valid], final[valid]]), sort=True)
+        K = len(ratings)
+        a = rating_codes[:n]
+        b = rating_codes[n:]
+
+        if segment_col is None:
+            N_ij = np.bincount(a*K + b, minlength=K*K).reshape(K, K)
+            index = pd.Index(ratings, name=initial_ratings_col)
+        else:
+            s, segments = pd.factorize(segment[valid], sort=True)
+            S = len(segments)
+            N_ij = np.bincount((s*K + a)*K + b, minlength=S*K*K).reshape(S, K, K)
+            index = pd.MultiIndex.from_product([segments, ratings],
+                                               names=[segment_col, initial_ratings_col])
+
+    z, phi = migration_z_tests(N_ij)
+
+    with stage('dataframe'):
+        columns = pd.Index(ratings, name=final_ratings_col)
+        z_df = pd.DataFrame(z.reshape(-1, K), index=index, columns=columns)
+        phi_df = pd.DataFrame(phi.reshape(-1, K), index=index, columns=columns)
     return z_df, phi_df
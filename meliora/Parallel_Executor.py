@@ -0,0 +1,133 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from meliora.Columnar_Input import column
+from meliora.Grade_Summary import _group_codes
+
+
+def _attach(name):
+    # the parent process owns (and unlinks) the block, workers only read it;
+    # on POSIX workers share the parent's resource tracker, so registering
+    # the block again on Python < 3.13 is harmless
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        return SharedMemory(name=name)
+
+
+def _run_shard(func, specs, start, end, kwargs):
+    handles = []
+    shard = {}
+    try:
+        for name, (block, dtype, length, categories) in specs.items():
+            shm = _attach(block)
+            handles.append(shm)
+            values = np.ndarray(length, dtype=dtype, buffer=shm.buf)[start:end]
+            if categories is not None:
+                values = categories.take(values)
+            shard[name] = values
+
+        if callable(func):
+            result = func(shard, **kwargs)
+        else:
+            from meliora.Validation_Suite import ValidationSuite
+            result = ValidationSuite(shard, func, **kwargs).run()
+
+        # serialize while the shared buffers are still attached
+        return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        shard.clear()
+        values = None
+        for shm in handles:
+            shm.close()
+
+
+def run_by_segment(func, data, by, data_columns, n_jobs=None, **kwargs):
+    """
+    Run a validation test (or suite) for every segment in parallel.
+
+    The data is sorted by the grouping keys once and every required column
+    is copied into a shared memory block in that order. Workers of a
+    ``ProcessPoolExecutor`` attach to these blocks and receive only the
+    block names and the slice bounds of their segment, so no DataFrames are
+    pickled. Non-numeric columns are shared as integer codes.
+
+    Parameters
+    ----------
+    func : callable or list of strings
+        Either a picklable (module-level) function called as
+        ``func(segment_data, **kwargs)``, where ``segment_data`` maps every
+        name in ``data_columns`` to a NumPy array, or a list of catalogue
+        test names that are run with ``ValidationSuite``.
+    data : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+        Portfolio data
+    by : string or list of strings
+        Columns that define the segments, e.g. business segment, country
+        and reporting date
+    data_columns : list of strings
+        Columns passed to the workers
+    n_jobs : int, optional
+        Number of worker processes, defaults to the number of CPUs
+    **kwargs
+        Extra arguments for ``func`` or for ``ValidationSuite``, e.g. its
+        ``columns`` mapping of column names
+
+    Returns
+    -------
+    results : dict
+        Segment key (a tuple if ``by`` holds several columns) -> result,
+        ordered by the sorted segment keys
+
+    Examples
+    --------
+    >>> run_by_segment(['Binomial test', 'Accuracy Ratio'], df,
+    ...                by=['segment', 'country'],
+    ...                data_columns=['ratings', 'default_flag',
+    ...                              'prob_default'])
+    """
+
+    if isinstance(by, str):
+        by = [by]
+
+    keys = [column(data, key) for key in by]
+    codes, index, valid = _group_codes(keys, list(by))
+
+    # one sort by segment; rows with a missing key are left out
+    rows = np.flatnonzero(valid)[np.argsort(codes, kind='stable')]
+    bounds = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(index)))]
+
+    blocks = []
+    specs = {}
+    try:
+        for name in data_columns:
+            values = column(data, name)
+            categories = None
+            if values.dtype.kind not in 'biufcmM':
+                values, categories = pd.factorize(values)
+                # code -1 (missing value) takes the trailing None
+                categories = np.append(np.asarray(categories, dtype=object),
+                                       None)
+            shm = SharedMemory(create=True, size=max(values.nbytes, 1))
+            blocks.append(shm)
+            shared = np.ndarray(len(rows), dtype=values.dtype, buffer=shm.buf)
+            np.take(values, rows, out=shared)
+            specs[name] = (shm.name, values.dtype, len(rows), categories)
+            shared = None
+
+        n = len(index)
+        n_jobs = n_jobs or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = executor.map(_run_shard, [func] * n, [specs] * n,
+                                   bounds[:-1], bounds[1:], [kwargs] * n,
+                                   chunksize=max(1, n // (4 * n_jobs)))
+            return {key: pickle.loads(result)
+                    for key, result in zip(index, results)}
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
@@ -1,77 +1,233 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
 
+from meliora.Columnar_Input import column
+from meliora.Instrumentation import instrument
 
-def migration_matrix_stability(df, initial_ratings_col, final_ratings_col):
-    """z-tests to verify stability of transition matrices
 
-    Parameters
-    ----------
-    df: array-like, at least 2D
-        data
-    initial_ratings_col: string
-        name of column with initial ratings values
-    final_ratings_col: string
-        name of column with final ratings values
+def _quantile_edges(values, bins):
+    # quantile edges of the reference; ties collapse into fewer bins
+    edges = np.unique(np.nanquantile(values, np.linspace(0, 1, bins + 1)))
+    if len(edges) < 2:
+        edges = np.array([edges[0], edges[0] + 1])
+    return edges
 
-    Returns
-    -------
-    z_df: array-like
-        z statistic for each ratings pair
-    phi_df: array-like
-        p-values for each ratings pair
 
+def _bin_index(edges, values):
+    # values outside the edges fall in the first or last bin,
+    # missing values in an extra bin after the last one
+    n_bins = len(edges) - 1
+    idx = np.clip(np.searchsorted(edges, values, side='right') - 1,
+                  0, n_bins - 1)
+    idx[np.isnan(values)] = n_bins
+    return idx
 
-    Notes
-    -----------
-    The Null hypothesis is that p_ij >= p_ij-1 or p_ij-1 >= p_ij
-    depending on whether the (ij) entry is below or above main diagonal
 
+def _psi_terms(actual, expected, epsilon):
+    actual = np.maximum(actual, epsilon)
+    expected = np.maximum(expected, epsilon)
+    return (actual - expected) * np.log(actual / expected)
 
-    Examples
-    --------
-    .. code-block:: python
 
-        >>> res = migration_matrix_stability(df=df, initial_ratings_col='ratings', final_ratings_col='ratings2')
-        >>> print(res)
+def _column_names(data):
+    names = getattr(data, 'column_names', None)
+    if names is None:
+        names = data.columns if hasattr(data, 'columns') else data.keys()
+    return list(names)
+
+
+class PopulationStabilityIndex:
     """
-    a = df[initial_ratings_col]
-    b = df[final_ratings_col]
-    N_ij = pd.crosstab(a, b)
-    p_ij = pd.crosstab(a, b, normalize='index')
-    K = len(set(a))
-    z_df = p_ij.copy()
-    for i in range(1, K+1):
-        for j in range(1, K+1):
-            if i == j:
+    Population and characteristic stability index for many variables and
+    many periods.
+
+    The bins of every variable are fixed once on the reference sample:
+    quantile bins for numeric variables and one bin per category for
+    categorical ones, plus a bin for missing (and unseen) values. The
+    edges and the reference distributions are cached, so each comparison
+    period only costs one ``np.searchsorted`` and one ``np.bincount`` per
+    variable, and all periods of a batch are counted in the same pass.
 
-                z_ij = np.nan
+    For each variable and period
 
-            if i > j:
-                Ni = N_ij.sum(axis=1).values[i-1]
+        PSI = sum_b (A_b - E_b) * ln(A_b / E_b)
 
-                num = p_ij.iloc[i-1, j-1+1] - p_ij.iloc[i-1, j-1]
-                den_a = p_ij.iloc[i-1, j-1]*(1-p_ij.iloc[i-1, j-1])/Ni
-                den_b = p_ij.iloc[i-1, j-1+1]*(1-p_ij.iloc[i-1, j-1+1])/Ni
-                den_c = 2*p_ij.iloc[i-1, j-1]*p_ij.iloc[i-1, j-1+1]/Ni
+    with A_b and E_b the actual and expected (reference) share of bin b;
+    shares below ``epsilon`` are floored. Applied to the model score this
+    is the PSI, applied to the model inputs the CSI. A common reading is
+    < 0.1 stable, 0.1 - 0.25 moderate shift, > 0.25 significant shift.
 
-                z_ij = num/np.sqrt(den_a + den_b + den_c)
+    Parameters
+    ----------
+    reference : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+        Reference (development) sample
+    variables : list of strings, optional
+        Variables to monitor, defaults to all columns of ``reference``
+    bins : int
+        Number of quantile bins for numeric variables
+    epsilon : float
+        Floor for empty bins
 
-            elif i < j:
-                Ni = N_ij.sum(axis=1).values[i-1]
+    Examples
+    --------
+    >>> psi = PopulationStabilityIndex(dev, variables=features)
+    >>> psi.update(snapshots, period_col='month')
+    >>> psi.update(new_month, period='2024-06')
+    >>> psi.result()
+    """
 
-                num = p_ij.iloc[i-1, j-1-1] - p_ij.iloc[i-1, j-1]
-                den_a = p_ij.iloc[i-1, j-1]*(1-p_ij.iloc[i-1, j-1])/Ni
-                den_b = p_ij.iloc[i-1, j-1-1]*(1-p_ij.iloc[i-1, j-1-1])/Ni
-                den_c = 2*p_ij.iloc[i-1, j-1]*p_ij.iloc[i-1, j-1-1]/Ni
+    def __init__(self, reference, variables=None, bins=10, epsilon=1e-4):
+        if variables is None:
+            variables = _column_names(reference)
 
-                z_ij = num/np.sqrt(den_a + den_b + den_c)
+        self.variables = list(variables)
+        self.epsilon = epsilon
+        self.bins = {}
 
+        reference_counts = []
+        for name in self.variables:
+            values = column(reference, name)
+            if values.dtype.kind in 'biuf':
+                values = values.astype(np.float64, copy=False)
+                self.bins[name] = _quantile_edges(values, bins)
             else:
+                self.bins[name] = pd.Index(pd.unique(values[pd.notna(values)]))
+            idx = self._bin_index(name, values)
+            reference_counts.append(
+                np.bincount(idx, minlength=self._n_bins(name)))
+
+        sizes = [len(counts) for counts in reference_counts]
+        self.offsets = np.r_[0, np.cumsum(sizes)[:-1]]
+        self.reference = np.concatenate(reference_counts)
+        self.periods = []
+        self.counts = np.zeros((0, len(self.reference)), dtype=np.int64)
+
+    def _n_bins(self, name):
+        bins = self.bins[name]
+        # numeric: edges define len - 1 bins; categorical: one per category
+        return len(bins) if isinstance(bins, np.ndarray) else len(bins) + 1
+
+    def _bin_index(self, name, values):
+        bins = self.bins[name]
+        if isinstance(bins, np.ndarray):
+            return _bin_index(bins, values.astype(np.float64, copy=False))
+        idx = bins.get_indexer(values)
+        idx[idx < 0] = len(bins)
+        return idx
+
+    def update(self, data, period=None, period_col=None):
+        """
+        Add the observations of one or several comparison periods.
+
+        Parameters
+        ----------
+        data : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+            Observations with the monitored variables
+        period : hashable, optional
+            Label of the period when ``data`` holds a single period
+        period_col : string, optional
+            Column with the period of every observation
+
+        Observations of a period already seen are added to its counts, so
+        large periods can be fed chunk by chunk.
+        """
+        if period_col is None:
+            n = len(column(data, self.variables[0]))
+            codes = np.zeros(n, dtype=np.int64)
+            labels = [period]
+        else:
+            codes, labels = pd.factorize(column(data, period_col), sort=True)
+            if (codes < 0).any():
+                raise ValueError('{} contains missing values'.format(period_col))
+
+        # map the periods of the batch to rows of self.counts
+        rows = []
+        for label in labels:
+            if label not in self.periods:
+                self.periods.append(label)
+                self.counts = np.vstack(
+                    [self.counts, np.zeros(len(self.reference), np.int64)])
+            rows.append(self.periods.index(label))
+        rows = np.asarray(rows)
+        P = len(labels)
+
+        for name, offset in zip(self.variables, self.offsets):
+            nb = self._n_bins(name)
+            idx = self._bin_index(name, column(data, name))
+            counts = np.bincount(codes * nb + idx, minlength=P * nb)
+            self.counts[rows, offset:offset + nb] += counts.reshape(P, nb)
+
+        return self
+
+    def _shares(self, counts):
+        totals = np.add.reduceat(counts, self.offsets, axis=-1)
+        sizes = np.diff(np.r_[self.offsets, counts.shape[-1]])
+        return counts / np.repeat(totals, sizes, axis=-1)
+
+    def result(self):
+        """
+        Stability index of every variable (rows) in every period (columns).
+        """
+        expected = self._shares(self.reference)
+        actual = self._shares(self.counts)
+        terms = _psi_terms(actual, expected, self.epsilon)
+        values = np.add.reduceat(terms, self.offsets, axis=-1)
+
+        return pd.DataFrame(values.T, index=pd.Index(self.variables,
+                                                     name='Variable'),
+                            columns=pd.Index(self.periods, name='Period'))
+
+    def distribution(self, name):
+        """
+        Reference and per-period shares of the bins of one variable.
+        """
+        i = self.variables.index(name)
+        start = self.offsets[i]
+        end = start + self._n_bins(name)
+        bins = self.bins[name]
+        if isinstance(bins, np.ndarray):
+            labels = list(pd.IntervalIndex.from_breaks(bins, closed='left'))
+        else:
+            labels = list(bins)
+
+        table = pd.DataFrame(self._shares(self.counts)[:, start:end].T,
+                             index=labels + ['Missing'], columns=self.periods)
+        table.insert(0, 'Reference', self._shares(self.reference)[start:end])
+        return table
+
+
+@instrument
+def population_stability_index(reference, current, variables=None, bins=10,
+                               epsilon=1e-4):
+    """
+    Population Stability Index of a current sample against a reference.
 
-                z_ij = np.nan
+    Parameters
+    ----------
+    reference : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+        Reference (development) sample
+    current : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+        Current sample
+    variables : list of strings, optional
+        Variables to compare, defaults to all columns of ``reference``
+    bins : int
+        Number of quantile bins for numeric variables
+    epsilon : float
+        Floor for empty bins
+
+    Returns
+    -------
+    psi : pandas series
+        Index value per variable
+
+    See Also
+    --------
+    PopulationStabilityIndex : cached bins for many periods
+
+    Examples
+    --------
+    >>> population_stability_index(dev, current, variables=['prob_default'])
+    """
 
-            z_df.iloc[i-1, j-1] = z_ij
-    phi_df = z_df.apply(lambda x: x.apply(lambda y: norm.cdf(y)))
-    return z_df, phi_df
+    engine = PopulationStabilityIndex(reference, variables, bins, epsilon)
+    return engine.update(current, period='PSI').result()['PSI']
@@ -0,0 +1,149 @@
+import csv
+import io
+from collections import namedtuple
+from importlib import import_module
+
+
+# copy of docs/source/tests.csv, kept in sync by tests/test_Registry.py
+_CATALOGUE = '''#,Name,Area,Model types
+1,Accuracy Ratio,Discrimination,PD
+2,Bayesian error rate,Discrimination,PD
+3,Binomial test,Calibration,PD
+4,Brier score,Discrimination,PD
+5,Bucket test,Predictive power,LGD
+6,Hoshmer-Lemeshow test,Calibration,PD
+7,Coefficient of concordance,Discrimination,PD
+8,Concentration of rating grades,Concentration,PD
+9,Conditional Information Entropy Ratio,Discrimination,PD
+10,Cumulative LGD accuracy ratio,Discrimination,LGD
+11,ELBE back-test using t-test,Discrimination,LGD
+12,Herfhindahl index,Concentration,"PD, LGD, CCF"
+13,Information value,Discrimination,PD
+14,Jeffrey's test,Discrimination,PD
+15,Kendall tau,Discrimination,PD
+16,Kolmogorov-Smirnov test,Discrimination,PD
+17,Kullback-Leibler distance,Discrimination,PD
+18,Loss Capture Ratio,Discrimination,LGD
+19,Loss Shortfall,Predictive power,LGD
+20,Mean Absolute Deviation,Predictive power,"LGD, CCF"
+21,Migration matrices test,Discrimination,PD
+22,Normal test,Calibration,PD
+23,Population Stability Index,Stability,"PD, LGD, CCF"
+24,Receiver Operating Characteristic,Discrimination,PD
+25,Redelmeier test,Calibration,PD
+26,Somers D,Discrimination,PD
+27,Spearman rank correlation,Discrimination,LGD
+28,Spiegehalter test,Calibration,PD
+29,Stability of transition matrices,Stability,PD
+30,The Pietra Index,Discrimination,PD
+31,Traffic lights approach,Calibration,PD
+32,Transition matrix test,Predictive power,LGD
+'''
+
+# catalogue name -> (module, function) implementing the test
+IMPLEMENTATIONS = {
+    'Accuracy Ratio': ('Accuracy_Ratio', 'accuracy_ratio'),
+    'Bayesian error rate': ('Bayesian_Error_Rate', 'bayesian_error_rate'),
+    'Binomial test': ('Binomial_test', 'binomial_test'),
+    'Hoshmer-Lemeshow test': ('Hoshmer_Lemeshow_Test', 'hosmer_lemeshow'),
+    'Conditional Information Entropy Ratio': ('CIER', 'cier'),
+    'Cumulative LGD accuracy ratio': ('CLAR', 'clar'),
+    'ELBE back-test using t-test': ('ELBE_t_test', 'elbe_t_test'),
+    'Information value': ('Information_Value', 'calc_iv'),
+    "Jeffrey's test": ('Jeffreys_Test', 'jeffreys_test'),
+    'Kendall tau': ('Kendall_tau', 'kendall_tau'),
+    'Kolmogorov-Smirnov test': ('Kolmogorov_Smirnov_test', 'ks_default'),
+    'Loss Capture Ratio': ('Loss_Capture_Ratio', 'loss_capture_ratio'),
+    'Loss Shortfall': ('Loss_Shortfall', 'loss_shortfall'),
+    'Population Stability Index': ('Population_Stability_Index',
+                                   'population_stability_index'),
+    'Somers D': ('Somers_D', 'somersd'),
+    'Spearman rank correlation': ('Spearman_Rank_Correlation', 'spearman'),
+    'Stability of transition matrices': ('Mean_Absolute_Deviation',
+                                         'migration_matrix_stability'),
+    'Traffic lights approach': ('Traffic_Lights_Approach', 'traffic_lights'),
+}
+
+
+class RegistryEntry(namedtuple('RegistryEntry', ['number', 'name', 'area',
+                                                 'model_types', 'module',
+                                                 'function'])):
+    """
+    Catalogue entry of a validation test.
+
+    The implementing module (and with it pandas, SciPy etc.) is only
+    imported when the test is loaded or called.
+    """
+
+    @property
+    def available(self):
+        return self.function is not None
+
+    def load(self):
+        """Import the implementing module and return the test function."""
+        if not self.available:
+            raise NotImplementedError(
+                '{} is not implemented yet'.format(self.name))
+        return getattr(import_module('meliora.' + self.module), self.function)
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+
+def _registry():
+    entries = {}
+    for row in csv.DictReader(io.StringIO(_CATALOGUE)):
+        module, function = IMPLEMENTATIONS.get(row['Name'], (None, None))
+        model_types = tuple(m.strip() for m in row['Model types'].split(','))
+        entries[row['Name']] = RegistryEntry(int(row['#']), row['Name'],
+                                             row['Area'], model_types,
+                                             module, function)
+    return entries
+
+
+REGISTRY = _registry()
+
+
+def list_tests(area=None, model_type=None, available=None):
+    """
+    Validation tests of the catalogue (docs/source/tests.csv).
+
+    Parameters
+    ----------
+    area : string, optional
+        Only tests of this area, e.g. 'Calibration'
+    model_type : string, optional
+        Only tests for this model type, e.g. 'LGD'
+    available : bool, optional
+        Only implemented (True) or missing (False) tests
+
+    Returns
+    -------
+    entries : list of RegistryEntry
+        In catalogue order
+
+    Examples
+    --------
+    >>> [test.name for test in list_tests(area='Calibration', available=True)]
+    ['Binomial test', 'Hoshmer-Lemeshow test', 'Traffic lights approach']
+    """
+
+    return [entry for entry in REGISTRY.values()
+            if (area is None or entry.area == area)
+            and (model_type is None or model_type in entry.model_types)
+            and (available is None or entry.available == available)]
+
+
+def get_test(name):
+    """
+    Registry entry of a test by its catalogue name; call it to run the test.
+
+    Examples
+    --------
+    >>> elbe_test = get_test('ELBE back-test using t-test')
+    >>> t_stat, p_value = elbe_test(df.LGD, df.ELBE)
+    """
+
+    if name not in REGISTRY:
+        raise ValueError('Unknown test: {}'.format(name))
+    return REGISTRY[name]
@@ -0,0 +1,463 @@
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+import meliora
+from meliora.Columnar_Input import _library, as_array, column
+from meliora.Grade_Summary import _group_codes
+
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _update_array(h, values):
+    # raw bytes of the column; object columns (strings, mixed) through
+    # pandas' vectorized element hash
+    values = np.asarray(values)
+    if values.dtype.kind == 'O':
+        h.update(b'O')
+        values = pd.util.hash_array(values.ravel())
+    values = np.ascontiguousarray(values)
+    h.update('{}{};'.format(values.dtype.str, values.shape).encode())
+    h.update(values.reshape(-1).view(np.uint8))
+
+
+def _update_index(h, index):
+    h.update(repr(list(index.names)).encode())
+    if isinstance(index, pd.RangeIndex):
+        h.update('range({},{},{});'.format(index.start, index.stop,
+                                           index.step).encode())
+    else:
+        _update_array(h, pd.util.hash_pandas_object(index, index=False)
+                      .to_numpy())
+
+
+def _update_series(h, values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # codes and categories instead of the expanded values
+        _update_array(h, values.cat.codes.to_numpy())
+        _update_index(h, values.cat.categories)
+    else:
+        _update_array(h, as_array(values))
+
+
+def _function_name(func):
+    return '{}.{}'.format(getattr(func, '__module__', None),
+                          getattr(func, '__qualname__', repr(func)))
+
+
+# functions being hashed by this thread, to stop at recursive closures
+_HASHING = threading.local()
+
+
+def _update_function(h, func):
+    # the name, plus the defaults and the captured values: closures and
+    # lambdas of one qualified name may compute different things
+    h.update('function:{};'.format(_function_name(func)).encode())
+    hashing = _HASHING.__dict__.setdefault('ids', set())
+    if id(func) in hashing:
+        return
+    hashing.add(id(func))
+    try:
+        _update(h, getattr(func, '__defaults__', None))
+        _update(h, getattr(func, '__kwdefaults__', None))
+        for cell in getattr(func, '__closure__', None) or ():
+            try:
+                _update(h, cell.cell_contents)
+            except ValueError:
+                # cell of a variable not assigned yet
+                h.update(b'empty;')
+    finally:
+        hashing.discard(id(func))
+
+
+def _update(h, value):
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if value is None or isinstance(value, (bool, int, float, complex, str,
+                                           bytes)):
+        h.update('{}:{!r};'.format(type(value).__name__, value).encode())
+    elif isinstance(value, np.ndarray):
+        _update_array(h, value)
+    elif isinstance(value, pd.DataFrame):
+        h.update(b'DataFrame;')
+        _update_index(h, value.index)
+        for i, name in enumerate(value.columns):
+            _update(h, name)
+            _update_series(h, value.iloc[:, i])
+    elif isinstance(value, pd.Series):
+        h.update(b'Series;')
+        _update(h, value.name)
+        _update_index(h, value.index)
+        _update_series(h, value)
+    elif isinstance(value, pd.Index):
+        _update_index(h, value)
+    elif _library(value) in ('pyarrow', 'polars'):
+        names = getattr(value, 'column_names', None)
+        if names is None and _library(value) == 'polars' \
+                and hasattr(value, 'get_column'):
+            names = value.columns
+        if names is None:
+            _update_array(h, as_array(value))
+        else:
+            h.update(b'Table;')
+            for name in names:
+                _update(h, name)
+                _update_array(h, column(value, name))
+    elif isinstance(value, Mapping):
+        h.update('dict{};'.format(len(value)).encode())
+        for key in sorted(value, key=repr):
+            _update(h, key)
+            _update(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update('{}{};'.format(type(value).__name__, len(value)).encode())
+        for item in value:
+            _update(h, item)
+    elif callable(value) and hasattr(value, '__qualname__'):
+        _update_function(h, value)
+    else:
+        h.update(pickle.dumps(value, protocol=4))
+
+
+def fingerprint(*values):
+    """
+    Content hash of data and parameters.
+
+    Columns are hashed from their raw memory with BLAKE2b, so equal data
+    gives equal fingerprints regardless of the object holding it (a copy
+    of a DataFrame, a new read of the same snapshot). Column names, Series
+    names and non-default indexes are part of the fingerprint. Functions
+    are identified by their qualified name, their default arguments and
+    the values captured in their closure.
+
+    Parameters
+    ----------
+    *values
+        NumPy arrays, pandas objects, PyArrow/Polars tables and columns,
+        mappings and sequences of these, scalars, functions, or any
+        picklable object
+
+    Returns
+    -------
+    fingerprint : string
+        32 hexadecimal digits
+
+    Examples
+    --------
+    >>> fingerprint(df) == fingerprint(df.copy())
+    True
+    """
+
+    h = _new_hash()
+    _update(h, values)
+    return h.hexdigest()
+
+
+def _call_key(func, args, kwargs):
+    # arguments bound to the signature, so that positional and keyword
+    # calls and explicit defaults share one key
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+    except (TypeError, ValueError):
+        arguments = {'args': args, 'kwargs': kwargs}
+
+    h = _new_hash()
+    _update(h, ('call', meliora.__version__, func))
+    for name, value in arguments.items():
+        _update(h, name)
+        _update(h, value)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of validation results.
+
+    Results are stored under a fingerprint of the function, the package
+    version and all arguments, so a repeated call on an unchanged
+    snapshot is answered from the cache while any change of the data or
+    the parameters leads to a new computation. Results are kept pickled,
+    which makes every hit an independent copy.
+
+    Two tiers are used: a least recently used in-memory tier and an
+    optional SQLite file that persists across sessions and can be shared
+    between processes. Both are bounded by the size of the pickled
+    results; the least recently used results are evicted first.
+
+    Parameters
+    ----------
+    path : string or path-like, optional
+        SQLite file of the disk tier; without it only the memory tier is
+        used
+    max_memory : int
+        Size limit of the memory tier in bytes
+    max_disk : int
+        Size limit of the disk tier in bytes
+
+    Attributes
+    ----------
+    hits : int
+        Number of results served from the cache
+    misses : int
+        Number of results computed
+
+    Examples
+    --------
+    >>> cache = ResultCache('validation_cache.sqlite')
+    >>> jeffreys = cache.cached(jeffreys_test)
+    >>> jeffreys(df.ratings, df.default_flag, df.prob_default)
+    >>> cache.call(hosmer_lemeshow, df.ratings, df.default_flag,
+    ...            df.prob_default, alpha=0.01)
+
+    Notes
+    -----
+    The package version is part of the key; clear the cache when the
+    implementation of a test changes without a new version.
+    """
+
+    def __init__(self, path=None, max_memory=2**28, max_disk=2**32):
+        self.path = path
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.RLock()
+        self._db = None
+
+        if path is not None:
+            self._db = sqlite3.connect(os.fspath(path), timeout=60,
+                                       isolation_level=None,
+                                       check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS results ('
+                             'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                             'size INTEGER NOT NULL, accessed REAL NOT NULL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS results_accessed '
+                             'ON results (accessed)')
+
+    def key(self, func, *args, **kwargs):
+        """Cache key of the call ``func(*args, **kwargs)``."""
+        return _call_key(func, args, kwargs)
+
+    def _remember(self, key, blob):
+        # memory tier, least recently used first
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        if len(blob) > self.max_memory:
+            return
+        self._memory[key] = blob
+        self._memory_size += len(blob)
+        while self._memory_size > self.max_memory:
+            self._memory_size -= len(self._memory.popitem(last=False)[1])
+
+    def _load(self, key):
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                return blob
+            if self._db is None:
+                return None
+            row = self._db.execute('SELECT value FROM results WHERE key = ?',
+                                   (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE results SET accessed = ? WHERE key = ?',
+                             (time.time(), key))
+            self._remember(key, row[0])
+            return row[0]
+
+    def _store(self, key, blob):
+        with self._lock:
+            self._remember(key, blob)
+            if self._db is None or len(blob) > self.max_disk:
+                return
+            self._db.execute('INSERT OR REPLACE INTO results '
+                             'VALUES (?, ?, ?, ?)',
+                             (key, blob, len(blob), time.time()))
+            self._evict_disk()
+
+    def _evict_disk(self):
+        total = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_disk:
+            return
+        evicted = []
+        for key, size in self._db.execute(
+                'SELECT key, size FROM results ORDER BY accessed'):
+            evicted.append((key,))
+            total -= size
+            if total <= self.max_disk:
+                break
+        self._db.executemany('DELETE FROM results WHERE key = ?', evicted)
+
+    def get(self, key, default=None):
+        """Cached result stored under ``key``, or ``default``."""
+        blob = self._load(key)
+        return default if blob is None else pickle.loads(blob)
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` in both tiers."""
+        self._store(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def call(self, func, *args, **kwargs):
+        """
+        ``func(*args, **kwargs)``, answered from the cache if the same
+        function was called with the same data and parameters before.
+        """
+        key = _call_key(func, args, kwargs)
+        blob = self._load(key)
+        if blob is not None:
+            self.hits += 1
+            return pickle.loads(blob)
+
+        self.misses += 1
+        result = func(*args, **kwargs)
+        self.set(key, result)
+        return result
+
+    def cached(self, func):
+        """Decorator routing every call of ``func`` through ``call``."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+
+        return wrapper
+
+    def run_by_segment(self, func, data, by, data_columns, n_jobs=1,
+                       **kwargs):
+        """
+        Run a test (or suite) per segment, caching the result of every
+        segment separately.
+
+        Each segment is fingerprinted from its own rows of ``data_columns``, so
+        when a snapshot changes in some segments only those are
+        recomputed. Arguments and result are those of
+        ``Parallel_Executor.run_by_segment``.
+
+        Parameters
+        ----------
+        func : callable or list of strings
+            Function called as ``func(segment_data, **kwargs)`` or a list
+            of catalogue test names run with ``ValidationSuite``
+        data : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+            Portfolio data
+        by : string or list of strings
+            Columns that define the segments
+        data_columns : list of strings
+            Columns passed to ``func``
+        n_jobs : int, optional
+            Number of worker processes for the recomputed segments; 1 runs
+            them in this process, None uses all CPUs
+        **kwargs
+            Extra arguments for ``func`` or for ``ValidationSuite``, e.g.
+            its ``columns`` mapping of column names
+
+        Returns
+        -------
+        results : dict
+            Segment key (a tuple if ``by`` holds several columns) -> result,
+            ordered by the sorted segment keys
+
+        Examples
+        --------
+        >>> cache.run_by_segment(['Binomial test', "Jeffrey's test"], df,
+        ...                      by='segment',
+        ...                      data_columns=['ratings', 'default_flag',
+        ...                                    'prob_default'])
+        """
+
+        if isinstance(by, str):
+            by = [by]
+
+        keys = [column(data, key) for key in by]
+        codes, index, valid = _group_codes(keys, list(by))
+
+        # one sort by segment; rows with a missing key are left out
+        rows = np.flatnonzero(valid)[np.argsort(codes, kind='stable')]
+        bounds = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(index)))]
+        values = {name: column(data, name)[rows] for name in data_columns}
+
+        base = _new_hash()
+        _update(base, ('segment', meliora.__version__, func,
+                       list(data_columns), kwargs))
+
+        results = {}
+        missing = []
+        for i, segment in enumerate(index):
+            h = base.copy()
+            for name in data_columns:
+                _update_array(h, values[name][bounds[i]:bounds[i + 1]])
+            key = h.hexdigest()
+            blob = self._load(key)
+            if blob is None:
+                missing.append((i, segment, key))
+            else:
+                results[segment] = pickle.loads(blob)
+        self.hits += len(index) - len(missing)
+        self.misses += len(missing)
+
+        if missing and n_jobs == 1:
+            from meliora.Validation_Suite import ValidationSuite
+            for i, segment, key in missing:
+                shard = {name: values[name][bounds[i]:bounds[i + 1]]
+                         for name in data_columns}
+                if callable(func):
+                    results[segment] = func(shard, **kwargs)
+                else:
+                    results[segment] = ValidationSuite(shard, func,
+                                                       **kwargs).run()
+                self.set(key, results[segment])
+        elif missing:
+            from meliora.Parallel_Executor import run_by_segment
+            # only the rows of the segments to recompute, keyed by position
+            numbers = np.array([i for i, _, _ in missing])
+            take = np.concatenate([np.arange(bounds[i], bounds[i + 1])
+                                   for i in numbers])
+            subset = {name: values[name][take] for name in data_columns}
+            subset['__segment__'] = np.repeat(numbers, np.diff(bounds)[numbers])
+            computed = run_by_segment(func, subset, '__segment__',
+                                      data_columns, n_jobs=n_jobs, **kwargs)
+            for i, segment, key in missing:
+                results[segment] = computed[i]
+                self.set(key, results[segment])
+
+        return {segment: results[segment] for segment in index}
+
+    def clear(self):
+        """Remove all results from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM results')
+
+    def close(self):
+        """Close the SQLite file; the memory tier stays usable."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self):
+        with self._lock:
+            if self._db is None:
+                return len(self._memory)
+            return self._db.execute(
+                'SELECT COUNT(*) FROM results').fetchone()[0]
@@ -0,0 +1,124 @@
+import numpy as np
+
+from meliora.Columnar_Input import as_array
+from meliora.Instrumentation import instrument, stage
+
+
+class ScoreCurve:
+    """
+    Sorted-score curve shared by the discrimination metrics.
+
+    The scores are sorted once in descending order and observations with
+    tied scores are compressed into a single curve point. The cumulative
+    (weighted) number of defaults and non-defaults at every distinct score
+    is stored, from which the ROC curve, the CAP curve, the AUC, the
+    Gini coefficient / Accuracy Ratio, the Bayesian error rate and the
+    Kolmogorov-Smirnov statistic are all derived without sorting again.
+
+    Parameters
+    ----------
+    default_flag : array-like
+        Boolean flag indicating whether the borrower has actually defaulted.
+        Fractional values in [0, 1] are treated as a share of default.
+    prob_default : array-like
+        Predicted default probabilities or scores; higher means riskier.
+    sample_weight : array-like, optional
+        Weight of each observation (e.g. exposure). Defaults to one.
+
+    Attributes
+    ----------
+    thresholds : ndarray
+        Distinct scores in decreasing order, preceded by ``inf``.
+    defaults : ndarray
+        Cumulative weight of defaults with a score >= threshold.
+    non_defaults : ndarray
+        Cumulative weight of non-defaults with a score >= threshold.
+
+    Examples
+    --------
+    >>> curve = ScoreCurve(df.default_flag, df.prob_default)
+    >>> curve.auc(), curve.gini(), curve.ber()
+    """
+
+    @instrument(name='ScoreCurve')
+    def __init__(self, default_flag, prob_default, sample_weight=None):
+        y = as_array(default_flag, np.float64)
+        scores = as_array(prob_default, np.float64)
+
+        with stage('sorting', rows=len(scores)):
+            order = np.argsort(scores)[::-1]
+            scores = scores[order]
+            y = y[order]
+
+        if sample_weight is None:
+            w_pos = y
+            w_neg = 1 - y
+        else:
+            w = as_array(sample_weight, np.float64)[order]
+            w_pos = w * y
+            w_neg = w - w_pos
+
+        # last position of every run of tied scores
+        ends = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+
+        self.thresholds = np.r_[np.inf, scores[ends]]
+        self.defaults = np.r_[0, np.cumsum(w_pos)[ends]]
+        self.non_defaults = np.r_[0, np.cumsum(w_neg)[ends]]
+
+    @classmethod
+    def from_counts(cls, thresholds, defaults, non_defaults):
+        """
+        Build a curve from per-threshold counts that are already ordered
+        by decreasing score, e.g. the bins of a ``ScoreHistogram``.
+        """
+        curve = cls.__new__(cls)
+        curve.thresholds = np.r_[np.inf, thresholds]
+        curve.defaults = np.r_[0, np.cumsum(defaults)]
+        curve.non_defaults = np.r_[0, np.cumsum(non_defaults)]
+        return curve
+
+    @property
+    def total_defaults(self):
+        return self.defaults[-1]
+
+    @property
+    def total_non_defaults(self):
+        return self.non_defaults[-1]
+
+    def roc(self):
+        """Return false positive rate, true positive rate and thresholds."""
+        fpr = self.non_defaults / self.total_non_defaults
+        tpr = self.defaults / self.total_defaults
+        return fpr, tpr, self.thresholds
+
+    def cap(self):
+        """Return share of population and share of defaults captured."""
+        population = self.defaults + self.non_defaults
+        return population / population[-1], self.defaults / self.total_defaults
+
+    def auc(self):
+        """Area under the ROC curve; ties count as half concordant."""
+        fpr, tpr, _ = self.roc()
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)
+
+    def gini(self):
+        """Gini coefficient, equal to the Accuracy Ratio of the CAP curve."""
+        return 2 * self.auc() - 1
+
+    accuracy_ratio = gini
+
+    def ber(self, p_d=None):
+        """
+        Bayesian error rate, the minimum misclassification probability
+        over all cut-offs. ``p_d`` defaults to the sample default rate;
+        pass 0.5 for the fictitious 50% PD variant.
+        """
+        fpr, tpr, _ = self.roc()
+        if p_d is None:
+            p_d = self.total_defaults / (self.total_defaults + self.total_non_defaults)
+        return float(np.min(p_d * (1 - tpr) + (1 - p_d) * fpr))
+
+    def ks(self):
+        """Kolmogorov-Smirnov distance between defaulters and non-defaulters."""
+        fpr, tpr, _ = self.roc()
+        return float(np.max(np.abs(tpr - fpr)))
@@ -0,0 +1,132 @@
+import numpy as np
+
+from meliora.Columnar_Input import as_array
+from meliora.Score_Curve import ScoreCurve
+
+
+class ScoreHistogram:
+    """
+    Bounded-memory histogram of scores split by default status.
+
+    Scores are assigned to fixed bins and only the (weighted) number of
+    defaults and non-defaults per bin is kept, so data of any size can be
+    processed chunk by chunk with memory proportional to the number of bins.
+    Histograms built on different partitions with the same bin edges can be
+    merged.
+
+    The binned curve treats all observations in the same bin as tied, which
+    gives the following guaranteed bounds on the exact (unbinned) metrics,
+    returned by ``error_bound``:
+
+    - AUC: |AUC - AUC_hist| <= 0.5 * sum_b(D_b * ND_b) / (D * ND)
+    - Gini: twice the AUC bound
+    - KS: KS_hist <= KS <= KS_hist + max_b max(D_b / D, ND_b / ND)
+    - BER: BER_hist - max_b(p_d * D_b / D) <= BER <= BER_hist
+
+    where D_b and ND_b are the defaults and non-defaults in bin b, D and ND
+    their totals and p_d the default rate. The bounds shrink as the bins
+    get finer; quantile edges (see ``from_sample``) spread the mass evenly.
+
+    Parameters
+    ----------
+    bins : int or sequence of scalars
+        Number of equal-width bins over ``range``, or the bin edges.
+    range : tuple of float
+        Lower and upper score bound, used when ``bins`` is an int.
+        Scores outside the edges are counted in the first or last bin.
+
+    Examples
+    --------
+    >>> hist = ScoreHistogram(bins=10000)
+    >>> for chunk in pd.read_csv(path, chunksize=10**7):
+    ...     hist.update(chunk.default_flag, chunk.prob_default)
+    >>> hist.auc(), hist.gini(), hist.ber(), hist.ks()
+    >>> hist.error_bound()
+    >>> bayesian_error_rate(curve=hist.curve())
+    """
+
+    def __init__(self, bins=1000, range=(0, 1)):
+        if np.ndim(bins) == 0:
+            edges = np.linspace(range[0], range[1], int(bins) + 1)
+        else:
+            edges = np.asarray(bins, dtype=np.float64)
+        if len(edges) < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError('bin edges must be strictly increasing')
+
+        self.edges = edges
+        self.defaults = np.zeros(len(edges) - 1)
+        self.non_defaults = np.zeros(len(edges) - 1)
+
+    @classmethod
+    def from_sample(cls, prob_default, bins=1000):
+        """
+        Histogram with quantile edges estimated from a sample of scores,
+        e.g. the first chunk of the data.
+        """
+        edges = np.unique(np.quantile(as_array(prob_default, np.float64),
+                                      np.linspace(0, 1, bins + 1)))
+        return cls(bins=edges)
+
+    def update(self, default_flag, prob_default, sample_weight=None):
+        """Add a chunk of observations to the histogram."""
+        y = as_array(default_flag, np.float64)
+        scores = as_array(prob_default, np.float64)
+
+        n_bins = len(self.defaults)
+        idx = np.clip(np.searchsorted(self.edges, scores, side='right') - 1,
+                      0, n_bins - 1)
+
+        if sample_weight is None:
+            w_pos = y
+            w_neg = 1 - y
+        else:
+            w = as_array(sample_weight, np.float64)
+            w_pos = w * y
+            w_neg = w - w_pos
+
+        self.defaults += np.bincount(idx, weights=w_pos, minlength=n_bins)
+        self.non_defaults += np.bincount(idx, weights=w_neg, minlength=n_bins)
+
+        return self
+
+    def merge(self, other):
+        """Add the counts of a histogram with identical bin edges."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError('histograms have different bin edges')
+        self.defaults += other.defaults
+        self.non_defaults += other.non_defaults
+        return self
+
+    def curve(self):
+        """Binned ``ScoreCurve``, with one point per bin."""
+        return ScoreCurve.from_counts(self.edges[:-1][::-1],
+                                      self.defaults[::-1],
+                                      self.non_defaults[::-1])
+
+    def auc(self):
+        return self.curve().auc()
+
+    def gini(self):
+        return self.curve().gini()
+
+    def ber(self, p_d=None):
+        return self.curve().ber(p_d)
+
+    def ks(self):
+        return self.curve().ks()
+
+    def error_bound(self):
+        """
+        Maximum absolute difference between the binned and the exact
+        AUC, Gini, BER and KS (see the class docstring).
+        """
+        d_share = self.defaults / self.defaults.sum()
+        nd_share = self.non_defaults / self.non_defaults.sum()
+        p_d = self.defaults.sum() / (self.defaults.sum() + self.non_defaults.sum())
+
+        auc_bound = 0.5 * float(np.sum(d_share * nd_share))
+
+        return {'auc': auc_bound,
+                'gini': 2 * auc_bound,
+                'ber': float(np.max(p_d * d_share)),
+                'ks': float(np.max(np.maximum(d_share, nd_share)))}
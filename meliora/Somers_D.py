@@ -1,27 +1,202 @@
-from scipy import stats
+from collections import namedtuple
 
+import numpy as np
+from scipy.stats import norm
 
-def somersd(array_1, array_2, alternative='two-sided'):
+from meliora.Columnar_Input import as_array
+from meliora.Instrumentation import instrument
+
+
+# largest contingency table (rows x columns) used for 1-D inputs; above it
+# the association is computed from the observations with a rank count
+_TABLE_CELLS = 10**7
+
+
+class AssociationResult(namedtuple('AssociationResult', ['statistic', 'pvalue'])):
     """
-    Calculates Somers' D, an asymmetric measure of ordinal association.
+    Ordinal association measure and its p-value.
+
+    Unpacks as ``(statistic, pvalue)``. The attribute ``ase`` holds the
+    asymptotic standard error of the statistic (for confidence intervals),
+    ``ase0`` the standard error under independence and ``table`` the
+    contingency table, if one was formed.
+    """
+
+    @property
+    def correlation(self):
+        return self.statistic
+
+    def confidence_interval(self, alpha=0.05):
+        """Asymptotic two-sided confidence interval."""
+        z = norm.ppf(1 - alpha / 2)
+        return self.statistic - z * self.ase, self.statistic + z * self.ase
+
+
+def _result(statistic, pvalue, ase, ase0, table):
+    res = AssociationResult(float(statistic), float(pvalue))
+    res.ase = float(ase)
+    res.ase0 = float(ase0)
+    res.table = table
+    return res
+
+
+def _pvalue(z, alternative):
+    if alternative == 'less':
+        return norm.cdf(z)
+    if alternative == 'greater':
+        return norm.sf(z)
+    return 2 * norm.sf(np.abs(z))
+
+
+def _table_cells(table):
+    # concordant minus discordant count d_ij of every cell, via 2-D cumsums
+    table = np.asarray(table, dtype=np.float64)
+    F = np.zeros((table.shape[0] + 1, table.shape[1] + 1))
+    F[1:, 1:] = table.cumsum(0).cumsum(1)
+    n = F[-1, -1]
+
+    lt_lt = F[:-1, :-1]
+    lt_gt = F[:-1, -1:] - F[:-1, 1:]
+    gt_lt = F[-1:, :-1] - F[1:, :-1]
+    gt_gt = n - F[1:, -1:] - F[-1:, 1:] + F[1:, 1:]
+    d = lt_lt + gt_gt - lt_gt - gt_lt
+
+    rows = np.broadcast_to(table.sum(1, keepdims=True), table.shape)
+    cols = np.broadcast_to(table.sum(0, keepdims=True), table.shape)
+    keep = table.ravel() > 0
+    return (table.ravel()[keep], d.ravel()[keep], rows.ravel()[keep],
+            cols.ravel()[keep])
+
+
+def _lower_left(x, y):
+    # number of observations with x' < x and y' < y for every observation.
+    # In the order (x asc, y desc) this is the number of earlier elements
+    # with a smaller y. The y codes are split bit by bit from the top: in
+    # every group of equal higher bits, an element with the current bit set
+    # exceeds all earlier elements with it cleared. Each level is a stable
+    # partition in O(n), so the single sort dominates: O(n log n) in total.
+    n = len(x)
+    idx = np.lexsort((-y, x))
+    keys = y[idx].astype(np.int64)
+    counts = np.zeros(n, dtype=np.int64)
+    pos = np.arange(n)
+    # elements (positions in the sorted order) grouped by their higher bits
+    perm = pos
+
+    for bit in range(int(keys.max()).bit_length() - 1, -1, -1):
+        values = keys[perm]
+        zero = (values >> bit) & 1 == 0
+        prefix = values >> (bit + 1)
+        new_group = np.r_[True, prefix[1:] != prefix[:-1]]
+        starts = np.flatnonzero(new_group)
+        start = np.maximum.accumulate(np.where(new_group, pos, 0))
+
+        # zeros before each element within its group
+        zeros = np.cumsum(zero) - zero
+        zeros_before = zeros - zeros[start]
+        counts[perm[~zero]] += zeros_before[~zero]
+
+        # stable partition of every group: cleared bit first
+        group_zeros = np.repeat(np.add.reduceat(zero.astype(np.int64), starts),
+                                np.diff(np.r_[starts, n]))
+        target = np.where(zero, start + zeros_before,
+                          start + group_zeros + (pos - start - zeros_before))
+        partitioned = np.empty_like(perm)
+        partitioned[target] = perm
+        perm = partitioned
+
+    result = np.empty(n, dtype=np.int64)
+    result[idx] = counts
+    return result
 
-    This is a wrapper around scipy.stats.somersd function.
 
-    Somers' :math:`D` is a measure of the correspondence between two rankings. 
-    It considers the difference between the number of concordant 
+def _ties_below(x, y):
+    # number of observations with x' == x and y' < y
+    order = np.lexsort((y, x))
+    xs, ys = x[order], y[order]
+    new_x = np.r_[True, xs[1:] != xs[:-1]]
+    new_xy = new_x | np.r_[True, ys[1:] != ys[:-1]]
+    pos = np.arange(len(x))
+    start_x = np.maximum.accumulate(np.where(new_x, pos, 0))
+    start_xy = np.maximum.accumulate(np.where(new_xy, pos, 0))
+    counts = np.empty(len(x), dtype=np.int64)
+    counts[order] = start_xy - start_x
+    return counts
+
+
+def _observation_cells(x, y):
+    # every observation is a cell of weight one; O(n log n) in total
+    n = len(x)
+    cx = np.bincount(x)
+    cy = np.bincount(y)
+    lx = (np.cumsum(cx) - cx)[x]
+    ly = (np.cumsum(cy) - cy)[y]
+    rows = cx[x]
+    cols = cy[y]
+
+    pair = x.astype(np.int64) * (int(y.max()) + 1) + y
+    _, pair_codes, pair_counts = np.unique(pair, return_inverse=True,
+                                           return_counts=True)
+
+    d = (4 * _lower_left(x, y) + 2 * _ties_below(x, y)
+         + 2 * _ties_below(y, x) + pair_counts[pair_codes]
+         + n - 2 * lx - rows - 2 * ly - cols)
+
+    return (np.ones(n), d.astype(np.float64), rows.astype(np.float64),
+            cols.astype(np.float64))
+
+
+def _association_cells(x, y=None):
+    """
+    Cells (weight, d, row total, column total) of a contingency table or of
+    two 1-D samples, plus the table (or None) and the row and column totals.
+    """
+    if y is None:
+        table = np.asarray(x, dtype=np.float64)
+        return _table_cells(table), table, (table.sum(1), table.sum(0))
+
+    _, x = np.unique(as_array(x), return_inverse=True)
+    _, y = np.unique(as_array(y), return_inverse=True)
+    x, y = x.ravel(), y.ravel()
+    K, L = int(x.max()) + 1, int(y.max()) + 1
+
+    if K * L <= _TABLE_CELLS:
+        table = np.bincount(x * L + y, minlength=K * L).reshape(K, L)
+        return _table_cells(table), table, (table.sum(1), table.sum(0))
+
+    return (_observation_cells(x, y), None,
+            (np.bincount(x, minlength=K), np.bincount(y, minlength=L)))
+
+
+@instrument
+def somersd(array_1, array_2=None, alternative='two-sided'):
+    """
+    Calculates Somers' D, an asymmetric measure of ordinal association.
+
+    Somers' :math:`D` is a measure of the correspondence between two rankings.
+    It considers the difference between the number of concordant
     and discordant pairs in two rankings and is  normalized such that values
     close  to 1 indicate strong agreement and values close to -1 indicate
-    strong disagreement. 
+    strong disagreement.
+
+    Rating data is heavily tied, so the counts are taken from the
+    contingency table of the two variables, built with one ``np.bincount``;
+    the concordant and discordant counts of all cells follow from 2-D
+    cumulative sums in O(K·L). For continuous inputs whose table would be
+    too large, the pairs are counted per observation: one sort by (x, y),
+    then the ranks of y are split bit by bit with one linear stable
+    partition per bit, O(n log n) in total. The asymptotic standard errors
+    follow SAS PROC FREQ.
 
     Parameters
     ----------
-    x: array_like
+    array_1: array_like
         1D array of rankings, treated as the (row) independent variable.
         Alternatively, a 2D contingency table.
-    y: array_like, optional
-        If `x` is a 1D array of rankings, `y` is a 1D array of rankings of the
-        same length, treated as the (column) dependent variable.
-        If `x` is 2D, `y` is ignored.
+    array_2: array_like, optional
+        If `array_1` is a 1D array of rankings, `array_2` is a 1D array of
+        rankings of the same length, treated as the (column) dependent
+        variable. If `array_1` is 2D, `array_2` is ignored.
     alternative : {'two-sided', 'less', 'greater'}, optional
         Defines the alternative hypothesis. Default is 'two-sided'.
         The following options are available:
@@ -31,17 +206,21 @@ def somersd(array_1, array_2, alternative='two-sided'):
 
     Returns
     -------
-    res : SomersDResult
-        A `SomersDResult` object with the following fields:
-            correlation : float
-               The Somers' :math:`D` statistic.
+    res : AssociationResult
+        Unpacks as ``(statistic, pvalue)``:
+            statistic : float
+               The Somers' :math:`D` statistic, D(array_2 | array_1).
             pvalue : float
                The p-value for a hypothesis test whose null
                hypothesis is an absence of association, :math:`D=0`.
-               See notes for more information.
-            table : 2D array
-               The contingency table formed from rankings `x` and `y` (or the
-               provided contingency table, if `x` is a 2D array)
+        and has the attributes
+            ase : float
+               Asymptotic standard error, see ``confidence_interval``
+            ase0 : float
+               Standard error under the null hypothesis
+            table : 2D array or None
+               The contingency table formed from the rankings (or the
+               provided contingency table, if `array_1` is a 2D array)
 
     References
     ----------
@@ -67,8 +246,25 @@ def somersd(array_1, array_2, alternative='two-sided'):
     0.6032766111513396
     >>> res.pvalue
     1.0007091191074533e-27
-    
+    >>> res.confidence_interval(0.05)
+
     """
 
-    return stats.spearmanr(array_1, array_2, alternative='two-sided')
+    if array_2 is None or np.ndim(array_1) == 2:
+        cells, table, _ = _association_cells(array_1)
+    else:
+        cells, table, _ = _association_cells(array_1, array_2)
+    w, d, rows, _ = cells
+
+    n = w.sum()
+    S = np.sum(w * d)
+    w_r = n**2 - np.sum(w * rows)
+
+    statistic = S / w_r
+    ase = 2 / w_r**2 * np.sqrt(np.sum(w * (w_r * d - S * (n - rows))**2))
+    ase0 = 2 / w_r * np.sqrt(max(np.sum(w * d**2) - S**2 / n, 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pvalue = _pvalue(statistic / ase0, alternative)
 
+    return _result(statistic, pvalue, ase, ase0, table)
@@ -1,6 +1,9 @@
 from scipy import stats
 
+from meliora.Instrumentation import instrument
 
+
+@instrument
 def spearman(array_1, array_2, alternative='two-sided'):
     """
     Calculate a Spearman correlation coefficient with associated p-value.
@@ -1,77 +1,247 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
+from scipy.stats import beta, binom, norm
 
+from meliora.Grade_Summary import grade_summary
+from meliora.Instrumentation import count, instrument, stage
+# kept importable from here for backward compatibility
+from meliora.Mean_Absolute_Deviation import migration_matrix_stability  # noqa: F401
 
-def migration_matrix_stability(df, initial_ratings_col, final_ratings_col):
-    """z-tests to verify stability of transition matrices
 
-    Parameters
-    ----------
-    df: array-like, at least 2D
-        data
-    initial_ratings_col: string
-        name of column with initial ratings values
-    final_ratings_col: string
-        name of column with final ratings values
+# critical numbers of defaults by (N, PD, confidence, correlation); grades
+# with the same master-scale PD and size repeat across portfolios and years
+_THRESHOLDS = {}
+_MAX_THRESHOLDS = 2**20
 
-    Returns
-    -------
-    z_df: array-like
-        z statistic for each ratings pair
-    phi_df: array-like
-        p-values for each ratings pair
+# quadrature rules: Gauss-Legendre over the beta distribution (in probit
+# space), Gauss-Hermite over the standard normal systematic factor
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(96)
+_GH_NODES, _GH_WEIGHTS = np.polynomial.hermite_e.hermegauss(96)
+_GH_WEIGHTS = _GH_WEIGHTS / np.sqrt(2 * np.pi)
 
 
-    Notes
-    -----------
-    The Null hypothesis is that p_ij >= p_ij-1 or p_ij-1 >= p_ij
-    depending on whether the (ij) entry is below or above main diagonal
-
-
-    Examples
-    --------
-    .. code-block:: python
+def basel_correlation(prob_default):
+    """
+    Asset correlation of the Basel IRB formula for corporate exposures.
 
-        >>> res = migration_matrix_stability(df=df, initial_ratings_col='ratings', final_ratings_col='ratings2')
-        >>> print(res)
+    rho = 0.12 * w + 0.24 * (1 - w), w = (1 - exp(-50 PD)) / (1 - exp(-50))
     """
-    a = df[initial_ratings_col]
-    b = df[final_ratings_col]
-    N_ij = pd.crosstab(a, b)
-    p_ij = pd.crosstab(a, b, normalize='index')
-    K = len(set(a))
-    z_df = p_ij.copy()
-    for i in range(1, K+1):
-        for j in range(1, K+1):
-            if i == j:
+    w = (1 - np.exp(-50 * np.asarray(prob_default, dtype=np.float64))) \
+        / (1 - np.exp(-50))
+    return 0.12 * w + 0.24 * (1 - w)
+
+
+def _vasicek_cdf(k, n, p, rho):
+    # P(D <= k) for D binomial given the systematic factor Z, with
+    # conditional PD p(Z) = Phi((Phi^-1(p) - sqrt(rho) Z) / sqrt(1 - rho)).
+    # With B ~ Beta(k + 1, n - k), P(D <= k | Z) = P(p(Z) < B), so the
+    # probability is either E_Z[binom.cdf(k, n, p(Z))] or E_B[V(B)], V being
+    # the Vasicek distribution function of the default rate. The integral
+    # over B is used when V is flat relative to the mass of B (large N),
+    # the one over Z when the conditional binomial is (small N, small rho).
+    a = k + 1
+    b = n - k
+    t_p = norm.ppf(p) / np.sqrt(1 - rho)
+    scale = np.sqrt(rho / (1 - rho))
+    t_lo = norm.ppf(beta.ppf(1e-12, a, b))
+    t_hi = norm.ppf(beta.isf(1e-12, a, b))
+    over_b = 12 * scale >= (t_hi - t_lo) / 8
+
+    result = np.empty(len(k))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        i = over_b
+        half = (t_hi[i] - t_lo[i])[:, None] / 2
+        t = t_lo[i, None] + half * (_GL_NODES + 1)
+        vasicek = norm.cdf((t - t_p[i, None]) / scale[i, None])
+        density = beta.pdf(norm.cdf(t), a[i, None], b[i, None]) * norm.pdf(t)
+        result[i] = np.sum(_GL_WEIGHTS * half
+                           * np.nan_to_num(vasicek * density), axis=1)
+
+        i = ~over_b
+        p_z = norm.cdf(t_p[i, None] - scale[i, None] * _GH_NODES)
+        result[i] = binom.cdf(k[i, None], n[i, None], p_z) @ _GH_WEIGHTS
+
+    return result
+
+
+def _vasicek_quantiles(n, p, q, rho):
+    # smallest k with P(D <= k) >= q, bisection for all cells at once
+    lo = np.full(len(n), -1.0)
+    hi = n.astype(np.float64)
+    active = hi - lo > 1
+    while active.any():
+        mid = np.floor((lo[active] + hi[active]) / 2)
+        ok = _vasicek_cdf(mid, n[active], p[active], rho[active]) \
+            >= q[active]
+        hi[active] = np.where(ok, mid, hi[active])
+        lo[active] = np.where(ok, lo[active], mid)
+        active = hi - lo > 1
+    return hi
+
+
+def traffic_light_thresholds(n, prob_default, confidence=(0.95, 0.999),
+                             correlation=None):
+    """
+    Critical numbers of defaults of the traffic lights approach.
 
-                z_ij = np.nan
+    For every grade with ``n`` obligors and forecast PD, the critical
+    value at confidence level q is the smallest number of defaults k with
+    P(D <= k) >= q. Without ``correlation`` D is binomial; with an asset
+    correlation rho, defaults are conditionally independent given one
+    systematic factor (Vasicek model) and D follows the mixed binomial
+    distribution, which gives wider thresholds.
 
-            if i > j:
-                Ni = N_ij.sum(axis=1).values[i-1]
+    Thresholds are computed once per distinct (N, PD, confidence,
+    correlation) and kept in a module cache, so grades that repeat across
+    periods and portfolios are looked up instead of recomputed.
 
-                num = p_ij.iloc[i-1, j-1+1] - p_ij.iloc[i-1, j-1]
-                den_a = p_ij.iloc[i-1, j-1]*(1-p_ij.iloc[i-1, j-1])/Ni
-                den_b = p_ij.iloc[i-1, j-1+1]*(1-p_ij.iloc[i-1, j-1+1])/Ni
-                den_c = 2*p_ij.iloc[i-1, j-1]*p_ij.iloc[i-1, j-1+1]/Ni
+    Parameters
+    ----------
+    n : array-like of int
+        Number of obligors per grade
+    prob_default : array-like
+        Forecast PD per grade
+    confidence : sequence of floats
+        Confidence levels, e.g. (0.95, 0.999) for the yellow and the red
+        light
+    correlation : float, array-like or 'basel', optional
+        Asset correlation; 'basel' uses ``basel_correlation`` of the PD
 
-                z_ij = num/np.sqrt(den_a + den_b + den_c)
+    Returns
+    -------
+    thresholds : ndarray, shape (len(n), len(confidence))
+        Critical numbers of defaults; a grade with more defaults exceeds
+        the respective confidence level. NaN for grades with a missing PD
+        or correlation.
 
-            elif i < j:
-                Ni = N_ij.sum(axis=1).values[i-1]
+    Examples
+    --------
+    >>> traffic_light_thresholds([100, 1000], [0.01, 0.01])
+    array([[ 3.,  5.],
+           [15., 21.]])
+    """
 
-                num = p_ij.iloc[i-1, j-1-1] - p_ij.iloc[i-1, j-1]
-                den_a = p_ij.iloc[i-1, j-1]*(1-p_ij.iloc[i-1, j-1])/Ni
-                den_b = p_ij.iloc[i-1, j-1-1]*(1-p_ij.iloc[i-1, j-1-1])/Ni
-                den_c = 2*p_ij.iloc[i-1, j-1]*p_ij.iloc[i-1, j-1-1]/Ni
+    n = np.asarray(n, dtype=np.int64).ravel()
+    p = np.asarray(prob_default, dtype=np.float64).ravel()
+    if isinstance(correlation, str):
+        if correlation != 'basel':
+            raise ValueError("correlation must be a number or 'basel'")
+        rho = basel_correlation(p)
+    elif correlation is None:
+        rho = np.zeros(len(n))
+    else:
+        rho = np.broadcast_to(np.asarray(correlation, dtype=np.float64),
+                              n.shape)
+
+    # distinct (N, PD, correlation) cells and their cached thresholds
+    cells, inverse = np.unique(np.column_stack([n, p, rho]), axis=0,
+                               return_inverse=True)
+    inverse = inverse.ravel()
+    confidence = [float(q) for q in np.atleast_1d(confidence)]
+    keys = [(int(c[0]), c[1], q, c[2]) for q in confidence
+            for c in cells.tolist()]
+    values = np.array([_THRESHOLDS.get(key, np.nan) for key in keys])
+
+    # cells without a usable PD or correlation stay NaN and are not cached
+    usable = np.tile(~np.isnan(cells).any(axis=1), len(confidence))
+    missing = np.flatnonzero(np.isnan(values) & usable)
+    if len(missing):
+        count('thresholds computed', len(missing))
+        cell = missing % len(cells)
+        q = np.repeat(confidence, len(cells))[missing]
+        c_n, c_p, c_rho = cells[cell].T
+        mixed = c_rho > 0
+        computed = np.empty(len(missing))
+        with stage('distribution', rows=len(missing)):
+            computed[~mixed] = binom.ppf(q[~mixed], c_n[~mixed], c_p[~mixed])
+            computed[mixed] = _vasicek_quantiles(c_n[mixed], c_p[mixed],
+                                                 q[mixed], c_rho[mixed])
+        values[missing] = computed
+
+        if len(_THRESHOLDS) + len(missing) > _MAX_THRESHOLDS:
+            _THRESHOLDS.clear()
+        _THRESHOLDS.update((keys[i], values[i]) for i in missing)
+
+    return values.reshape(len(confidence), len(cells)).T[inverse]
+
+
+@instrument
+def traffic_lights(ratings=None, default_flag=None, prob_default=None,
+                   summary=None, by=None, confidence=(0.95, 0.999),
+                   correlation=None):
+    """
+    Traffic lights approach to the calibration of PD grades.
 
-                z_ij = num/np.sqrt(den_a + den_b + den_c)
+    The number of defaults of every grade is compared with the critical
+    values of its forecast PD at two confidence levels: up to the lower
+    critical value the grade is green, up to the upper one yellow, above
+    it red. All grades of all portfolios and periods are classified in one
+    vectorized call, e.g. for a multi-year backtest window.
 
-            else:
+    Parameters
+    ----------
+    ratings : pandas series
+        Series with PD ratings
+    default_flag : pandas series
+        Boolean flag indicating whether the borrower has actually defaulted
+    prob_default : pandas series
+        Predicted default probabilities
+    summary : pandas dataframe, optional
+        Output of ``grade_summary``. When given, the raw series are
+        ignored; its ``PD`` column is the forecast PD of the grade.
+    by : pandas series or list of pandas series, optional
+        Grouping keys, e.g. portfolio and year of the backtest window
+    confidence : pair of floats
+        Confidence levels of the yellow and the red light
+    correlation : float or 'basel', optional
+        Asset correlation for the Vasicek-adjusted thresholds; binomial
+        thresholds (independent defaults) if omitted
 
-                z_ij = np.nan
+    Returns
+    -------
+    dataframe : pandas dataframe
+        Indexed like the summary (grouping keys followed by rating), with
+        the columns ``N``, ``D``, ``PD``, ``Default Rate``,
+        ``Yellow Threshold`` and ``Red Threshold`` (the smallest numbers
+        of defaults that give a yellow and a red light) and
+        ``Traffic Light`` (categorical: 'Green', 'Yellow', 'Red'). Grades
+        with a missing PD have missing thresholds and light.
+
+    References
+    ----------
+    Tasche, D. (2003). A traffic lights approach to PD validation.
+    arXiv:cond-mat/0305038.
+
+    Examples
+    --------
+    >>> lights = traffic_lights(df.ratings, df.default_flag, df.prob_default,
+    ...                         by=[df.portfolio, df.year], correlation=0.12)
+    >>> lights['Traffic Light'].unstack('year')
+    """
 
-            z_df.iloc[i-1, j-1] = z_ij
-    phi_df = z_df.apply(lambda x: x.apply(lambda y: norm.cdf(y)))
-    return z_df, phi_df
+    if summary is None:
+        summary = grade_summary(ratings, default_flag, prob_default, by=by)
+
+    n = summary['N'].to_numpy(dtype=np.int64)
+    d = summary['D'].to_numpy(dtype=np.int64)
+    p = summary['PD'].to_numpy(dtype=np.float64)
+
+    lower, upper = traffic_light_thresholds(n, p, confidence, correlation).T
+    # grades without a usable PD get no light rather than a green one
+    missing = np.isnan(lower)
+    light = np.where(missing, -1, (d > lower).astype(np.int8) + (d > upper))
+
+    with stage('dataframe'):
+        results = pd.DataFrame({'N': n,
+                                'D': d,
+                                'PD': p,
+                                'Default Rate': d / n,
+                                'Yellow Threshold': pd.array(
+                                    lower + 1, dtype='Int64'),
+                                'Red Threshold': pd.array(
+                                    upper + 1, dtype='Int64'),
+                                'Traffic Light': pd.Categorical.from_codes(
+                                    light, ['Green', 'Yellow', 'Red'])},
+                               index=summary.index)
+
+    return results
@@ -0,0 +1,183 @@
+from meliora.Accuracy_Ratio import accuracy_ratio
+from meliora.Bayesian_Error_Rate import bayesian_error_rate
+from meliora.Binomial_test import binomial_test
+from meliora.CIER import cier
+from meliora.CLAR import clar
+from meliora.Columnar_Input import column
+from meliora.ELBE_t_test import elbe_t_test
+from meliora.Grade_Summary import grade_summary
+from meliora.Hoshmer_Lemeshow_Test import hosmer_lemeshow
+from meliora.Instrumentation import instrument, stage
+from meliora.Jeffreys_Test import jeffreys_test
+from meliora.Kolmogorov_Smirnov_test import ks_default
+from meliora.Loss_Capture_Ratio import loss_capture_ratio
+from meliora.Mean_Absolute_Deviation import migration_matrix_stability
+from meliora.Score_Curve import ScoreCurve
+from meliora.Spearman_Rank_Correlation import spearman
+from meliora.Traffic_Lights_Approach import traffic_lights
+
+
+# default column names, as in tests/synthetic_pd.xlsx
+COLUMNS = {'ratings': 'ratings',
+           'default_flag': 'default_flag',
+           'prob_default': 'prob_default',
+           'ratings2': 'ratings2',
+           'lgd': 'LGD',
+           'pred_lgd': 'PRED_LGD',
+           'elbe': 'ELBE',
+           'ead': 'EAD'}
+
+
+# shared intermediates: name -> (intermediates it needs, builder)
+INTERMEDIATES = {
+    'grade_summary': (
+        (), lambda s: grade_summary(s.column('ratings'),
+                                    s.column('default_flag'),
+                                    s.column('prob_default'))),
+    'score_curve': (
+        (), lambda s: ScoreCurve(s.column('default_flag'),
+                                 s.column('prob_default'))),
+}
+
+
+# catalogue name (docs/source/tests.csv) -> (intermediates, runner)
+TESTS = {
+    'Accuracy Ratio': (
+        ('score_curve',),
+        lambda s: accuracy_ratio(curve=s.intermediate('score_curve'))),
+    'Bayesian error rate': (
+        ('score_curve',),
+        lambda s: bayesian_error_rate(curve=s.intermediate('score_curve'))),
+    'Binomial test': (
+        ('grade_summary',),
+        lambda s: binomial_test(summary=s.intermediate('grade_summary'),
+                                alpha=s.alpha)),
+    'Hoshmer-Lemeshow test': (
+        ('grade_summary',),
+        lambda s: hosmer_lemeshow(summary=s.intermediate('grade_summary'),
+                                  alpha=s.alpha)),
+    'Conditional Information Entropy Ratio': (
+        ('grade_summary',),
+        lambda s: cier(summary=s.intermediate('grade_summary'))),
+    'Cumulative LGD accuracy ratio': (
+        (),
+        lambda s: clar(s.column('pred_lgd'), s.column('lgd'))),
+    'ELBE back-test using t-test': (
+        (),
+        lambda s: elbe_t_test(s.column('lgd'), s.column('elbe'))),
+    "Jeffrey's test": (
+        ('grade_summary',),
+        lambda s: jeffreys_test(summary=s.intermediate('grade_summary'),
+                                alpha=s.alpha)),
+    'Kolmogorov-Smirnov test': (
+        (),
+        lambda s: ks_default(s.column('default_flag'),
+                             s.column('prob_default'))),
+    'Loss Capture Ratio': (
+        (),
+        lambda s: loss_capture_ratio(s.column('ead'), s.column('pred_lgd'),
+                                     s.column('lgd'))),
+    'Spearman rank correlation': (
+        (),
+        lambda s: spearman(s.column('pred_lgd'), s.column('lgd'))),
+    'Stability of transition matrices': (
+        (),
+        lambda s: migration_matrix_stability(
+            s.data, s.columns['ratings'], s.columns['ratings2'])),
+    'Traffic lights approach': (
+        ('grade_summary',),
+        lambda s: traffic_lights(summary=s.intermediate('grade_summary'))),
+}
+
+
+class ValidationSuite:
+    """
+    Run several validation tests from one shared pass over the data.
+
+    The suite looks up which intermediates the requested tests need (the
+    per-grade summary for the calibration tests, the sorted score curve for
+    the discrimination tests), computes every intermediate and every input
+    column exactly once, and runs all tests against them.
+
+    Parameters
+    ----------
+    data : pandas DataFrame, PyArrow Table, Polars DataFrame or mapping
+        Portfolio data
+    tests : list of strings
+        Test names as listed in the catalogue (docs/source/tests.csv)
+    columns : dict, optional
+        Overrides of the default column names in ``COLUMNS``, e.g.
+        ``{'lgd': 'realised_lgd'}``
+    alpha : float
+        Significance level used by the statistical tests
+
+    Examples
+    --------
+    >>> suite = ValidationSuite(df, ['Binomial test', "Jeffrey's test",
+    ...                              'Accuracy Ratio'])
+    >>> suite.plan()
+    ['grade_summary', 'score_curve']
+    >>> results = suite.run()
+    >>> results['Accuracy Ratio']
+    """
+
+    def __init__(self, data, tests, columns=None, alpha=0.05):
+        unknown = [test for test in tests if test not in TESTS]
+        if unknown:
+            raise ValueError('Tests not available in the suite: {}'.format(
+                ', '.join(unknown)))
+
+        self.data = data
+        self.tests = list(tests)
+        self.columns = dict(COLUMNS, **(columns or {}))
+        self.alpha = alpha
+        self._columns = {}
+        self._intermediates = {}
+
+    def plan(self):
+        """Intermediates required by the tests, in computation order."""
+        plan = []
+
+        def add(name):
+            for dependency in INTERMEDIATES[name][0]:
+                add(dependency)
+            if name not in plan:
+                plan.append(name)
+
+        for test in self.tests:
+            for name in TESTS[test][0]:
+                add(name)
+
+        return plan
+
+    def column(self, name):
+        """Input column as a NumPy array, converted only once."""
+        if name not in self._columns:
+            self._columns[name] = column(self.data, self.columns[name])
+        return self._columns[name]
+
+    def intermediate(self, name):
+        """Shared intermediate, computed only once."""
+        if name not in self._intermediates:
+            self._intermediates[name] = INTERMEDIATES[name][1](self)
+        return self._intermediates[name]
+
+    @instrument(name='ValidationSuite')
+    def run(self):
+        """
+        Run all tests.
+
+        Returns
+        -------
+        results : dict
+            Test name -> result of the test function
+        """
+        for name in self.plan():
+            self.intermediate(name)
+
+        results = {}
+        for test in self.tests:
+            with stage(test):
+                results[test] = TESTS[test][1](self)
+
+        return results
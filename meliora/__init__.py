@@ -1,5 +1,72 @@
 """Top-level package for Credit Risk Validation Tests."""
 
+from importlib import import_module
+
 __author__ = """Anton Treialt"""
 __email__ = 'anton.treialt@aistat.com'
 __version__ = '0.1.0'
+
+
+# public name -> module; modules (and pandas, SciPy, ...) are imported on
+# first access, so ``import meliora`` stays cheap
+_EXPORTS = {
+    'list_tests': 'Registry',
+    'get_test': 'Registry',
+    'accuracy_ratio': 'Accuracy_Ratio',
+    'bayesian_error_rate': 'Bayesian_Error_Rate',
+    'binomial_test': 'Binomial_test',
+    'bootstrap': 'Bootstrap',
+    'bootstrap_curve': 'Bootstrap',
+    'calc_iv': 'Information_Value',
+    'calc_woe_iv': 'Information_Value',
+    'cier': 'CIER',
+    'clar': 'CLAR',
+    'clar_ci': 'CLAR',
+    'elbe_t_test': 'ELBE_t_test',
+    'fingerprint': 'Result_Cache',
+    'grade_summary': 'Grade_Summary',
+    'grouped_t_test': 'LGD_t_test',
+    'instrumented': 'Instrumentation',
+    'hosmer_lemeshow': 'Hoshmer_Lemeshow_Test',
+    'jeffreys_test': 'Jeffreys_Test',
+    'kendall_tau': 'Kendall_tau',
+    'ks': 'Kolmogorov_Smirnov_test',
+    'ks_default': 'Kolmogorov_Smirnov_test',
+    'lgd_t_test': 'LGD_t_test',
+    'loss_capture_ratio': 'Loss_Capture_Ratio',
+    'loss_shortfall': 'Loss_Shortfall',
+    'migration_matrix_stability': 'Mean_Absolute_Deviation',
+    'population_stability_index': 'Population_Stability_Index',
+    'read_chunks': 'Chunked_Input',
+    'run_by_segment': 'Parallel_Executor',
+    'run_chunks': 'Chunked_Input',
+    'somersd': 'Somers_D',
+    'spearman': 'Spearman_Rank_Correlation',
+    'traffic_light_thresholds': 'Traffic_Lights_Approach',
+    'traffic_lights': 'Traffic_Lights_Approach',
+    'DistributionAccumulator': 'Accumulators',
+    'GradeAccumulator': 'Accumulators',
+    'MomentAccumulator': 'Accumulators',
+    'OpenTelemetryExporter': 'Instrumentation',
+    'PopulationStabilityIndex': 'Population_Stability_Index',
+    'PrometheusExporter': 'Instrumentation',
+    'Recorder': 'Instrumentation',
+    'ResultCache': 'Result_Cache',
+    'ScoreCurve': 'Score_Curve',
+    'ScoreHistogram': 'Score_Histogram',
+    'ValidationSuite': 'Validation_Suite',
+    'WoEAccumulator': 'Accumulators',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(
+            "module 'meliora' has no attribute '{}'".format(name))
+    value = getattr(import_module('meliora.' + _EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
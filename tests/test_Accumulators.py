@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import meliora.Accumulators
+from meliora.Accumulators import (DistributionAccumulator, GradeAccumulator,
+                                  MomentAccumulator, WoEAccumulator)
+from meliora.Binomial_test import binomial_test
+from meliora.Grade_Summary import grade_summary
+from meliora.Jeffreys_Test import jeffreys_test
+from meliora.LGD_t_test import grouped_t_test
+
+
+def test_Accumulators():
+    assert 3 == 3
+
+
+def _portfolio(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 8, n)
+    prob_default = ratings / 50 + rng.uniform(0, 0.01, n)
+    return pd.DataFrame({'ratings': ratings,
+                         'default_flag': rng.random(n) < prob_default,
+                         'prob_default': prob_default,
+                         'segment': rng.choice(['A', 'B'], n)})
+
+
+def test_grade_accumulator():
+    df = _portfolio()
+    full = grade_summary(df.ratings, df.default_flag, df.prob_default)
+
+    acc = GradeAccumulator()
+    for batch in np.array_split(np.arange(len(df)), 4):
+        acc.update(df.iloc[batch])
+
+    left = GradeAccumulator().update(df.iloc[:1000])
+    right = GradeAccumulator().update(df.iloc[1000:])
+    merged = left.merge(right).result()
+
+    for summary in (acc.result(), merged):
+        assert summary['N'].dtype == np.int64
+        pd.testing.assert_frame_equal(summary, full)
+
+    pd.testing.assert_frame_equal(acc.binomial_test(),
+                                  binomial_test(summary=full))
+    pd.testing.assert_frame_equal(acc.jeffreys_test(),
+                                  jeffreys_test(summary=full))
+
+
+def test_grade_accumulator_by_segment():
+    df = _portfolio()
+    acc = GradeAccumulator(by='segment')
+    acc.update(df[df.ratings < 4]).update(df[df.ratings >= 4])
+
+    full = grade_summary(df.ratings, df.default_flag, df.prob_default,
+                         by=df.segment)
+    pd.testing.assert_frame_equal(acc.result(), full)
+
+
+def test_distribution_accumulator():
+    rng = np.random.default_rng(1)
+    reference = DistributionAccumulator.from_sample(rng.normal(size=10000))
+    assert np.isclose(reference.result()[:-1], 0.1, atol=0.01).all()
+
+    current = DistributionAccumulator(reference.edges)
+    current.update(rng.normal(0.5, size=5000))
+    other = DistributionAccumulator(reference.edges)
+    other.update(np.r_[rng.normal(0.5, size=5000), np.nan])
+
+    assert current.psi(reference) > 0.1
+    assert reference.psi(reference) == 0
+    assert current.merge(other).counts.sum() == 10001
+    assert current.counts[-1] == 1
+
+
+def test_moment_accumulator_merge():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'LGD': rng.uniform(0, 1, 3000),
+                       'PRED_LGD': rng.uniform(0, 1, 3000),
+                       'segment': rng.choice(['A', 'B', 'C'], 3000)})
+
+    left = MomentAccumulator(by='segment').update(df.iloc[:100])
+    right = MomentAccumulator(by='segment').update(df.iloc[100:])
+    merged = left.merge(right).result('greater')
+
+    expected = grouped_t_test(df.LGD, df.PRED_LGD, by=df.segment,
+                              alternative='greater')
+    assert np.allclose(merged.to_numpy(), expected.to_numpy())
+
+
+def test_woe_accumulator_merge():
+    df = _portfolio()
+    first, second = df.iloc[:2500], df.iloc[2500:]
+    full = WoEAccumulator(['prob_default', 'segment'], 'default_flag',
+                          bins=5).update(first).update(second)
+
+    # shards binned with the same edges merge into the single-pass result
+    left = WoEAccumulator(['prob_default', 'segment'], 'default_flag',
+                          bins=5).update(first)
+    right = WoEAccumulator(['prob_default', 'segment'], 'default_flag',
+                           bins=5)
+    right.edges = dict(left.edges)
+    right.update(second)
+    pd.testing.assert_frame_equal(left.merge(right).result(), full.result())
+
+    # an empty accumulator adopts the edges of the other
+    empty = WoEAccumulator(['prob_default', 'segment'], 'default_flag',
+                           bins=5)
+    empty.merge(full)
+    assert np.array_equal(empty.edges['prob_default'],
+                          full.edges['prob_default'])
+
+    # edges taken from different first batches do not line up
+    other = WoEAccumulator(['prob_default', 'segment'], 'default_flag',
+                           bins=5).update(second)
+    with pytest.raises(ValueError, match='prob_default'):
+        WoEAccumulator(['prob_default', 'segment'], 'default_flag',
+                       bins=5).update(first).merge(other)
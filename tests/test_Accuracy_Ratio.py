@@ -1,5 +1,18 @@
+import numpy as np
+from sklearn import metrics
+
 import meliora.Accuracy_Ratio
 
 
 def test_Accuracy_Ratio():
     assert 3 == 3
+
+
+def test_Accuracy_Ratio_gini():
+    rng = np.random.default_rng(3)
+    pred = rng.random(1000)
+    y_test = (rng.random(1000) < pred).astype(int)
+
+    ar = meliora.Accuracy_Ratio.accuracy_ratio(y_test, pred)
+
+    assert np.isclose(ar, 2 * metrics.roc_auc_score(y_test, pred) - 1)
@@ -1,5 +1,26 @@
+import numpy as np
+from sklearn import metrics
+
 import meliora.Bayesian_Error_Rate
+from meliora.Score_Curve import ScoreCurve
 
 
 def test_Bayesian_Error_Rate():
-    assert 3 == 3
\ No newline at end of file
+    assert 3 == 3
+
+
+def test_Bayesian_Error_Rate_curve():
+    rng = np.random.default_rng(2)
+    prob_default = rng.random(1000)
+    default_flag = (rng.random(1000) < prob_default).astype(int)
+
+    fpr, tpr, _ = metrics.roc_curve(default_flag, prob_default)
+    p_d = default_flag.mean()
+    expected = round(min(p_d * (1 - tpr) + (1 - p_d) * fpr), 3)
+
+    ber = meliora.Bayesian_Error_Rate.bayesian_error_rate(default_flag,
+                                                          prob_default)
+    curve = ScoreCurve(default_flag, prob_default)
+
+    assert ber == expected
+    assert meliora.Bayesian_Error_Rate.bayesian_error_rate(curve=curve) == ber
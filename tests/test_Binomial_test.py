@@ -1,5 +1,49 @@
+import numpy as np
+import pandas as pd
+
 import meliora.Binomial_test
+from meliora.Grade_Summary import grade_summary
 
 
 def test_Binomial_test():
     assert 3 == 3
+
+
+def test_Binomial_test_summary():
+    rng = np.random.default_rng(0)
+    ratings = pd.Series(rng.integers(1, 8, 2000))
+    prob_default = ratings * 0.02
+    default_flag = pd.Series(rng.random(2000) < prob_default).astype(int)
+    summary = grade_summary(ratings, default_flag, prob_default)
+
+    res = meliora.Binomial_test.binomial_test(ratings, default_flag,
+                                              prob_default, alpha=0.05)
+    res_summary = meliora.Binomial_test.binomial_test(summary=summary,
+                                                      alpha=0.05)
+
+    assert list(res['Rating']) == list(range(1, 8))
+    assert res['Number of Obs'].sum() == 2000
+    pd.testing.assert_frame_equal(res, res_summary)
+
+
+def test_Binomial_test_segments():
+    rng = np.random.default_rng(1)
+    n = 5000
+    ratings = pd.Series(rng.integers(1, 6, n))
+    segment = pd.Series(rng.choice(['retail', 'sme'], n), name='segment')
+    prob_default = ratings * 0.03
+    default_flag = pd.Series(rng.random(n) < prob_default).astype(int)
+
+    res = meliora.Binomial_test.binomial_test(ratings, default_flag,
+                                              prob_default, by=segment)
+
+    assert list(res.columns[:2]) == ['segment', 'Rating']
+    assert len(res) == 10
+    assert res['Number of Obs'].dtype == np.int64
+    assert str(res['Binomial Test'].dtype) == 'category'
+
+    retail = res[res['segment'] == 'retail'].reset_index(drop=True)
+    mask = segment == 'retail'
+    single = meliora.Binomial_test.binomial_test(
+        ratings[mask], default_flag[mask], prob_default[mask])
+    np.testing.assert_allclose(retail['P-Value'], single['P-Value'])
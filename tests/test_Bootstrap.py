@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import meliora.Bootstrap
+from meliora.Bootstrap import bootstrap, bootstrap_curve
+from meliora.Score_Curve import ScoreCurve
+
+
+def test_Bootstrap():
+    assert 3 == 3
+
+
+def _portfolio(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    prob_default = np.round(rng.beta(2, 20, n), 3)
+    default_flag = rng.random(n) < prob_default
+    return pd.Series(default_flag), pd.Series(prob_default)
+
+
+def _gini(default_flag, prob_default):
+    return ScoreCurve(default_flag, prob_default).gini()
+
+
+def test_bootstrap_curve():
+    y, p = _portfolio()
+    curve = ScoreCurve(y, p)
+
+    for metric, exact in [('gini', curve.gini()), ('auc', curve.auc()),
+                          ('ks', curve.ks()), ('ber', curve.ber())]:
+        res = bootstrap_curve(y, p, metric, n_boot=200, random_state=1)
+        assert np.isclose(res.estimate, exact)
+        assert res.ci_lower < res.estimate < res.ci_upper
+        assert len(res.replicates) == 200
+
+    res = bootstrap_curve(y, p, n_boot=200, ci='percentile',
+                          resampling='poisson', random_state=1)
+    assert res.ci_lower < res.estimate < res.ci_upper
+
+
+def test_bootstrap_reproducible():
+    y, p = _portfolio()
+
+    first = bootstrap_curve(y, p, n_boot=250, batch_size=50, random_state=7)
+    second = bootstrap_curve(y, p, n_boot=250, batch_size=50, random_state=7,
+                             n_jobs=2)
+    assert np.array_equal(first.replicates, second.replicates)
+    assert first.ci_lower == second.ci_lower
+
+    generic = bootstrap(_gini, y, p, n_boot=100, random_state=3)
+    generic_parallel = bootstrap(_gini, y, p, n_boot=100, random_state=3,
+                                 n_jobs=2)
+    assert np.array_equal(generic.replicates, generic_parallel.replicates)
+
+
+def test_bootstrap_generic_matches_curve():
+    y, p = _portfolio()
+
+    curve = bootstrap_curve(y, p, n_boot=400, random_state=0)
+    generic = bootstrap(_gini, y, p, n_boot=400, random_state=0)
+
+    assert np.isclose(curve.estimate, generic.estimate)
+    assert np.isclose(curve.replicates.std(), generic.replicates.std(), rtol=0.2)
+    assert abs(curve.ci_lower - generic.ci_lower) < 0.05
+    assert abs(curve.ci_upper - generic.ci_upper) < 0.05
+
+
+def test_bootstrap_curve_missing_values():
+    y, p = _portfolio()
+    expected = bootstrap_curve(y[2:], p[2:], n_boot=50, random_state=1)
+
+    # unknown outcomes and scores are left out, not counted as defaults
+    y = y.astype(float)
+    y[0] = np.nan
+    p[1] = np.nan
+    res = bootstrap_curve(y, p, n_boot=50, random_state=1)
+    assert res.estimate == expected.estimate
+    np.testing.assert_array_equal(res.replicates, expected.replicates)
+
+
+def test_bootstrap_n_boot():
+    y, p = _portfolio()
+    with pytest.raises(ValueError, match='n_boot'):
+        bootstrap_curve(y, p, n_boot=0)
+    with pytest.raises(ValueError, match='n_boot'):
+        bootstrap(_gini, y, p, n_boot=0)
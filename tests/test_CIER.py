@@ -1,5 +1,17 @@
+import numpy as np
+import pandas as pd
+
 import meliora.CIER
 
 
 def test_CIER():
     assert 3 == 3
+
+
+def test_CIER_bounds():
+    ratings = pd.Series([1, 1, 2, 2])
+
+    # ratings separate defaults perfectly
+    assert np.isclose(meliora.CIER.cier(ratings, pd.Series([0, 0, 1, 1])), 1)
+    # ratings carry no information about defaults
+    assert np.isclose(meliora.CIER.cier(ratings, pd.Series([0, 1, 0, 1])), 0)
@@ -1,5 +1,56 @@
+import numpy as np
+import pandas as pd
+
 import meliora.CLAR
+from meliora.CLAR import clar, clar_ci
 
 
 def test_CLAR():
     assert 3 == 3
+
+
+def _clar_reference(predicted, realised):
+    # direct definition: overlap of the top bands and the top realised
+    n = len(predicted)
+    top_realised = np.argsort(-realised, kind='stable')
+    x_values, y_values = [0], [0]
+    for band in sorted(set(predicted), reverse=True):
+        in_bands = predicted >= band
+        k = in_bands.sum()
+        x_values.append(k / n)
+        y_values.append(in_bands[top_realised[:k]].sum() / n)
+    x_values, y_values = np.array(x_values), np.array(y_values)
+    return np.sum(np.diff(x_values) * (y_values[1:] + y_values[:-1]))
+
+
+def test_CLAR_reference():
+    rng = np.random.default_rng(0)
+    n = 2000
+    realised = rng.random(n)
+    predicted = np.digitize(realised + rng.normal(0, 0.2, n), [0.25, 0.5, 0.75])
+
+    res = clar(pd.Series(predicted), pd.Series(realised))
+
+    assert np.isclose(res, _clar_reference(predicted, realised))
+    assert np.isclose(clar(predicted.astype(float), realised), res)
+    assert np.isclose(clar(np.digitize(realised, [0.25, 0.5, 0.75]), realised), 1)
+
+    result = clar_ci(predicted, realised, n_boot=50, random_state=0)
+    assert result.estimate == res
+    assert result.ci_lower < result.ci_upper
+    assert len(result.replicates) == 50
+
+
+def test_CLAR_missing_values():
+    rng = np.random.default_rng(1)
+    n = 500
+    realised = rng.random(n)
+    predicted = np.digitize(realised + rng.normal(0, 0.2, n),
+                            [0.25, 0.5, 0.75]).astype(float)
+    expected = clar(predicted[2:], realised[2:])
+
+    predicted[0] = np.nan
+    realised[1] = np.nan
+    assert clar(predicted, realised) == expected
+    assert clar(pd.Series(predicted), pd.Series(realised)) == expected
+    assert clar_ci(predicted, realised, n_boot=10).estimate == expected
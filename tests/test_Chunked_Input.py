@@ -0,0 +1,129 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import meliora.Chunked_Input
+from meliora.Accumulators import (GradeAccumulator, MomentAccumulator,
+                                  WoEAccumulator)
+from meliora.Chunked_Input import read_chunks, run_chunks
+from meliora.Grade_Summary import grade_summary
+from meliora.Information_Value import calc_woe_iv
+from meliora.LGD_t_test import grouped_t_test
+from meliora.Population_Stability_Index import (PopulationStabilityIndex,
+                                                population_stability_index)
+
+
+def test_Chunked_Input():
+    assert 3 == 3
+
+
+def _portfolio(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 8, n)
+    prob_default = ratings / 50 + rng.uniform(0, 0.01, n)
+    pred_lgd = rng.uniform(0.1, 0.6, n)
+    return pd.DataFrame({'ratings': ratings,
+                         'default_flag': (rng.random(n) < prob_default).astype(int),
+                         'prob_default': prob_default,
+                         'LGD': np.clip(pred_lgd + rng.normal(0, 0.1, n), 0, 1),
+                         'PRED_LGD': pred_lgd,
+                         'EAD': rng.lognormal(10, 1, n),
+                         'region': rng.choice(['N', 'S', 'E'], n)})
+
+
+def _check_stream(df, chunks):
+    grades, lgd, woe = run_chunks(chunks, GradeAccumulator(),
+                                  MomentAccumulator('LGD', 'PRED_LGD',
+                                                    by='region', weight='EAD'),
+                                  WoEAccumulator(['region', 'ratings'],
+                                                 'default_flag'))
+
+    pd.testing.assert_frame_equal(
+        grades.result(),
+        grade_summary(df.ratings, df.default_flag, df.prob_default))
+
+    expected = grouped_t_test(df.LGD, df.PRED_LGD, by=df.region,
+                              sample_weight=df.EAD)
+    assert np.allclose(lgd.result().to_numpy(), expected.to_numpy())
+
+    table = woe.result()
+    full = calc_woe_iv(df, ['region', 'ratings'], 'default_flag')
+    assert np.allclose(table['IV'], full['IV'])
+
+
+def test_read_chunks_csv(tmp_path):
+    df = _portfolio()
+    path = tmp_path / 'portfolio.csv'
+    df.to_csv(path, index=False)
+
+    chunks = list(read_chunks(path, chunksize=1200,
+                              dtypes={'ratings': np.int16}))
+    assert len(chunks) == 5
+    assert chunks[0]['ratings'].dtype == np.int16
+
+    _check_stream(df, read_chunks(path, chunksize=1200))
+
+
+def test_read_chunks_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = _portfolio()
+    path = tmp_path / 'portfolio.parquet'
+    df.to_parquet(path, row_group_size=1000)
+
+    chunks = list(read_chunks(path, columns=['ratings', 'prob_default'],
+                              chunksize=700))
+    assert sum(len(chunk['ratings']) for chunk in chunks) == len(df)
+    assert set(chunks[0]) == {'ratings', 'prob_default'}
+
+    _check_stream(df, read_chunks(path, chunksize=700))
+
+
+def test_run_chunks_psi(tmp_path):
+    df = _portfolio()
+    path = tmp_path / 'portfolio.csv'
+    df.to_csv(path, index=False)
+
+    psi = PopulationStabilityIndex(df.iloc[:2000], ['prob_default', 'region'])
+    run_chunks(read_chunks(path, chunksize=1000),
+               lambda chunk: psi.update(chunk, period='current'))
+
+    expected = population_stability_index(df.iloc[:2000], df,
+                                          ['prob_default', 'region'])
+    assert np.allclose(psi.result()['current'], expected)
+
+
+def test_read_chunks_csv_schema(tmp_path):
+    path = tmp_path / 'codes.csv'
+    # the later chunk alone would be parsed as integers
+    pd.DataFrame({'branch': ['A1'] * 3 + ['07'] * 3,
+                  'ratings': [1, 2, 3, 4, 5, 6]}).to_csv(path, index=False)
+    chunks = list(read_chunks(path, chunksize=3))
+    assert [list(chunk['branch']) for chunk in chunks] == [['A1'] * 3,
+                                                           ['07'] * 3]
+    assert chunks[1]['ratings'].dtype == chunks[0]['ratings'].dtype
+
+    # a missing value does not fit the integer dtype of the first chunk
+    path.write_text('ratings,region\n1,N\n2,N\n3,S\n4,S\n,E\n6,E\n')
+    with pytest.raises(ValueError, match='pass dtypes'):
+        list(read_chunks(path, chunksize=3))
+    chunks = list(read_chunks(path, chunksize=3,
+                              dtypes={'ratings': np.float64}))
+    assert np.isnan(chunks[1]['ratings'][1])
+
+
+def test_run_chunks_psi_period_col(tmp_path):
+    df = _portfolio()
+    df['month'] = np.repeat(['2024-01', '2024-02'], len(df) // 2)
+    path = tmp_path / 'portfolio.csv'
+    df.to_csv(path, index=False)
+
+    psi = PopulationStabilityIndex(df.iloc[:2000], ['prob_default', 'region'])
+    run_chunks(read_chunks(path, chunksize=1500),
+               partial(psi.update, period_col='month'))
+
+    for month, period in df.groupby('month'):
+        expected = population_stability_index(df.iloc[:2000], period,
+                                              ['prob_default', 'region'])
+        assert np.allclose(psi.result()[month], expected)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from meliora.Columnar_Input import as_array, column
+from meliora.Grade_Summary import grade_summary
+
+
+def test_Columnar_Input():
+    values = np.arange(10, dtype=np.float64)
+
+    assert as_array(values, np.float64) is values
+    series = pd.Series(values)
+    assert np.shares_memory(as_array(series, np.float64), series.to_numpy())
+    assert as_array([1, 2, 3]).flags['C_CONTIGUOUS']
+    assert as_array(values[::2]).flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(column({'x': values}, 'x'), values)
+
+
+def test_Columnar_Input_arrow():
+    pa = pytest.importorskip('pyarrow')
+    df = pd.DataFrame({'ratings': [1, 2, 2, 1],
+                       'default_flag': [0, 1, 1, 0],
+                       'prob_default': [0.1, 0.5, 0.6, 0.2]})
+    table = pa.Table.from_pandas(df)
+
+    np.testing.assert_array_equal(column(table, 'prob_default'),
+                                  df.prob_default)
+    pd.testing.assert_frame_equal(
+        grade_summary(table.column('ratings'), table.column('default_flag'),
+                      table.column('prob_default')),
+        grade_summary(df.ratings, df.default_flag, df.prob_default))
+
+
+def test_Columnar_Input_polars():
+    pl = pytest.importorskip('polars')
+    frame = pl.DataFrame({'x': [1.0, 2.0, 3.0]})
+
+    np.testing.assert_array_equal(column(frame, 'x'), [1.0, 2.0, 3.0])
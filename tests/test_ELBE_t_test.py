@@ -1,5 +1,28 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
 import meliora.ELBE_t_test
+from meliora.ELBE_t_test import elbe_t_test
 
 
 def test_ELBE_t_test():
     assert 3 == 3
+
+
+def test_elbe_t_test():
+    rng = np.random.default_rng(0)
+    elbe = pd.Series(rng.uniform(0.2, 0.8, 500))
+    observed_lgd = elbe + rng.normal(0, 0.1, 500)
+    grade = pd.Series(rng.integers(1, 4, 500), name='grade')
+
+    t_stat, p_value = elbe_t_test(observed_lgd, elbe)
+    expected = stats.ttest_rel(observed_lgd, elbe)
+    assert np.isclose(t_stat, expected.statistic)
+    assert np.isclose(p_value, expected.pvalue)
+
+    res = elbe_t_test(observed_lgd, elbe, by=grade)
+    for g in res.index:
+        mask = grade == g
+        assert np.isclose(res.loc[g, 'P-Value'],
+                          stats.ttest_rel(observed_lgd[mask], elbe[mask]).pvalue)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from meliora.Grade_Summary import grade_summary
+
+
+def test_Grade_Summary():
+    ratings = pd.Series([2, 1, 2, 3, 1, 2, np.nan])
+    default_flag = pd.Series([1, 0, 0, 1, 1, 0, 1])
+    prob_default = pd.Series([0.2, 0.1, 0.3, 0.5, 0.1, 0.4, 0.9])
+
+    summary = grade_summary(ratings, default_flag, prob_default)
+
+    assert list(summary.index) == [1, 2, 3]
+    assert list(summary['N']) == [2, 3, 1]
+    assert list(summary['D']) == [1, 1, 1]
+    np.testing.assert_allclose(summary['PD Sum'], [0.2, 0.9, 0.5])
+    np.testing.assert_allclose(summary['PD'], [0.1, 0.3, 0.5])
+
+
+def test_Grade_Summary_by():
+    ratings = pd.Series([1, 2, 1, 2, 1])
+    default_flag = pd.Series([1, 0, 0, 1, 1])
+    segment = pd.Series(['b', 'a', 'b', 'b', None], name='segment')
+
+    summary = grade_summary(ratings, default_flag, by=segment)
+
+    assert summary.index.names == ['segment', 'Rating']
+    assert list(summary.index) == [('a', 2), ('b', 1), ('b', 2)]
+    assert list(summary['N']) == [1, 2, 1]
+    assert list(summary['D']) == [0, 1, 1]
+    assert summary['PD'].isna().all()
+
+
+def test_Grade_Summary_missing_flags():
+    ratings = pd.Series([2, 1, 2, 3, 1, 2, 3])
+    default_flag = pd.Series([1, 0, np.nan, 1, 1, 0, np.nan])
+    prob_default = pd.Series([0.2, 0.1, 0.3, 0.5, 0.1, 0.4, 0.9])
+
+    # unknown outcomes are dropped, not counted as defaults
+    summary = grade_summary(ratings, default_flag, prob_default)
+    expected = grade_summary(ratings.drop([2, 6]), default_flag.drop([2, 6]),
+                             prob_default.drop([2, 6]))
+    pd.testing.assert_frame_equal(summary, expected)
+    assert list(summary['N']) == [2, 2, 1]
+    assert list(summary['D']) == [1, 1, 1]
+
+    nullable = grade_summary(ratings, default_flag.astype('boolean'),
+                             prob_default)
+    pd.testing.assert_frame_equal(nullable, expected)
+
+    # a grade observed only with unknown outcomes does not appear
+    summary = grade_summary(ratings, default_flag.where(ratings != 3),
+                            prob_default)
+    assert list(summary.index) == [1, 2]
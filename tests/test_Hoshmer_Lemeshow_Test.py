@@ -1,5 +1,148 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2
+
 import meliora.Hoshmer_Lemeshow_Test
+from meliora.Grade_Summary import grade_summary
 
 
 def test_Hoshmer_Lemeshow_Test():
     assert 3 == 3
+
+
+def test_Hoshmer_Lemeshow_Test_summary():
+    ratings = pd.Series([1, 1, 1, 1, 2, 2, 2, 2])
+    default_flag = pd.Series([0, 0, 0, 1, 0, 1, 1, 0])
+    prob_default = pd.Series([0.2] * 4 + [0.4] * 4)
+    summary = grade_summary(ratings, default_flag, prob_default)
+
+    res = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+        ratings, default_flag, prob_default, alpha=0.05)
+    res_summary = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+        summary=summary, alpha=0.05)
+
+    assert res == res_summary
+    assert 0 <= res[0] <= 1
+
+
+def _portfolio(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 11, n)
+    prob_default = ratings / 60 + rng.uniform(0, 0.01, n)
+    return pd.DataFrame({'ratings': ratings,
+                         'default_flag': rng.random(n) < prob_default,
+                         'prob_default': prob_default,
+                         'model': rng.choice(['m1', 'm2'], n)})
+
+
+def _chi_stat(df, groups):
+    table = df.groupby(groups).agg(N=('default_flag', 'size'),
+                                   D=('default_flag', 'sum'),
+                                   PD=('prob_default', 'mean'))
+    return ((table.D - table.N * table.PD)**2
+            / (table.N * table.PD * (1 - table.PD))).sum(), len(table)
+
+
+def test_Hoshmer_Lemeshow_Test_groups():
+    df = _portfolio()
+    hl = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow
+
+    chi_stat, n_groups = _chi_stat(df, 'ratings')
+    p_value, outcome = hl(df.ratings, df.default_flag, df.prob_default)
+    assert np.isclose(p_value, chi2.sf(chi_stat, n_groups))
+    assert outcome == ('Pass' if p_value >= 0.05 else 'Fail')
+
+    deciles = np.empty(len(df), dtype=int)
+    deciles[np.argsort(df.prob_default.to_numpy())] = np.arange(len(df)) * 10 // len(df)
+    chi_stat, _ = _chi_stat(df.assign(decile=deciles), 'decile')
+    res = hl(default_flag=df.default_flag, prob_default=df.prob_default,
+             groups='deciles', ddof=2, alpha=[0.01, 0.05])
+    assert np.isclose(res['Chi-Square'].iloc[0], chi_stat)
+    assert res['DoF'].iloc[0] == 8
+    assert list(res.columns[-2:]) == ['Pass/Fail (alpha=0.01)',
+                                      'Pass/Fail (alpha=0.05)']
+
+    edges = [0.05, 0.1, 0.15]
+    chi_stat, n_groups = _chi_stat(
+        df.assign(bin=np.digitize(df.prob_default, edges)), 'bin')
+    p_value, _ = hl(default_flag=df.default_flag, prob_default=df.prob_default,
+                    groups=edges)
+    assert np.isclose(p_value, chi2.sf(chi_stat, n_groups))
+
+
+def test_Hoshmer_Lemeshow_Test_segments():
+    df = _portfolio()
+    hl = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow
+
+    res = hl(df.ratings, df.default_flag, df.prob_default, by=df.model)
+    for model, group in df.groupby('model'):
+        p_value, outcome = hl(group.ratings, group.default_flag,
+                              group.prob_default)
+        assert np.isclose(res.loc[model, 'P-Value'], p_value)
+        assert res.loc[model, 'Pass/Fail'] == outcome
+
+    deciles = hl(default_flag=df.default_flag, prob_default=df.prob_default,
+                 groups='deciles', by=df.model)
+    assert (deciles['DoF'] == 10).all()
+
+
+def test_hosmer_lemeshow_former_signature():
+    df = _portfolio(2000)
+    expected = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+        df.ratings, df.default_flag, df.prob_default, 0.05)
+    with pytest.warns(DeprecationWarning):
+        res = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+            df.ratings, df.default_flag, df.prob_default, 0.05, 0)
+    assert res == expected
+    with pytest.raises(TypeError):
+        meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+            df.ratings, df.default_flag, df.prob_default, 0.05, 0,
+            grade_summary(df.ratings, df.default_flag, df.prob_default))
+
+
+def test_hosmer_lemeshow_no_degrees_of_freedom():
+    df = _portfolio(2000)
+    # segment m2 has only two grades left
+    df = df[(df.model == 'm1') | (df.ratings <= 2)]
+    with pytest.warns(RuntimeWarning, match='1 segment'):
+        res = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+            df.ratings, df.default_flag, df.prob_default, by=df.model,
+            ddof=2)
+    assert res.loc['m2', 'DoF'] == 0
+    assert np.isnan(res.loc['m2', 'P-Value'])
+    assert res.loc['m2', 'Pass/Fail'] == 'Undetermined'
+    assert res.loc['m1', 'Pass/Fail'] in ('Pass', 'Fail')
+
+
+def test_hosmer_lemeshow_degenerate_pd():
+    df = _portfolio(2000)
+    # a grade of model m2 forecast with PD 0
+    df.loc[(df.model == 'm2') & (df.ratings == 1), 'prob_default'] = 0.0
+    with pytest.warns(RuntimeWarning, match='PD of 0, 1 or missing'):
+        res = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+            df.ratings, df.default_flag, df.prob_default, by=df.model)
+    assert np.isnan(res.loc['m2', 'P-Value'])
+    assert res.loc['m2', 'Pass/Fail'] == 'Undetermined'
+    assert res.loc['m1', 'Pass/Fail'] in ('Pass', 'Fail')
+
+
+def test_hosmer_lemeshow_missing_pd_groups():
+    df = _portfolio(4000)
+    edges = [0.05, 0.1, 0.15]
+    expected = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+        default_flag=df.default_flag[10:], prob_default=df.prob_default[10:],
+        groups=edges, by=df.model[10:])
+    deciles = meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+        default_flag=df.default_flag[10:], prob_default=df.prob_default[10:],
+        groups='deciles')
+
+    # missing PDs are dropped rather than put into the last bin
+    df.loc[:9, 'prob_default'] = np.nan
+    pd.testing.assert_frame_equal(
+        meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+            default_flag=df.default_flag, prob_default=df.prob_default,
+            groups=edges, by=df.model), expected)
+    assert meliora.Hoshmer_Lemeshow_Test.hosmer_lemeshow(
+        default_flag=df.default_flag, prob_default=df.prob_default,
+        groups='deciles') == deciles
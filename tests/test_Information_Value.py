@@ -1,5 +1,46 @@
+import numpy as np
+import pandas as pd
+
 import meliora.Information_Value
+from meliora.Information_Value import calc_iv, calc_woe_iv
 
 
 def test_Information_Value():
     assert 3 == 3
+
+
+def _df():
+    rng = np.random.default_rng(0)
+    n = 3000
+    region = rng.choice(['north', 'south', 'east', 'west'], n)
+    age = rng.normal(40, 10, n)
+    bad = (rng.random(n) < np.where(region == 'north', 0.2, 0.1)
+           + (age < 30) * 0.1).astype(int)
+    return pd.DataFrame({'region': region, 'age': age, 'bad': bad})
+
+
+def test_calc_iv():
+    df = _df()
+
+    iv = 0
+    good_total = (df.bad == 0).sum()
+    bad_total = (df.bad == 1).sum()
+    for _, group in df.groupby('region'):
+        dist_good = (group.bad == 0).sum() / good_total
+        dist_bad = (group.bad == 1).sum() / bad_total
+        iv += (dist_good - dist_bad) * np.log(dist_good / dist_bad)
+
+    assert np.isclose(calc_iv(df, 'region', 'bad'), iv)
+
+
+def test_calc_woe_iv():
+    df = _df()
+
+    table = calc_woe_iv(df, ['region', 'age'], 'bad', bins=5)
+    parallel = calc_woe_iv(df, ['region', 'age'], 'bad', bins=5, n_jobs=2)
+
+    assert list(table['Variable'].unique()) == ['region', 'age']
+    assert (table['Variable'] == 'age').sum() == 5
+    assert np.isclose(table.loc[table.Variable == 'region', 'IV'].iloc[0],
+                      calc_iv(df, 'region', 'bad'))
+    pd.testing.assert_frame_equal(table, parallel)
@@ -0,0 +1,197 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from meliora.Binomial_test import binomial_test
+from meliora.Grade_Summary import grade_summary
+from meliora.Hoshmer_Lemeshow_Test import hosmer_lemeshow
+from meliora.Instrumentation import (OpenTelemetryExporter,
+                                     PrometheusExporter, Recorder, count,
+                                     instrumented, is_enabled, stage)
+from meliora.Validation_Suite import ValidationSuite
+
+
+def test_Instrumentation():
+    assert 3 == 3
+
+
+def _portfolio(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 8, n)
+    prob_default = ratings / 50 + rng.uniform(0, 0.01, n)
+    return pd.DataFrame({'ratings': ratings,
+                         'default_flag': (rng.random(n) < prob_default).astype(int),
+                         'prob_default': prob_default})
+
+
+def test_disabled_records_nothing():
+    df = _portfolio()
+    assert not is_enabled()
+    with stage('outside') as null:
+        count('rows', 10)
+        binomial_test(df.ratings, df.default_flag, df.prob_default)
+    # a single shared no-op context
+    assert null is stage('other')
+
+    # nothing opened while disabled leaks into a later run
+    recorder = Recorder()
+    with instrumented(recorder):
+        with stage('next'):
+            pass
+    assert [(r.test, r.stage) for r in recorder.records] == [('next', 'total')]
+
+
+def test_stages_are_nested_under_the_test():
+    df = _portfolio()
+    recorder = Recorder()
+    with instrumented(recorder):
+        binomial_test(df.ratings, df.default_flag, df.prob_default)
+    assert not is_enabled()
+
+    stages = [(r.test, r.stage) for r in recorder.records]
+    assert stages == [('binomial_test', 'grade_summary/grouping'),
+                      ('binomial_test', 'grade_summary/dataframe'),
+                      ('binomial_test', 'grade_summary'),
+                      ('binomial_test', 'distribution'),
+                      ('binomial_test', 'dataframe'),
+                      ('binomial_test', 'total')]
+
+    total = recorder.records[-1]
+    assert total.rows == len(df)
+    assert total.peak_memory is None
+    assert total.elapsed >= sum(r.elapsed for r in recorder.records
+                                if r.stage.count('/') == 0
+                                and r.stage != 'total')
+    assert recorder.records[0].counters == {'groups': 7}
+
+
+def test_results_unchanged():
+    df = _portfolio()
+    expected = hosmer_lemeshow(default_flag=df.default_flag,
+                               prob_default=df.prob_default, groups='deciles',
+                               by=df.ratings % 2)
+    with instrumented(Recorder(), memory=True):
+        result = hosmer_lemeshow(default_flag=df.default_flag,
+                                 prob_default=df.prob_default,
+                                 groups='deciles', by=df.ratings % 2)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_peak_memory():
+    recorder = Recorder()
+    assert not tracemalloc.is_tracing()
+    with instrumented(recorder, memory=True):
+        with stage('outer'):
+            with stage('allocate'):
+                block = np.ones(2**20)
+            del block
+            with stage('small'):
+                pass
+    assert not tracemalloc.is_tracing()
+
+    records = {r.stage: r for r in recorder.records}
+    assert records['allocate'].peak_memory >= 8 * 2**20
+    assert records['small'].peak_memory < 2**20
+    # the outer stage includes the peak of its sub-stages
+    assert records['total'].peak_memory >= 8 * 2**20
+
+
+def test_callback_and_user_stage():
+    df = _portfolio()
+    seen = []
+    with instrumented(seen.append):
+        with stage('model 17', rows=len(df)):
+            ValidationSuite(df, ['Binomial test', 'Accuracy Ratio']).run()
+
+    assert {r.test for r in seen} == {'model 17'}
+    stages = {r.stage for r in seen}
+    assert 'ValidationSuite/grade_summary/grouping' in stages
+    assert 'ValidationSuite/ScoreCurve/sorting' in stages
+    assert 'ValidationSuite/Binomial test/binomial_test/distribution' in stages
+    assert seen[-1].stage == 'total' and seen[-1].rows == len(df)
+
+
+def test_recorder_summary():
+    df = _portfolio()
+    recorder = Recorder()
+    with instrumented(recorder):
+        for _ in range(3):
+            grade_summary(df.ratings, df.default_flag, df.prob_default)
+
+    summary = recorder.summary()
+    assert summary.index.names == ['Test', 'Stage']
+    assert list(summary.columns) == ['Calls', 'Seconds', 'Rows', 'Peak Memory']
+    assert summary.loc[('grade_summary', 'total'), 'Calls'] == 3
+    assert summary.loc[('grade_summary', 'total'), 'Rows'] == 3 * len(df)
+    assert np.isnan(summary.loc[('grade_summary', 'total'), 'Peak Memory'])
+
+
+def test_prometheus_exporter(tmp_path):
+    df = _portfolio()
+    exporter = PrometheusExporter(tmp_path / 'meliora.prom')
+    with instrumented(exporter):
+        grade_summary(df.ratings, df.default_flag, df.prob_default)
+        grade_summary(df.ratings, df.default_flag, df.prob_default)
+        with stage('a "quoted"\nname'):
+            pass
+    exporter.write()
+
+    text = (tmp_path / 'meliora.prom').read_text()
+    assert '# TYPE meliora_stage_calls_total counter' in text
+    assert 'meliora_stage_calls_total{test="grade_summary",stage="total"} 2' in text
+    assert ('meliora_stage_rows_total{test="grade_summary",stage="total"} '
+            + str(2 * len(df))) in text
+    assert ('meliora_counter_total{test="grade_summary",stage="grouping",'
+            'counter="groups"} 14') in text
+    assert 'test="a \\"quoted\\"\\nname"' in text
+    # no memory measured
+    assert 'peak_memory' not in text
+
+
+class _Instrument:
+    def __init__(self):
+        self.values = []
+
+    def record(self, value, attributes):
+        self.values.append((value, attributes))
+
+    add = record
+
+
+class _Meter:
+    def __init__(self):
+        self.instruments = {}
+
+    def _create(self, name, **kwargs):
+        return self.instruments.setdefault(name, _Instrument())
+
+    create_histogram = create_counter = _create
+
+
+def test_opentelemetry_exporter():
+    df = _portfolio()
+    meter = _Meter()
+    with instrumented(OpenTelemetryExporter(meter)):
+        grade_summary(df.ratings, df.default_flag, df.prob_default)
+
+    durations = meter.instruments['meliora.stage.duration'].values
+    assert [a['stage'] for _, a in durations] == ['grouping', 'dataframe',
+                                                 'total']
+    assert meter.instruments['meliora.stage.rows'].values == [
+        (len(df), {'test': 'grade_summary', 'stage': 'total'})]
+    assert meter.instruments['meliora.groups'].values == [
+        (7, {'test': 'grade_summary', 'stage': 'grouping'})]
+
+
+def test_exception_leaves_instrumentation_consistent():
+    recorder = Recorder()
+    with instrumented(recorder):
+        with pytest.raises(ValueError):
+            with stage('failing'):
+                raise ValueError
+        with stage('next'):
+            pass
+    assert [(r.test, r.stage) for r in recorder.records] == [
+        ('failing', 'total'), ('next', 'total')]
@@ -1,5 +1,46 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import beta
+
 import meliora.Jeffreys_Test
 
 
 def test_Jeffreys_Test():
     assert 3 == 3
+
+
+def test_Jeffreys_Test_overall():
+    ratings = pd.Series([1, 1, 1, 2, 2, 2, 2])
+    default_flag = pd.Series([0, 0, 1, 0, 1, 1, 0])
+    prob_default = pd.Series([0.1, 0.1, 0.1, 0.4, 0.4, 0.4, 0.4])
+
+    res = meliora.Jeffreys_Test.jeffreys_test(ratings, default_flag,
+                                              prob_default, alpha=0.05)
+
+    assert list(res.index) == [1, 2, 'Overall']
+    assert list(res['N']) == [3, 4, 7]
+    assert list(res['D']) == [1, 2, 3]
+    np.testing.assert_allclose(res.loc[2, 'P-Value'],
+                               beta.ppf(0.05, 2.5, 2.5))
+    assert res.loc[1, 'Pass/Fail'] == 'Pass'
+
+
+def test_Jeffreys_Test_by():
+    rng = np.random.default_rng(0)
+    n = 3000
+    ratings = pd.Series(rng.integers(1, 4, n))
+    portfolio = pd.Series(rng.choice(['x', 'y'], n), name='portfolio')
+    prob_default = ratings * 0.05
+    default_flag = pd.Series(rng.random(n) < prob_default).astype(int)
+
+    res = meliora.Jeffreys_Test.jeffreys_test(ratings, default_flag,
+                                              prob_default, by=portfolio)
+
+    assert res.index.names == ['portfolio', 'Rating']
+    assert list(res.loc['x'].index) == [1, 2, 3, 'Overall']
+    assert res.loc[('x', 'Overall'), 'N'] == (portfolio == 'x').sum()
+
+    mask = portfolio == 'y'
+    single = meliora.Jeffreys_Test.jeffreys_test(
+        ratings[mask], default_flag[mask], prob_default[mask])
+    pd.testing.assert_frame_equal(res.loc['y'], single)
@@ -1,5 +1,40 @@
+import numpy as np
+from scipy import stats
+
 import meliora.Kendall_tau
+import meliora.Somers_D
+from meliora.Kendall_tau import kendall_tau
 
 
 def test_Kendall_tau():
     assert 3 == 3
+
+
+def test_kendall_tau_variants():
+    rng = np.random.default_rng(0)
+    ratings = rng.integers(1, 21, 5000)
+    default_flag = rng.random(5000) < ratings / 60
+
+    for variant in ('b', 'c'):
+        tau, pvalue = kendall_tau(ratings, default_flag, variant=variant)
+        expected = stats.kendalltau(ratings, default_flag, variant=variant)
+        assert np.isclose(tau, expected.statistic)
+        assert np.isclose(pvalue, expected.pvalue)
+
+    tau_b = kendall_tau(ratings, default_flag, 'b').statistic
+    tau_c = kendall_tau(ratings, default_flag, 'c').statistic
+    assert tau_b != tau_c
+
+
+def test_kendall_tau_continuous(monkeypatch):
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=2000)
+    y = x + rng.normal(size=2000)
+
+    monkeypatch.setattr(meliora.Somers_D, '_TABLE_CELLS', 0)
+    res = kendall_tau(x, y)
+    expected = stats.kendalltau(x, y)
+
+    assert np.isclose(res.statistic, expected.statistic)
+    assert np.isclose(res.pvalue, expected.pvalue)
+    assert 0 < res.ase < 0.05
@@ -1,5 +1,78 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
 import meliora.Kolmogorov_Smirnov_test
+from meliora.Kolmogorov_Smirnov_test import ks, ks_default
+from meliora.Score_Curve import ScoreCurve
 
 
 def test_Kolmogorov_Smirnov_test():
     assert 3 == 3
+
+
+def _portfolio(n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    prob_default = np.round(rng.beta(2, 20, n), 3)
+    default_flag = rng.random(n) < prob_default
+    segment = pd.Series(rng.choice(['A', 'B', 'C'], n), name='segment')
+    return default_flag, prob_default, segment
+
+
+def test_ks_passes_arguments():
+    x = np.linspace(-15, 15, 9)
+    assert ks(x, 'norm', alternative='less') == stats.kstest(x, 'norm', alternative='less')
+
+
+def test_ks_default():
+    y, p, _ = _portfolio()
+
+    for alternative in ('two-sided', 'greater', 'less'):
+        res = ks_default(y, p, alternative=alternative, method='asymp')
+        expected = stats.ks_2samp(p[~y], p[y], alternative=alternative,
+                                  method='asymp')
+        assert np.isclose(res.statistic, expected.statistic)
+        assert np.isclose(res.pvalue, expected.pvalue)
+
+    res = ks_default(y, p)
+    assert np.isclose(res.statistic, ScoreCurve(y, p).ks())
+    assert res.cutoff == stats.ks_2samp(p[~y], p[y]).statistic_location
+
+    # small samples get the exact p-value
+    small = ks_default(y[:80], p[:80])
+    expected = stats.ks_2samp(p[:80][~y[:80]], p[:80][y[:80]], method='exact')
+    assert np.isclose(small.pvalue, expected.pvalue)
+
+
+def test_ks_default_segments_and_weights():
+    y, p, segment = _portfolio()
+    w = np.random.default_rng(1).random(len(y))
+
+    table = ks_default(y, p, segment=segment)
+    assert list(table.index) == ['A', 'B', 'C']
+    for name in table.index:
+        mask = (segment == name).to_numpy()
+        assert np.isclose(table.loc[name, 'KS'],
+                          stats.ks_2samp(p[mask & ~y], p[mask & y]).statistic)
+        assert table.loc[name, 'Number of Defaults'] == (mask & y).sum()
+
+    weighted = ks_default(y, p, sample_weight=w)
+    assert np.isclose(weighted.statistic, ScoreCurve(y, p, sample_weight=w).ks())
+    assert np.isclose(ks_default(y, p, sample_weight=np.ones(len(y))).statistic,
+                      ks_default(y, p).statistic)
+
+
+def test_ks_default_one_sided_sample_order():
+    rng = np.random.default_rng(3)
+    # fewer and more defaulters than non-defaulters
+    for n_pos, n_neg in [(300, 900), (900, 300)]:
+        y = np.r_[np.ones(n_pos, dtype=bool), np.zeros(n_neg, dtype=bool)]
+        scores = np.r_[rng.normal(0.2, 1, n_pos), rng.normal(0, 1, n_neg)]
+        for alternative in ['less', 'greater']:
+            res = ks_default(y, scores, alternative=alternative,
+                             method='asymp')
+            expected = stats.ks_2samp(scores[~y], scores[y],
+                                      alternative=alternative,
+                                      method='asymp')
+            assert np.isclose(res.statistic, expected.statistic)
+            assert np.isclose(res.pvalue, expected.pvalue, rtol=1e-10)
@@ -1,5 +1,65 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
 import meliora.LGD_t_test
+from meliora.LGD_t_test import grouped_t_test, lgd_t_test
 
 
 def test_LGD_t_test():
     assert 3 == 3
+
+
+def _lgd_portfolio(n=6000, seed=0):
+    rng = np.random.default_rng(seed)
+    pred = rng.uniform(0.1, 0.6, n)
+    return pd.DataFrame({'LGD': np.clip(pred + rng.normal(0.02, 0.1, n), 0, 1),
+                         'PRED_LGD': pred,
+                         'EAD': rng.lognormal(10, 1, n),
+                         'segment': rng.choice(['retail', 'sme'], n),
+                         'vintage': rng.choice([2020, 2021, 2022], n)})
+
+
+def test_lgd_t_test_matches_scipy():
+    df = _lgd_portfolio()
+    error = df.LGD - df.PRED_LGD
+
+    N, lgd_mean, pred_mean, t_stat, s2, p_value = lgd_t_test(df, 'LGD', 'PRED_LGD')
+    expected = stats.ttest_1samp(error, 0, alternative='greater')
+    assert N == len(df)
+    assert np.isclose(lgd_mean, df.LGD.mean())
+    assert np.isclose(pred_mean, df.PRED_LGD.mean())
+    assert np.isclose(s2, error.var())
+    assert np.isclose(t_stat, expected.statistic)
+    assert np.isclose(p_value, expected.pvalue)
+
+
+def test_grouped_t_test():
+    df = _lgd_portfolio()
+    res = grouped_t_test(df.LGD, df.PRED_LGD, by=[df.segment, df.vintage],
+                         alternative='less')
+    assert len(res) == 6
+
+    for (segment, vintage), group in df.groupby(['segment', 'vintage']):
+        expected = stats.ttest_1samp(group.LGD - group.PRED_LGD, 0,
+                                     alternative='less')
+        row = res.loc[(segment, vintage)]
+        assert row['N'] == len(group)
+        assert np.isclose(row['T-Stat'], expected.statistic)
+        assert np.isclose(row['P-Value'], expected.pvalue)
+
+    grouped = lgd_t_test(df, 'LGD', 'PRED_LGD', by='segment')
+    assert list(grouped.index) == ['retail', 'sme']
+
+
+def test_grouped_t_test_weights():
+    df = _lgd_portfolio()
+
+    unit = grouped_t_test(df.LGD, df.PRED_LGD, sample_weight=np.ones(len(df)))
+    plain = grouped_t_test(df.LGD, df.PRED_LGD)
+    pd.testing.assert_frame_equal(unit, plain)
+
+    weighted = grouped_t_test(df.LGD, df.PRED_LGD, sample_weight=df.EAD)
+    assert np.isclose(weighted['Observed'].iloc[0],
+                      np.average(df.LGD, weights=df.EAD))
+    assert weighted['DoF'].iloc[0] < len(df) - 1
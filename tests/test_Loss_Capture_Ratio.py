@@ -1,5 +1,67 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import auc
+
 import meliora.Loss_Capture_Ratio
+from meliora.Loss_Capture_Ratio import loss_capture_ratio
 
 
 def test_Loss_Capture_Ratio():
     assert 3 == 3
+
+
+def _lcr_reference(ead, predicted, realised):
+    loss = ead * realised
+    areas = []
+    for key in (predicted, realised):
+        capture = np.cumsum(loss[np.argsort(-key, kind='stable')]) / loss.sum()
+        areas.append(auc(np.arange(len(loss)), capture) - 0.5 * len(loss))
+    return areas[0] / areas[1]
+
+
+def test_Loss_Capture_Ratio_segments():
+    rng = np.random.default_rng(0)
+    n = 2000
+    ead = rng.random(n) * 1000
+    realised = rng.random(n)
+    predicted = np.clip(realised + rng.normal(0, 0.3, n), 0, 1)
+    segment = pd.Series(rng.choice(['a', 'b', 'c'], n), name='segment')
+
+    lcr = loss_capture_ratio(pd.Series(ead), pd.Series(predicted),
+                             pd.Series(realised))
+    assert np.isclose(lcr, _lcr_reference(ead, predicted, realised))
+
+    by_segment = loss_capture_ratio(ead, predicted, realised, segment=segment)
+    assert list(by_segment.index) == ['a', 'b', 'c']
+    for name in ['a', 'b', 'c']:
+        mask = (segment == name).to_numpy()
+        assert np.isclose(by_segment[name],
+                          _lcr_reference(ead[mask], predicted[mask],
+                                         realised[mask]))
+
+    # facilities without a segment are left out
+    segment = segment.astype(object)
+    segment[:5] = None
+    by_segment = loss_capture_ratio(ead, predicted, realised, segment=segment)
+    assert list(by_segment.index) == ['a', 'b', 'c']
+    mask = (segment == 'a').to_numpy()
+    assert np.isclose(by_segment['a'],
+                      _lcr_reference(ead[mask], predicted[mask], realised[mask]))
+
+
+def test_Loss_Capture_Ratio_missing_values():
+    rng = np.random.default_rng(1)
+    n = 1000
+    ead = rng.random(n) * 1000
+    realised = rng.random(n)
+    predicted = np.clip(realised + rng.normal(0, 0.3, n), 0, 1)
+    segment = pd.Series(rng.choice(['a', 'b'], n), name='segment')
+    expected = loss_capture_ratio(ead[3:], predicted[3:], realised[3:])
+    by_segment = loss_capture_ratio(ead[3:], predicted[3:], realised[3:],
+                                    segment=segment[3:])
+
+    ead[0], predicted[1], realised[2] = np.nan, np.nan, np.nan
+    assert np.isclose(loss_capture_ratio(ead, predicted, realised), expected)
+    pd.testing.assert_series_equal(
+        loss_capture_ratio(ead, predicted, realised, segment=segment),
+        by_segment)
@@ -1,5 +1,78 @@
+import numpy as np
+import pandas as pd
+
 import meliora.Mean_Absolute_Deviation
+from meliora.Mean_Absolute_Deviation import (migration_matrix_stability,
+                                             migration_z_tests)
 
 
 def test_Mean_Absolute_Deviation():
     assert 3 == 3
+
+
+def _z_reference(p, Ni, i, j):
+    # element-wise definition of the z statistic
+    k = j + 1 if i > j else j - 1
+    den = (p[i, j]*(1-p[i, j]) + p[i, k]*(1-p[i, k]) + 2*p[i, j]*p[i, k])/Ni[i]
+    return (p[i, k] - p[i, j])/np.sqrt(den)
+
+
+def test_migration_matrix_stability():
+    rng = np.random.default_rng(0)
+    n = 4000
+    ratings = rng.integers(1, 6, n)
+    ratings2 = np.where(rng.random(n) < 0.6, ratings, rng.integers(1, 6, n))
+    df = pd.DataFrame({'ratings': ratings, 'ratings2': ratings2,
+                       'segment': rng.choice(['a', 'b'], n)})
+
+    z_df, phi_df = migration_matrix_stability(df, 'ratings', 'ratings2')
+
+    N_ij = pd.crosstab(df.ratings, df.ratings2).to_numpy()
+    p = N_ij / N_ij.sum(axis=1, keepdims=True)
+    Ni = N_ij.sum(axis=1)
+    for i in range(5):
+        for j in range(5):
+            if i == j:
+                assert np.isnan(z_df.iloc[i, j])
+            else:
+                assert np.isclose(z_df.iloc[i, j], _z_reference(p, Ni, i, j))
+
+    z_seg, phi_seg = migration_matrix_stability(df, 'ratings', 'ratings2',
+                                                segment_col='segment')
+    z_a, _ = migration_matrix_stability(df[df.segment == 'a'],
+                                        'ratings', 'ratings2')
+    np.testing.assert_allclose(z_seg.loc['a'], z_a)
+
+    counts = np.stack([pd.crosstab(g.ratings, g.ratings2).to_numpy()
+                       for _, g in df.groupby('segment')])
+    z, phi = migration_z_tests(counts)
+    assert z.shape == (2, 5, 5)
+    np.testing.assert_allclose(phi, phi_seg.to_numpy().reshape(2, 5, 5))
+
+
+def test_migration_matrix_stability_missing_values():
+    rng = np.random.default_rng(1)
+    n = 3000
+    ratings = rng.integers(1, 6, n).astype(float)
+    ratings2 = np.where(rng.random(n) < 0.6, ratings, rng.integers(1, 6, n))
+    df = pd.DataFrame({'ratings': ratings, 'ratings2': ratings2,
+                       'segment': rng.choice(['a', 'b'], n).astype(object)})
+    complete = df.copy()
+
+    df.loc[3, 'ratings'] = np.nan
+    df.loc[7, 'ratings2'] = np.nan
+    df.loc[11, 'segment'] = None
+
+    # rows with a missing rating are dropped, as by pd.crosstab
+    z_df, phi_df = migration_matrix_stability(df, 'ratings', 'ratings2')
+    z_ref, phi_ref = migration_matrix_stability(complete.drop([3, 7]),
+                                                'ratings', 'ratings2')
+    pd.testing.assert_frame_equal(z_df, z_ref)
+    pd.testing.assert_frame_equal(phi_df, phi_ref)
+
+    z_seg, _ = migration_matrix_stability(df, 'ratings', 'ratings2',
+                                          segment_col='segment')
+    z_ref, _ = migration_matrix_stability(complete.drop([3, 7, 11]),
+                                          'ratings', 'ratings2',
+                                          segment_col='segment')
+    pd.testing.assert_frame_equal(z_seg, z_ref)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from meliora.Accuracy_Ratio import accuracy_ratio
+from meliora.Parallel_Executor import run_by_segment
+from meliora.Validation_Suite import ValidationSuite
+
+
+def _default_rate(data):
+    return data['default_flag'].mean(), data['region'][0]
+
+
+def _portfolio(n=5000):
+    rng = np.random.default_rng(0)
+    ratings = rng.integers(1, 8, n)
+    prob_default = ratings * 0.02
+    return pd.DataFrame({
+        'ratings': ratings,
+        'prob_default': prob_default,
+        'default_flag': (rng.random(n) < prob_default).astype(int),
+        'segment': rng.choice(['retail', 'sme'], n),
+        'year': rng.choice([2021, 2022], n)})
+
+
+def test_Parallel_Executor():
+    df = _portfolio()
+    df['region'] = np.where(df.segment == 'sme', 'north', 'south')
+
+    results = run_by_segment(_default_rate, df, by='segment',
+                             data_columns=['default_flag', 'region'], n_jobs=2)
+
+    assert list(results) == ['retail', 'sme']
+    assert np.isclose(results['sme'][0],
+                      df.default_flag[df.segment == 'sme'].mean())
+    assert results['sme'][1] == 'north'
+
+
+def test_Parallel_Executor_suite():
+    df = _portfolio()
+
+    results = run_by_segment(['Accuracy Ratio', 'Binomial test'], df,
+                             by=['segment', 'year'],
+                             data_columns=['ratings', 'default_flag', 'prob_default'],
+                             n_jobs=2)
+
+    assert list(results) == [('retail', 2021), ('retail', 2022),
+                             ('sme', 2021), ('sme', 2022)]
+    cell = df[(df.segment == 'sme') & (df.year == 2021)]
+    assert np.isclose(results[('sme', 2021)]['Accuracy Ratio'],
+                      accuracy_ratio(cell.default_flag, cell.prob_default))
+
+
+def test_Parallel_Executor_suite_columns():
+    df = _portfolio().rename(columns={'prob_default': 'pd_model'})
+
+    # the suite's column-name mapping passes through
+    results = run_by_segment(['Binomial test'], df, by='segment',
+                             data_columns=['ratings', 'default_flag',
+                                           'pd_model'],
+                             n_jobs=2, columns={'prob_default': 'pd_model'})
+
+    cell = df[df.segment == 'sme']
+    expected = ValidationSuite(cell, ['Binomial test'],
+                               columns={'prob_default': 'pd_model'}).run()
+    pd.testing.assert_frame_equal(results['sme']['Binomial test'],
+                                  expected['Binomial test'])
+
+
+def test_Parallel_Executor_missing_labels():
+    df = _portfolio()
+    df['region'] = np.where(df.segment == 'sme', 'north', None)
+
+    results = run_by_segment(_default_rate, df, by='segment',
+                             data_columns=['default_flag', 'region'],
+                             n_jobs=2)
+
+    assert results['sme'][1] == 'north'
+    assert results['retail'][1] is None
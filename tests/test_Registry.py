@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import meliora
+import meliora.Registry
+from meliora.Registry import get_test, list_tests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_Registry():
+    assert 3 == 3
+
+
+def test_catalogue_in_sync():
+    with open(os.path.join(ROOT, 'docs', 'source', 'tests.csv')) as f:
+        assert f.read().strip() == meliora.Registry._CATALOGUE.strip()
+
+    for name in meliora.Registry.IMPLEMENTATIONS:
+        assert name in meliora.Registry.REGISTRY
+
+
+def test_list_tests():
+    assert len(list_tests()) == 32
+    assert all(t.area == 'Calibration' for t in list_tests(area='Calibration'))
+    assert 'Loss Capture Ratio' in [t.name for t in list_tests(model_type='LGD')]
+
+    for entry in list_tests(available=True):
+        assert callable(entry.load())
+
+    with pytest.raises(NotImplementedError):
+        get_test('Brier score').load()
+    with pytest.raises(ValueError):
+        get_test('Unknown test')
+
+
+def test_registry_call():
+    rng = np.random.default_rng(0)
+    elbe = rng.uniform(0.2, 0.8, 100)
+    t_stat, p_value = get_test('ELBE back-test using t-test')(
+        elbe + rng.normal(0, 0.1, 100), elbe)
+    assert 0 <= p_value <= 1
+
+    assert meliora.binomial_test is get_test('Binomial test').load()
+    with pytest.raises(AttributeError):
+        meliora.not_a_test
+
+
+def test_lazy_import():
+    code = ('import sys, meliora; meliora.list_tests(); '
+            'print(any(m in sys.modules for m in ("pandas", "scipy")))')
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, '-c', code], env=env,
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
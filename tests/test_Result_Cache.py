@@ -0,0 +1,215 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from meliora.Hoshmer_Lemeshow_Test import hosmer_lemeshow
+from meliora.Jeffreys_Test import jeffreys_test
+from meliora.Loss_Capture_Ratio import loss_capture_ratio
+from meliora.Parallel_Executor import run_by_segment
+from meliora.Result_Cache import ResultCache, fingerprint
+
+
+def test_Result_Cache():
+    assert 3 == 3
+
+
+def _portfolio(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 8, n)
+    prob_default = ratings / 50 + rng.uniform(0, 0.01, n)
+    pred_lgd = rng.uniform(0.1, 0.6, n)
+    return pd.DataFrame({'ratings': ratings,
+                         'default_flag': (rng.random(n) < prob_default).astype(int),
+                         'prob_default': prob_default,
+                         'LGD': np.clip(pred_lgd + rng.normal(0, 0.1, n), 0, 1),
+                         'PRED_LGD': pred_lgd,
+                         'EAD': rng.lognormal(10, 1, n),
+                         'segment': rng.choice(['A', 'B', 'C', 'D'], n)})
+
+
+def _segment_summary(shard):
+    return (len(shard['default_flag']), int(shard['default_flag'].sum()))
+
+
+def test_fingerprint():
+    df = _portfolio()
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df.ratings) == fingerprint(df['ratings'].copy())
+
+    changed = df.copy()
+    changed.loc[10, 'prob_default'] += 1e-12
+    assert fingerprint(changed) != fingerprint(df)
+    # names, dtypes and indexes count
+    assert fingerprint(df.ratings) != fingerprint(df.ratings.rename('x'))
+    assert fingerprint(df.ratings) != fingerprint(df.ratings.astype(float))
+    assert fingerprint(df.ratings) != fingerprint(df.ratings[::-1])
+    assert fingerprint(df.segment) != fingerprint(df.segment.astype('category'))
+    assert fingerprint(df.segment.astype('category')) == \
+        fingerprint(df.segment.copy().astype('category'))
+    # scalars are typed, NumPy scalars equal Python ones
+    assert fingerprint(1) != fingerprint(1.0) != fingerprint(True)
+    assert fingerprint(np.float64(0.05)) == fingerprint(0.05)
+    assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+
+
+def _threshold_rate(threshold):
+    def rate(default_flag, prob_default):
+        return float(np.mean(prob_default[default_flag == 1] > threshold))
+    return rate
+
+
+def test_fingerprint_closures():
+    df = _portfolio()
+    cache = ResultCache()
+    # same qualified name, different captured values
+    assert cache.key(_threshold_rate(0.05), df.default_flag, df.prob_default) \
+        != cache.key(_threshold_rate(0.1), df.default_flag, df.prob_default)
+    assert cache.call(_threshold_rate(0.05), df.default_flag,
+                      df.prob_default) != \
+        cache.call(_threshold_rate(0.1), df.default_flag, df.prob_default)
+    assert cache.misses == 2
+
+    scales = [lambda x, k=k: k * x for k in (1, 2)]
+    assert fingerprint(scales[0]) != fingerprint(scales[1])
+    assert fingerprint(_threshold_rate(0.05)) == \
+        fingerprint(_threshold_rate(0.05))
+
+    # a closure referring to itself is hashed once
+    def countdown(n):
+        return n if n <= 0 else countdown(n - 1)
+    assert fingerprint(countdown) == fingerprint(countdown)
+
+
+def test_fingerprint_columnar_tables():
+    pa = pytest.importorskip('pyarrow')
+    df = _portfolio().drop(columns='segment')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    assert fingerprint(table) == fingerprint(pa.Table.from_pandas(
+        df.copy(), preserve_index=False))
+    assert fingerprint(table) != fingerprint(table.slice(1))
+
+
+def test_call_hits_and_copies():
+    df = _portfolio()
+    cache = ResultCache()
+
+    first = cache.call(jeffreys_test, df.ratings, df.default_flag,
+                       df.prob_default)
+    # keyword arguments and explicit defaults share the key
+    second = cache.call(jeffreys_test, ratings=df.ratings.copy(),
+                        default_flag=df.default_flag,
+                        prob_default=df.prob_default, alpha=0.05)
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_frame_equal(first, second)
+    assert first is not second
+
+    # a hit is an independent copy
+    second.loc[:, 'PD'] = 0
+    pd.testing.assert_frame_equal(
+        cache.call(jeffreys_test, df.ratings, df.default_flag,
+                   df.prob_default), first)
+
+    cache.call(jeffreys_test, df.ratings, df.default_flag, df.prob_default,
+               alpha=0.01)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cached_decorator():
+    df = _portfolio()
+    cache = ResultCache()
+    lcr = cache.cached(loss_capture_ratio)
+    assert lcr.__name__ == 'loss_capture_ratio'
+    expected = loss_capture_ratio(df.EAD, df.PRED_LGD, df.LGD)
+    assert lcr(df.EAD, df.PRED_LGD, df.LGD) == expected
+    assert lcr(df.EAD, df.PRED_LGD, df.LGD) == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_eviction():
+    df = _portfolio()
+    cache = ResultCache(max_memory=2000)
+    for alpha in [0.01, 0.02, 0.03, 0.04]:
+        cache.call(hosmer_lemeshow, df.ratings, df.default_flag,
+                   df.prob_default, alpha=[alpha])
+    size = len(pickle.dumps(hosmer_lemeshow(df.ratings, df.default_flag,
+                                            df.prob_default, alpha=[0.01]),
+                            protocol=pickle.HIGHEST_PROTOCOL))
+    assert len(cache) == 2000 // size
+    # the oldest result was evicted, the newest is kept
+    cache.call(hosmer_lemeshow, df.ratings, df.default_flag,
+               df.prob_default, alpha=[0.04])
+    cache.call(hosmer_lemeshow, df.ratings, df.default_flag,
+               df.prob_default, alpha=[0.01])
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+def test_disk_tier(tmp_path):
+    df = _portfolio()
+    path = tmp_path / 'cache.sqlite'
+    cache = ResultCache(path)
+    expected = cache.call(hosmer_lemeshow, df.ratings, df.default_flag,
+                          df.prob_default)
+    cache.close()
+
+    # a new session reads the result from disk
+    cache = ResultCache(path)
+    assert cache.call(hosmer_lemeshow, df.ratings, df.default_flag,
+                      df.prob_default) == expected
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    cache.clear()
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_disk_eviction(tmp_path):
+    cache = ResultCache(tmp_path / 'cache.sqlite', max_memory=0,
+                        max_disk=3000)
+    for i in range(5):
+        cache.set(str(i), bytes(1000))
+    assert len(cache) <= 3
+    assert cache.get('4') == bytes(1000)
+    assert cache.get('0') is None
+    assert cache.get('0', 'missing') == 'missing'
+    cache.close()
+
+
+def test_run_by_segment_recomputes_changed_segments(tmp_path):
+    df = _portfolio()
+    columns = ['ratings', 'default_flag', 'prob_default']
+    cache = ResultCache(tmp_path / 'cache.sqlite')
+
+    results = cache.run_by_segment(['Binomial test', "Jeffrey's test"], df,
+                                   by='segment', data_columns=columns)
+    assert list(results) == ['A', 'B', 'C', 'D']
+    assert cache.misses == 4
+
+    changed = df.copy()
+    changed.loc[changed.segment == 'C', 'default_flag'] = 0
+    results = cache.run_by_segment(['Binomial test', "Jeffrey's test"],
+                                   changed, by='segment', data_columns=columns)
+    assert (cache.hits, cache.misses) == (3, 5)
+    assert results['C']["Jeffrey's test"]['D'].sum() == 0
+
+    # the changed segment is recomputed in worker processes
+    cache.run_by_segment(_segment_summary, df, 'segment', columns)
+    results = cache.run_by_segment(_segment_summary, changed, 'segment',
+                                   columns, n_jobs=2)
+    assert (cache.hits, cache.misses) == (6, 10)
+    assert results == run_by_segment(_segment_summary, changed, 'segment',
+                                     columns, n_jobs=2)
+    cache.close()
+
+
+def test_run_by_segment_suite_columns():
+    df = _portfolio().rename(columns={'prob_default': 'pd_model'})
+    cache = ResultCache()
+    results = cache.run_by_segment(["Jeffrey's test"], df, 'segment',
+                                   ['ratings', 'default_flag', 'pd_model'],
+                                   columns={'prob_default': 'pd_model'})
+    cell = df[df.segment == 'A']
+    pd.testing.assert_frame_equal(
+        results['A']["Jeffrey's test"],
+        jeffreys_test(cell.ratings, cell.default_flag, cell.pd_model))
@@ -0,0 +1,34 @@
+import numpy as np
+from sklearn import metrics
+
+from meliora.Score_Curve import ScoreCurve
+
+
+def test_Score_Curve():
+    rng = np.random.default_rng(0)
+    n = 5000
+    # rounded scores give many ties
+    scores = np.round(rng.random(n), 2)
+    default_flag = (rng.random(n) < scores).astype(int)
+    weights = rng.random(n)
+
+    curve = ScoreCurve(default_flag, scores, weights)
+
+    assert np.isclose(curve.auc(),
+                      metrics.roc_auc_score(default_flag, scores,
+                                            sample_weight=weights))
+    assert np.isclose(curve.gini(), 2 * curve.auc() - 1)
+
+    fpr, tpr, thresholds = metrics.roc_curve(default_flag, scores,
+                                             sample_weight=weights,
+                                             drop_intermediate=False)
+    np.testing.assert_allclose(curve.roc()[0], fpr)
+    np.testing.assert_allclose(curve.roc()[1], tpr)
+    np.testing.assert_allclose(curve.roc()[2][1:], thresholds[1:])
+
+    p_d = np.average(default_flag, weights=weights)
+    assert np.isclose(curve.ber(), np.min(p_d * (1 - tpr) + (1 - p_d) * fpr))
+    assert np.isclose(curve.ks(), np.max(tpr - fpr))
+
+    x, y = curve.cap()
+    assert x[0] == 0 and np.isclose(x[-1], 1) and np.isclose(y[-1], 1)
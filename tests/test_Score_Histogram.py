@@ -0,0 +1,43 @@
+import numpy as np
+
+import meliora.Bayesian_Error_Rate
+from meliora.Score_Curve import ScoreCurve
+from meliora.Score_Histogram import ScoreHistogram
+
+
+def test_Score_Histogram():
+    rng = np.random.default_rng(0)
+    n = 20000
+    prob_default = rng.beta(1, 8, n)
+    default_flag = (rng.random(n) < prob_default).astype(int)
+
+    hist = ScoreHistogram.from_sample(prob_default[:2000], bins=200)
+    for chunk in np.array_split(np.arange(n), 7):
+        hist.update(default_flag[chunk], prob_default[chunk])
+
+    exact = ScoreCurve(default_flag, prob_default)
+    bound = hist.error_bound()
+
+    assert hist.defaults.sum() == default_flag.sum()
+    assert abs(hist.auc() - exact.auc()) <= bound['auc']
+    assert abs(hist.gini() - exact.gini()) <= bound['gini']
+    assert hist.ks() <= exact.ks() <= hist.ks() + bound['ks']
+    assert hist.ber() - bound['ber'] <= exact.ber() <= hist.ber()
+    assert bound['auc'] < 0.01
+
+    ber = meliora.Bayesian_Error_Rate.bayesian_error_rate(curve=hist.curve())
+    assert ber == round(hist.ber(), 3)
+
+
+def test_Score_Histogram_merge():
+    rng = np.random.default_rng(1)
+    prob_default = rng.random(1000)
+    default_flag = (rng.random(1000) < prob_default).astype(int)
+
+    full = ScoreHistogram(bins=50).update(default_flag, prob_default)
+    part = ScoreHistogram(bins=50).update(default_flag[:400], prob_default[:400])
+    part.merge(ScoreHistogram(bins=50).update(default_flag[400:],
+                                              prob_default[400:]))
+
+    np.testing.assert_allclose(part.defaults, full.defaults)
+    np.testing.assert_allclose(part.non_defaults, full.non_defaults)
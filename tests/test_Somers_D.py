@@ -1,5 +1,55 @@
+import numpy as np
+from scipy import stats
+
 import meliora.Somers_D
+from meliora.Somers_D import somersd
 
 
 def test_Somers_D():
     assert 3 == 3
+
+
+def test_somersd_table():
+    table = [[27, 25, 14, 7, 0], [7, 14, 18, 35, 12], [1, 3, 2, 7, 17]]
+    res = somersd(table)
+    expected = stats.somersd(table)
+
+    assert np.isclose(res.statistic, expected.statistic)
+    assert np.isclose(res.pvalue, expected.pvalue)
+    lower, upper = res.confidence_interval(0.05)
+    assert lower < res.statistic < upper
+
+
+def test_somersd_ratings():
+    rng = np.random.default_rng(0)
+    ratings = rng.integers(1, 21, 20000)
+    default_flag = rng.random(20000) < ratings / 60
+
+    statistic, pvalue = somersd(ratings, default_flag)
+    expected = stats.somersd(ratings, default_flag)
+    assert np.isclose(statistic, expected.statistic)
+    assert np.isclose(pvalue, expected.pvalue, rtol=1e-6)
+
+
+def test_somersd_observation_path(monkeypatch):
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=3000)
+    y = np.round(x + rng.normal(size=3000), 1)
+
+    table_path = somersd(x, y)
+    monkeypatch.setattr(meliora.Somers_D, '_TABLE_CELLS', 0)
+    observation_path = somersd(x, y)
+
+    assert observation_path.table is None
+    assert np.isclose(observation_path.statistic, table_path.statistic)
+    assert np.isclose(observation_path.ase, table_path.ase)
+    assert np.isclose(observation_path.ase0, table_path.ase0)
+
+
+def test_lower_left():
+    rng = np.random.default_rng(2)
+    x = rng.integers(0, 20, 400)
+    y = rng.integers(0, 37, 400)
+    expected = [np.sum((x < x[i]) & (y < y[i])) for i in range(len(x))]
+    np.testing.assert_array_equal(meliora.Somers_D._lower_left(x, y),
+                                  expected)
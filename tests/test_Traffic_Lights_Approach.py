@@ -1,5 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import binom, norm
+
 import meliora.Traffic_Lights_Approach
+from meliora.Grade_Summary import grade_summary
+from meliora.Instrumentation import Recorder, instrumented, stage
+from meliora.Traffic_Lights_Approach import (_THRESHOLDS, _vasicek_cdf,
+                                             traffic_light_thresholds,
+                                             traffic_lights)
+from meliora.Validation_Suite import ValidationSuite
 
 
 def test_Traffic_Lights_Approach():
     assert 3 == 3
+
+
+def _portfolio(n=6000, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 8, n)
+    prob_default = ratings / 100
+    # portfolio B is underestimated in the worst grade
+    portfolio = rng.choice(['A', 'B'], n)
+    true_pd = np.where((portfolio == 'B') & (ratings == 7), 0.3, prob_default)
+    return pd.DataFrame({'ratings': ratings,
+                         'default_flag': (rng.random(n) < true_pd).astype(int),
+                         'prob_default': prob_default,
+                         'portfolio': portfolio,
+                         'year': rng.choice([2021, 2022, 2023], n)})
+
+
+def test_binomial_thresholds():
+    n = np.array([10, 100, 1000, 5000])
+    p = np.array([0.2, 0.01, 0.01, 0.003])
+    thresholds = traffic_light_thresholds(n, p)
+    expected = np.column_stack([binom.ppf(0.95, n, p), binom.ppf(0.999, n, p)])
+    np.testing.assert_array_equal(thresholds, expected)
+    np.testing.assert_array_equal(
+        traffic_light_thresholds([100, 1000], [0.01, 0.01]),
+        [[3, 5], [15, 21]])
+
+
+def test_vasicek_cdf():
+    rng = np.random.default_rng(1)
+    m = 50
+    n = rng.integers(5, 20000, m).astype(np.float64)
+    p = 10**rng.uniform(-4, -0.5, m)
+    rho = rng.uniform(0.01, 0.3, m)
+    k = np.floor(rng.uniform(0, 1, m) * np.minimum(n, 5 * n * p + 10))
+
+    # mixture over an equally spaced grid of quantiles of the factor
+    z = norm.ppf((np.arange(20000) + 0.5) / 20000)
+    expected = [binom.cdf(k[i], n[i], norm.cdf((norm.ppf(p[i])
+                                                - np.sqrt(rho[i]) * z)
+                                               / np.sqrt(1 - rho[i]))).mean()
+                for i in range(m)]
+    np.testing.assert_allclose(_vasicek_cdf(k, n, p, rho), expected,
+                               atol=2e-5)
+
+
+def test_correlated_thresholds():
+    n = np.array([50, 100, 1000, 10000])
+    p = np.array([0.05, 0.01, 0.01, 0.002])
+    independent = traffic_light_thresholds(n, p)
+    correlated = traffic_light_thresholds(n, p, correlation=0.12)
+    assert (correlated >= independent).all()
+    assert (correlated[:, 1] >= correlated[:, 0]).all()
+    np.testing.assert_array_equal(
+        traffic_light_thresholds([100, 1000], [0.01, 0.01], correlation=0.12),
+        [[4, 11], [31, 92]])
+
+    # Basel correlation is 0.24 for low PDs
+    np.testing.assert_array_equal(
+        traffic_light_thresholds([1000], [0.0001], correlation='basel'),
+        traffic_light_thresholds([1000], [0.0001], correlation=0.24))
+    with pytest.raises(ValueError):
+        traffic_light_thresholds([1000], [0.01], correlation='vasicek')
+
+
+def test_thresholds_are_cached():
+    n = np.tile([120, 340, 560], 4)
+    p = np.repeat([0.011, 0.022, 0.033, 0.044], 3)
+    _THRESHOLDS.clear()
+    recorder = Recorder()
+    with instrumented(recorder):
+        with stage('thresholds'):
+            first = traffic_light_thresholds(n, p, correlation=0.1)
+            second = traffic_light_thresholds(n[::-1], p[::-1],
+                                              correlation=0.1)
+
+    np.testing.assert_array_equal(second, first[::-1])
+    counters = [r.counters for r in recorder.records if r.counters]
+    assert counters == [{'thresholds computed': 24}]
+    assert len(_THRESHOLDS) == 24
+
+
+def test_traffic_lights_by_period():
+    df = _portfolio()
+    lights = traffic_lights(df.ratings, df.default_flag, df.prob_default,
+                            by=[df.portfolio, df.year])
+
+    assert lights.index.names == ['portfolio', 'year', 'Rating']
+    assert len(lights) == 2 * 3 * 7
+    assert list(lights['Traffic Light'].cat.categories) == ['Green', 'Yellow',
+                                                            'Red']
+    assert (lights.loc['B'].xs(7, level='Rating')['Traffic Light']
+            == 'Red').all()
+
+    # every period is classified as in a separate run
+    for (portfolio, year), period in df.groupby(['portfolio', 'year']):
+        single = traffic_lights(period.ratings, period.default_flag,
+                                period.prob_default)
+        pd.testing.assert_frame_equal(lights.loc[(portfolio, year)], single,
+                                      check_names=False)
+
+    d, yellow, red = (lights[c] for c in ['D', 'Yellow Threshold',
+                                          'Red Threshold'])
+    light = np.select([d >= red, d >= yellow], ['Red', 'Yellow'], 'Green')
+    np.testing.assert_array_equal(lights['Traffic Light'].astype(str), light)
+
+
+def test_traffic_lights_summary_and_suite():
+    df = _portfolio()
+    summary = grade_summary(df.ratings, df.default_flag, df.prob_default)
+    expected = traffic_lights(df.ratings, df.default_flag, df.prob_default,
+                              correlation='basel')
+    pd.testing.assert_frame_equal(
+        traffic_lights(summary=summary, correlation='basel'), expected)
+
+    results = ValidationSuite(df, ['Traffic lights approach']).run()
+    pd.testing.assert_frame_equal(results['Traffic lights approach'],
+                                  traffic_lights(summary=summary))
+    assert meliora.Traffic_Lights_Approach.migration_matrix_stability
+
+
+def test_traffic_lights_missing_pd():
+    df = _portfolio()
+    df.loc[df.ratings == 3, 'prob_default'] = np.nan
+    _THRESHOLDS.clear()
+    with np.errstate(all='raise'):
+        lights = traffic_lights(df.ratings, df.default_flag, df.prob_default)
+
+    # no usable PD: no thresholds and no light, in particular not green
+    grade = lights.loc[3]
+    assert np.isnan(grade['PD'])
+    assert pd.isna(grade['Yellow Threshold']) and pd.isna(grade['Red Threshold'])
+    assert pd.isna(grade['Traffic Light'])
+    assert lights['Yellow Threshold'].dtype == 'Int64'
+    assert lights['Traffic Light'].notna().sum() == 6
+    assert not any(np.isnan(key[1]) for key in _THRESHOLDS)
+
+    thresholds = traffic_light_thresholds([100, 100], [0.01, np.nan])
+    np.testing.assert_array_equal(thresholds, [[3, 5], [np.nan, np.nan]])
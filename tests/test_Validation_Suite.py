@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from meliora.Accuracy_Ratio import accuracy_ratio
+from meliora.Binomial_test import binomial_test
+from meliora.ELBE_t_test import elbe_t_test
+from meliora.Kolmogorov_Smirnov_test import ks_default
+from meliora.Validation_Suite import TESTS, ValidationSuite
+
+
+def _portfolio(n=3000):
+    rng = np.random.default_rng(0)
+    ratings = rng.integers(1, 8, n)
+    prob_default = ratings * 0.02
+    lgd = rng.random(n)
+    return pd.DataFrame({
+        'ratings': ratings,
+        'ratings2': np.where(rng.random(n) < 0.7, ratings,
+                             rng.integers(1, 8, n)),
+        'prob_default': prob_default,
+        'default_flag': (rng.random(n) < prob_default).astype(int),
+        'LGD': lgd,
+        'PRED_LGD': np.clip(lgd + rng.normal(0, 0.2, n), 0, 1),
+        'ELBE': np.clip(lgd + rng.normal(0, 0.1, n), 0, 1),
+        'EAD': rng.random(n) * 1000})
+
+
+def test_Validation_Suite():
+    df = _portfolio()
+    suite = ValidationSuite(df, list(TESTS))
+
+    assert suite.plan() == ['score_curve', 'grade_summary']
+
+    results = suite.run()
+
+    assert set(results) == set(TESTS)
+    assert np.isclose(results['Accuracy Ratio'],
+                      accuracy_ratio(df.default_flag, df.prob_default))
+    pd.testing.assert_frame_equal(
+        results['Binomial test'],
+        binomial_test(df.ratings, df.default_flag, df.prob_default))
+    # the suite returns what the public functions return
+    assert results['Kolmogorov-Smirnov test'] == ks_default(df.default_flag,
+                                                            df.prob_default)
+    assert results['ELBE back-test using t-test'] == elbe_t_test(df.LGD,
+                                                                 df.ELBE)
+
+
+def test_Validation_Suite_unknown_test():
+    with pytest.raises(ValueError):
+        ValidationSuite(_portfolio(), ['Brier score'])